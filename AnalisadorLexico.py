@@ -1,48 +1,194 @@
 #!/usr/bin/env python3
 import sys
+from collections.abc import Callable, Iterator
+from contextlib import nullcontext
 from pathlib import Path
 
-from src.RA1.functions.python.rpn_calc import parseExpressao, executarExpressao
-from src.RA1.functions.python.io_utils import lerArquivo, salvar_tokens
-from src.RA1.functions.python.tokens import Tipo_de_Token
-from src.RA1.functions.assembly import gerarAssemblyMultiple, save_assembly, save_registers_inc
+from src.RA1.functions.python.rpn_calc import parseArquivo, parseArquivoFluxo, executarExpressao
+from src.RA1.functions.python.io_utils import lerTexto, salvar_tokens, Saida_Lotes
+from src.RA1.functions.python.analisador_tabela import Tokens_Arquivo
+from src.RA1.functions.python.fluxo_tokens import Fluxo_Tokens
+from src.RA1.functions.python.maquina_rpn import executarLinha
+from src.RA1.functions.python.jit_rpn import executarLinhaJIT
+from src.RA1.functions.python.inteiro_rpn import executarLinhaInteira
+from src.RA1.functions.python.meia_rpn import executarLinhaMeia, Memoria_Slots_Meia
+from src.RA1.functions.python.memoria_rpn import Memoria_Slots
+from src.RA1.functions.python.memo_rpn import Cache_Memo
+from src.RA1.functions.python.orcamento_rpn import Orcamento, Orcamento_Excedido, lerOrcamento
+from src.RA1.functions.python.paralelo_rpn import avaliarParalelo
+from src.RA1.functions.python.diagnosticos_rpn import Codigo_Diagnostico, Coletor_Diagnosticos
+from src.RA1.functions.python.continuo_rpn import Linha_Lida, lerLinhasMapeadas, analisarLinhas, linhasArquivo
+from src.RA1.functions.python.binario_tokens import Saida_Tokens_Binario, salvarTokensBinario
+from src.RA1.functions.assembly import gerarAssemblyTokens, save_assembly, save_registers_inc, Saida_Assembly
 
 # --- caminhos base do projeto ---
 BASE_DIR    = Path(__file__).resolve().parent        # raiz do repo
 INPUTS_DIR  = BASE_DIR / "inputs" / "RA1"                       # raiz/inputs
 OUT_TOKENS  = BASE_DIR / "outputs" / "RA1" / "tokens" / "tokens_gerados.txt"
+OUT_TOKENS_BIN = OUT_TOKENS.with_suffix(".bin")                  # formato binário (binario_tokens)
 OUT_ASM_DIR = BASE_DIR / "outputs" / "RA1" / "assembly"          # raiz/outputs/assembly
 
 # garante pastas de saída
 OUT_ASM_DIR.mkdir(parents=True, exist_ok=True)
 OUT_TOKENS.parent.mkdir(parents=True, exist_ok=True)
 
-def exibirResultados(vetor_linhas: list[str]) -> None:
-    memoria_global = {}
-    historico_global = []
+def exibirResultados(vetor_linhas: list[str] | Tokens_Arquivo | Fluxo_Tokens | Iterator[Linha_Lida],
+                     referencia: bool = False,
+                     jit: bool = False, profundidade_historico: int | None = None,
+                     memo: Cache_Memo | None = None, processos: int | None = None,
+                     orcamento: Orcamento | None = None, diagnosticos: Coletor_Diagnosticos | None = None,
+                     silencioso: bool = False, inteiro: bool = False,
+                     meia: bool = False, guarda_tokens: Callable[[Linha_Lida], None] | None = None,
+                     arquivo_tokens: Path | None = OUT_TOKENS) -> list:
+    """
+    Avalia e mostra cada linha. Devolve os tokens de cada linha sem erro
+    léxico (para gerarAssemblyTokens); os lexemas vão para 'arquivo_tokens'
+    se ele não for None. Com guarda_tokens, cada Linha_Lida é passada a ele
+    na hora e nada é guardado.
+    """
+    # Variáveis em slots (Memoria_Slots); o avaliador de referência usa o dict original.
+    # profundidade_historico limita quantos resultados o RES ainda alcança
+    if referencia:
+        memoria_global = {}
+    elif meia:
+        memoria_global = Memoria_Slots_Meia(profundidade_historico=profundidade_historico)
+    else:
+        memoria_global = Memoria_Slots(profundidade_historico=profundidade_historico, inteiro=inteiro)
+    # Valor das linhas não avaliadas no histórico (int no modo inteiro)
+    zero = 0 if inteiro else 0.0
+    # Cada linha é compilada para bytecode e executada na máquina virtual;
+    # referencia=True usa o avaliador original (executarExpressao) e
+    # jit=True compila cada linha para uma função Python (jit_rpn);
+    # memo memoiza as subexpressões puras dos laços na máquina virtual,
+    # orcamento limita passos, iterações e tempo de cada linha e do arquivo e
+    # diagnosticos recebe as mensagens de erro em vez de print();
+    # inteiro=True calcula em inteiros de 16 bits como o Assembly (inteiro_rpn)
+    # e meia=True em float16 IEEE (meia_rpn)
+    if inteiro:
+        executar = lambda tokens, memoria: executarLinhaInteira(tokens, memoria, diagnosticos=diagnosticos)
+    elif meia:
+        executar = lambda tokens, memoria: executarLinhaMeia(tokens, memoria, diagnosticos=diagnosticos)
+    elif referencia:
+        executar = executarExpressao
+    elif jit:
+        executar = executarLinhaJIT
+    elif memo is not None or orcamento is not None or diagnosticos is not None:
+        executar = lambda tokens, memoria: executarLinha(tokens, memoria, memo=memo, orcamento=orcamento,
+                                                         diagnosticos=diagnosticos)
+    else:
+        executar = executarLinha
+    # Com diagnosticos, os resultados saem em lotes (Saida_Lotes) e o relatório
+    # no fim; silencioso não escreve nada por linha, só o relatório
+    lotes = None
+    if silencioso:
+        escreve = lambda texto: None
+    elif diagnosticos is not None:
+        lotes = Saida_Lotes()
+        escreve = lotes.escreve
+    else:
+        escreve = print
+    nao_avaliadas = 0
+    esgotado = False        # orçamento da execução excedido: as linhas seguintes não são avaliadas
+    linhas_avaliadas = []   # número de cada linha com uso em orcamento.usos
     tokens_salvos_txt = []
+    tokens_avaliados = []
 
-    # Inicializar o histórico na memória global (removido para evitar duplicação)
+    # Histórico de resultados (o que RES consulta), criado uma vez na memória global
+    registra_resultado = memoria_global.setdefault('historico_resultados', []).append
 
-    for i, linha in enumerate(vetor_linhas, start=1):
-        lista_de_tokens = parseExpressao(linha)
-        # para salvar tokens completos (incluindo parênteses) para RA2
-        tokens_completos = [str(token.valor) for token in lista_de_tokens if token.tipo != Tipo_de_Token.FIM]
-        tokens_salvos_txt.append(tokens_completos)
+    # O arquivo inteiro é analisado em uma única passada (sem um analisador por linha);
+    # um iterador de Linha_Lida (continuo_rpn) entrega uma linha de cada vez
+    arquivo = None
+    if isinstance(vetor_linhas, (Tokens_Arquivo, Fluxo_Tokens)):
+        arquivo = vetor_linhas
+    elif isinstance(vetor_linhas, list):
+        arquivo = parseArquivo("\n".join(vetor_linhas))
+    linhas = vetor_linhas if arquivo is None else linhasArquivo(arquivo)
+    total_linhas = erros_lexicos = 0
 
-        resultado = executarExpressao(lista_de_tokens, memoria_global)
-        # Adiciona apenas uma vez ao histórico
-        if 'historico_resultados' not in memoria_global:
-            memoria_global['historico_resultados'] = []
-        memoria_global['historico_resultados'].append(resultado)
-        print(f"Linha {i:02d}: Expressão '{linha}' -> Resultado: {resultado}")
-        # Remove a linha abaixo para evitar duplicação
-        # historico_global.append(resultado)
-        # print(f"DEBUG: Histórico após adicionar {resultado}: {historico_global}")
+    # processos: linhas independentes avaliadas ao mesmo tempo (paralelo_rpn);
+    # a saída e os resultados chegam na ordem do arquivo
+    paralelas = None
+    if processos is not None:
+        avaliador = "referencia" if referencia else "jit" if jit else "vm"
+        paralelas = avaliarParalelo(arquivo, avaliador, profundidade_historico, processos)
+
+    for i, lida in enumerate(linhas, 1):
+        total_linhas = i
+        linha = lida.texto
+        erro = lida.erro
+        if erro is not None:
+            erros_lexicos += 1
+            # Erro léxico afeta apenas esta linha; 0.0 mantém os índices do RES alinhados
+            registra_resultado(zero)
+            if diagnosticos is not None:
+                diagnosticos.linha = i
+                diagnosticos.registra(Codigo_Diagnostico.LEXICO, str(erro))
+            escreve(f"Linha {i:02d}: Expressão '{linha}' -> {erro}")
+            continue
+
+        lista_de_tokens = lida.tokens
+        # para salvar tokens completos (incluindo parênteses) para RA2;
+        # guarda_tokens recebe a linha na hora (modo --continuo)
+        if guarda_tokens is not None:
+            guarda_tokens(lida)
+        else:
+            tokens_avaliados.append(lista_de_tokens)
+            if arquivo_tokens is not None:
+                tokens_salvos_txt.append(lida.lexemas)
+
+        if esgotado:
+            registra_resultado(zero)
+            nao_avaliadas += 1
+            escreve(f"Linha {i:02d}: Expressão '{linha}' -> Não avaliada: orçamento da execução esgotado")
+            continue
+        if diagnosticos is not None:
+            diagnosticos.linha = i
+        if paralelas is not None:
+            saida, resultado = next(paralelas)
+            print(saida, end="")
+        elif orcamento is not None:
+            try:
+                resultado = executar(lista_de_tokens, memoria_global)
+                linhas_avaliadas.append(i)
+            except Orcamento_Excedido as e:
+                # Como no erro léxico, 0.0 mantém os índices do RES alinhados
+                linhas_avaliadas.append(i)
+                registra_resultado(zero)
+                if diagnosticos is not None:
+                    diagnosticos.registra(Codigo_Diagnostico.ORCAMENTO, str(e))
+                escreve(f"Linha {i:02d}: Expressão '{linha}' -> Orçamento excedido: {e}")
+                esgotado = e.escopo == "execucao"
+                continue
+        else:
+            resultado = executar(lista_de_tokens, memoria_global)
+        registra_resultado(resultado)
+        escreve(f"Linha {i:02d}: Expressão '{linha}' -> Resultado: {resultado}")
+
+    if paralelas is not None:
+        paralelas.close()
+    if lotes is not None:
+        lotes.descarrega()
+    if diagnosticos is not None:
+        resumo = f"\nResumo: {total_linhas} linhas, {erros_lexicos} com erro léxico"
+        if nao_avaliadas:
+            resumo += f", {nao_avaliadas} não avaliadas"
+        print(resumo)
+        print(diagnosticos.relatorio())
+    if memo is not None and not (referencia or jit or paralelas is not None):
+        print(f"\nMemoização: {memo.resumo()}")
+    if orcamento is not None and orcamento.usos:
+        print(f"\nOrçamento: {orcamento.resumo()}")
+        k = max(range(len(orcamento.usos)), key=lambda k: orcamento.usos[k].tempo)
+        uso = orcamento.usos[k]
+        print(f"Linha mais lenta: Linha {linhas_avaliadas[k]:02d} "
+              f"({uso.passos} passos, {uso.iteracoes} iterações, {uso.tempo:.3f} s)")
 
     # Salva em ambos os locais: RA1 e raiz
-    salvar_tokens(tokens_salvos_txt, OUT_TOKENS)  # Salva em RA1
+    if guarda_tokens is None and arquivo_tokens is not None:
+        salvar_tokens(tokens_salvos_txt, arquivo_tokens)  # Salva em RA1
     # salvar_tokens(tokens_salvos_txt, BASE_DIR / "tokens_gerados.txt")  # Salva na raiz
+    return tokens_avaliados
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -72,7 +218,50 @@ if __name__ == "__main__":
         print(f"ERRO -> arquivo não encontrado: {entrada}")
         sys.exit(1)
 
-    operacoes_lidas = lerArquivo(str(entrada))
+    # --historico N: guarda só os últimos N resultados para o RES
+    profundidade_historico = None
+    if "--historico" in sys.argv[2:]:
+        posicao = sys.argv.index("--historico", 2)
+        try:
+            profundidade_historico = int(sys.argv[posicao + 1])
+        except (IndexError, ValueError):
+            profundidade_historico = 0
+        if profundidade_historico < 1:
+            print("ERRO -> --historico espera um número inteiro positivo (ex.: --historico 1000)")
+            sys.exit(1)
+        # O avaliador de referência lê o histórico como lista, sem a janela do Historico
+        if "--referencia" in sys.argv[2:]:
+            print("ERRO -> --historico não se combina com --referencia")
+            sys.exit(1)
+
+    # --inteiro: literais inteiros e aritmética de 16 bits do Assembly (inteiro_rpn)
+    inteiro = "--inteiro" in sys.argv[2:]
+    if inteiro and any(opcao in sys.argv[2:] for opcao in
+                       ("--referencia", "--jit", "--paralelo", "--memo", "--orcamento", "--colunar")):
+        print("ERRO -> --inteiro não se combina com --referencia, --jit, --paralelo, --memo, --orcamento ou --colunar")
+        sys.exit(1)
+
+    # --float16: valores em meia precisão IEEE em vez de 2 casas decimais (meia_rpn)
+    meia = "--float16" in sys.argv[2:]
+    if meia and any(opcao in sys.argv[2:] for opcao in
+                    ("--inteiro", "--referencia", "--jit", "--paralelo", "--memo", "--orcamento")):
+        print("ERRO -> --float16 não se combina com --inteiro, --referencia, --jit, --paralelo, --memo ou --orcamento")
+        sys.exit(1)
+
+    # --continuo: o arquivo é mapeado (mmap) e cada linha é lida, analisada, avaliada e
+    # gravada uma de cada vez (continuo_rpn)
+    continuo = "--continuo" in sys.argv[2:]
+    if continuo and any(opcao in sys.argv[2:] for opcao in ("--paralelo", "--colunar")):
+        print("ERRO -> --continuo não se combina com --paralelo ou --colunar")
+        sys.exit(1)
+
+    # --colunar: tokens em colunas compactas (Fluxo_Tokens) para arquivos muito grandes
+    if continuo:
+        operacoes_lidas = analisarLinhas(lerLinhasMapeadas(str(entrada)), inteiro=inteiro)
+    elif "--colunar" in sys.argv[2:]:
+        operacoes_lidas = parseArquivoFluxo(lerTexto(str(entrada)))
+    else:
+        operacoes_lidas = parseArquivo(lerTexto(str(entrada)), inteiro=inteiro)
 
     # Exibe caminho relativo à raiz se possível (evita ValueError do relative_to)
     try:
@@ -83,43 +272,106 @@ if __name__ == "__main__":
         
     print(f"\nArquivo de teste: {mostrar}\n")
 
-    exibirResultados(operacoes_lidas)
+    # --paralelo [N]: avalia linhas independentes em N processos (padrão: um por núcleo)
+    processos = None
+    if "--paralelo" in sys.argv[2:]:
+        posicao = sys.argv.index("--paralelo", 2)
+        processos = 0
+        if posicao + 1 < len(sys.argv) and sys.argv[posicao + 1].isdigit():
+            processos = int(sys.argv[posicao + 1])
+            if processos < 1:
+                print("ERRO -> --paralelo espera um número inteiro positivo de processos (ex.: --paralelo 4)")
+                sys.exit(1)
+
+    # --memo: cache das subexpressões puras dos laços (só na máquina virtual)
+    memo = Cache_Memo() if "--memo" in sys.argv[2:] else None
+
+    # --orcamento chave=valor,...: limites de passos, iterações e tempo (só na máquina virtual)
+    orcamento = None
+    if "--orcamento" in sys.argv[2:]:
+        posicao = sys.argv.index("--orcamento", 2)
+        try:
+            orcamento = lerOrcamento(sys.argv[posicao + 1])
+        except IndexError:
+            print("ERRO -> --orcamento espera limites como 'iteracoes=100000,tempo=0.5'")
+            sys.exit(1)
+        except ValueError as e:
+            print(f"ERRO -> --orcamento: {e}")
+            sys.exit(1)
+        if "--referencia" in sys.argv[2:] or "--jit" in sys.argv[2:] or processos is not None:
+            print("ERRO -> --orcamento só se aplica à máquina virtual (sem --referencia, --jit ou --paralelo)")
+            sys.exit(1)
+
+    # --summary: resultados escritos em lotes e relatório dos diagnósticos no fim;
+    # --quiet: só o relatório (os dois só na máquina virtual)
+    silencioso = "--quiet" in sys.argv[2:]
+    diagnosticos = None
+    if silencioso or "--summary" in sys.argv[2:]:
+        if "--referencia" in sys.argv[2:] or "--jit" in sys.argv[2:] or processos is not None:
+            print("ERRO -> --summary e --quiet só se aplicam à máquina virtual (sem --referencia, --jit ou --paralelo)")
+            sys.exit(1)
+        diagnosticos = Coletor_Diagnosticos()
+
+    opcoes = dict(referencia="--referencia" in sys.argv[2:], jit="--jit" in sys.argv[2:],
+                  profundidade_historico=profundidade_historico, memo=memo, processos=processos,
+                  orcamento=orcamento, diagnosticos=diagnosticos, silencioso=silencioso, inteiro=inteiro,
+                  meia=meia)
+    # --sem-tokens: não grava tokens_gerados.txt (o Assembly recebe os tokens da avaliação, não do arquivo)
+    arquivo_tokens = None if "--sem-tokens" in sys.argv[2:] else OUT_TOKENS
+    # --tokens-bin: grava também tokens_gerados.bin, lido sem nova análise léxica (binario_tokens)
+    tokens_binarios = "--tokens-bin" in sys.argv[2:]
+    if continuo:
+        # Cada linha avaliada vai direto para o arquivo de tokens e para o Assembly
+        saida_assembly = Saida_Assembly()
+        saida_binaria = Saida_Tokens_Binario() if tokens_binarios else None
+        with nullcontext() if arquivo_tokens is None else arquivo_tokens.open("w", encoding="utf-8") as saida_tokens:
+            def guarda_tokens(lida: Linha_Lida) -> None:
+                if saida_tokens is not None:
+                    saida_tokens.write(" ".join(lida.lexemas) + "\n")
+                if saida_binaria is not None:
+                    saida_binaria.adiciona(lida.tokens)
+                saida_assembly.adiciona(lida.tokens)
+            exibirResultados(operacoes_lidas, guarda_tokens=guarda_tokens, **opcoes)
+        if saida_binaria is not None:
+            saida_binaria.salva(OUT_TOKENS_BIN)
+    else:
+        tokens_por_linha = exibirResultados(operacoes_lidas, arquivo_tokens=arquivo_tokens, **opcoes)
+        if tokens_binarios:
+            salvarTokensBinario(tokens_por_linha, OUT_TOKENS_BIN)
     print("\n--- FIM DOS TESTES ---\n")
 
     # --- Geração de código assembly para todas as operações em um único arquivo ---
-    codigo_assembly = []
-
-    # tokens foram salvos em raiz/outputs/tokens/tokens_gerados.txt
-    linhas = lerArquivo(str(OUT_TOKENS))
 
     # Salvar registers.inc em ambos os locais
     save_registers_inc(str(OUT_ASM_DIR / "registers.inc"))  # Em RA1
     # save_registers_inc(str(BASE_DIR / "registers.inc"))  # Na raiz
 
-    # Preparar lista de todas as operações (filtrar parênteses para assembly)
-    all_tokens = []
-    for linha in linhas:
-        tokens = linha.split()
-        # Filtrar parênteses apenas para geração de assembly (RA1 compatibility)
-        tokens_sem_parenteses = [token for token in tokens if token not in ['(', ')']]
-        all_tokens.append(tokens_sem_parenteses)
-
-    # Gerar um único arquivo com todas as operações
-    gerarAssemblyMultiple(all_tokens, codigo_assembly)
-    
     # Salvar programa_completo.S em ambos os locais
     nome_arquivo_ra1 = OUT_ASM_DIR / "programa_completo.S"
     nome_arquivo_root = BASE_DIR / "programa_completo.S"
-    
-    save_assembly(codigo_assembly, str(nome_arquivo_ra1))  # Salva em RA1
-    # save_assembly(codigo_assembly, str(nome_arquivo_root))  # Salva na raiz
-    
+
+    if continuo:
+        # As operações já foram geradas durante a avaliação; falta montar o arquivo
+        saida_assembly.salva(nome_arquivo_ra1)
+        operacoes = saida_assembly.operacoes
+    else:
+        codigo_assembly = []
+
+        # Gerar um único arquivo com todas as operações, a partir dos tokens
+        # devolvidos pela avaliação (sem reler tokens_gerados.txt); o código
+        # de cada token sai do seu tipo e os parênteses são ignorados
+        gerarAssemblyTokens(tokens_por_linha, codigo_assembly)
+
+        save_assembly(codigo_assembly, str(nome_arquivo_ra1))  # Salva em RA1
+        # save_assembly(codigo_assembly, str(nome_arquivo_root))  # Salva na raiz
+        operacoes = len(tokens_por_linha)
+
     print(f"Arquivo {nome_arquivo_ra1.name} gerado com sucesso em:")
     print(f"- {OUT_ASM_DIR}")
     print(f"- {BASE_DIR}")
-    print(f"Contém {len(all_tokens)} operações RPN em sequência.")
+    print(f"Contém {operacoes} operações RPN em sequência.")
 
     print("\nPara testar:")
     print("- Compile e carregue programa_completo.S no Arduino Uno")
     print("- Monitore a saída serial em 9600 baud para ver os resultados!")
-    print("- Todas as operações serão executadas sequencialmente")
\ No newline at end of file
+    print("- Todas as operações serão executadas sequencialmente")
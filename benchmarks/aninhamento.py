@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# aninhamento.py - Benchmark de linhas com parênteses aninhados em N níveis
+#
+# Gera um IFELSE cuja condição tem N grupos aninhados e mede, separadamente,
+# a análise léxica com a tabela de pares (analise(pares=True)),
+# parear_parenteses sozinho, a compilação (_Compilador.grupo, sem recursão
+# por nível) e a execução na máquina virtual. Para comparação, mede também
+# o caminho de referência (executarExpressao), que ainda avalia os grupos
+# recursivamente e, no limite de recursão padrão, cai no try/except do IFELSE.
+#
+# Uso: python benchmarks/aninhamento.py [N] [repetições]
+
+import contextlib
+import io
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.RA1.functions.python.analisador_tabela import Analisador_Lexico_Tabela
+from src.RA1.functions.python.tokens import parear_parenteses
+from src.RA1.functions.python.compilador_rpn import compilarLinha
+from src.RA1.functions.python.maquina_rpn import executarPrograma
+from src.RA1.functions.python.rpn_calc import executarExpressao
+
+NIVEIS_PADRAO = 1000
+REPETICOES_PADRAO = 5
+
+
+def gerarLinha(niveis: int) -> str:
+    """(IFELSE (((...(1 2 +)...))) (1) (0)) com 'niveis' grupos na condição."""
+    return f"(IFELSE ({'(' * niveis}1 2 +{')' * niveis}) (1) (0))"
+
+
+def melhor(funcao, repeticoes: int) -> float:
+    return min(timeit.repeat(funcao, number=1, repeat=repeticoes))
+
+
+def medir(niveis: int, repeticoes: int) -> None:
+    linha = gerarLinha(niveis)
+    tokens, pares = Analisador_Lexico_Tabela(linha).analise(pares=True)
+    programa = compilarLinha(tokens, pares)
+
+    print(f"IFELSE com {niveis} níveis de parênteses ({len(tokens)} tokens), melhor de {repeticoes}:")
+    etapas = {
+        "analise(pares=True)": lambda: Analisador_Lexico_Tabela(linha).analise(pares=True),
+        "parear_parenteses": lambda: parear_parenteses(tokens),
+        "compilarLinha": lambda: compilarLinha(tokens, pares),
+        "executarPrograma": lambda: executarPrograma(programa, {}),
+    }
+    for nome, funcao in etapas.items():
+        print(f"  {nome:<22} {melhor(funcao, repeticoes) * 1000:9.3f} ms")
+    print(f"  resultado: {executarPrograma(programa, {})}")
+
+    # Referência: as mensagens do IFELSE são impressas uma vez, fora da medição
+    saida = io.StringIO()
+    with contextlib.redirect_stdout(saida):
+        resultado = executarExpressao(tokens, {})
+        tempo = melhor(lambda: executarExpressao(tokens, {}), repeticoes)
+    print(f"  {'executarExpressao':<22} {tempo * 1000:9.3f} ms (resultado: {resultado})")
+    if saida.getvalue():
+        print(f"    {saida.getvalue().splitlines()[0]}")
+
+
+if __name__ == "__main__":
+    niveis = int(sys.argv[1]) if len(sys.argv) > 1 else NIVEIS_PADRAO
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else REPETICOES_PADRAO
+    medir(niveis, repeticoes)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# lexemas_longos.py - Benchmark do analisador léxico com identificadores e literais muito longos
+#
+# Gera uma linha com um identificador de N caracteres e outra com um
+# literal de N dígitos e mede, para os dois analisadores, o tempo de
+# analise() e o pico de memória alocada (tracemalloc). Os lexemas são
+# intervalos [inicio, fim) da fonte: o pico não cresce com N e o valor só é
+# extraído no primeiro acesso a token.valor, medido à parte.
+#
+# Uso: python benchmarks/lexemas_longos.py [N] [repetições]
+
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.RA1.functions.python.analisador_lexico import Analisador_Lexico
+from src.RA1.functions.python.analisador_tabela import Analisador_Lexico_Tabela
+from src.RA1.functions.python.tokens import Tipo_de_Token, VALOR_PENDENTE
+
+TAMANHO_PADRAO = 200_000
+REPETICOES_PADRAO = 5
+
+
+def gerarEntradas(n: int) -> dict[str, str]:
+    """Uma linha por caso: identificador longo e literal longo."""
+    return {
+        "identificador": f"({'A' * n})",
+        "literal": f"({'1' * n}.5 X)",
+    }
+
+
+def pico_memoria(analisador: type, texto: str) -> int:
+    """Maior quantidade de memória alocada durante uma análise, em bytes."""
+    tracemalloc.start()
+    try:
+        analisador(texto).analise()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def medir(n: int, repeticoes: int) -> None:
+    print(f"Lexemas de {n} caracteres, melhor de {repeticoes}:")
+    for caso, texto in gerarEntradas(n).items():
+        for analisador in (Analisador_Lexico, Analisador_Lexico_Tabela):
+            tempo = min(timeit.repeat(lambda: analisador(texto).analise(), number=1, repeat=repeticoes))
+            pico = pico_memoria(analisador, texto)
+            token = analisador(texto).analise()[1]
+            pendente = token._valor is VALOR_PENDENTE
+            tempo_valor = timeit.timeit(lambda: token.valor, number=1)
+            tipo = "NUMERO_REAL" if token.tipo == Tipo_de_Token.NUMERO_REAL else "VARIAVEL"
+            print(f"  {caso:<13} {analisador.__name__:<24} analise: {tempo * 1000:9.2f} ms"
+                  f"  pico: {pico / 1024:9.1f} KiB"
+                  f"  {tipo} {'adiado' if pendente else 'já extraído'}"
+                  f" (primeiro acesso: {tempo_valor * 1000:.2f} ms)")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else TAMANHO_PADRAO
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else REPETICOES_PADRAO
+    medir(n, repeticoes)
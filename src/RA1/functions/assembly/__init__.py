@@ -1,5 +1,5 @@
-from .builder import gerarAssemblyMultiple
+from .builder import gerarAssemblyMultiple, gerarAssemblyTokens, Saida_Assembly
 from .io import save_assembly
 from .registers import save_registers_inc
 
-__all__ = ["gerarAssemblyMultiple", "save_assembly", "save_registers_inc"]
\ No newline at end of file
+__all__ = ["gerarAssemblyMultiple", "gerarAssemblyTokens", "Saida_Assembly", "save_assembly", "save_registers_inc"]
\ No newline at end of file
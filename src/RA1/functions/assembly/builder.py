@@ -1,11 +1,20 @@
 # builder.py
+import shutil
+import tempfile
+from pathlib import Path
 from typing import List
 from .header import gerar_header
 from .data_section import gerar_secao_dados
-from .code_section import gerar_secao_codigo_multiplo
+from .code_section import (
+    gerar_secao_codigo_multiplo, gerar_secao_codigo_tokens, gerar_inicio_main, gerar_chamada_operacao,
+    gerar_fim_main, gerar_processamento_tokens,
+)
 from .footer import gerar_footer
 from .routines import gerar_rotinas_auxiliares
 
+# Linhas de Assembly juntadas antes de cada write em Saida_Assembly
+LINHAS_POR_ESCRITA = 4096
+
 def gerarAssemblyMultiple(all_tokens: List[List[str]], codigoAssembly: List[str]) -> None:
     """Gera código assembly para múltiplas operações em um único arquivo."""
     codigoAssembly.clear()
@@ -14,3 +23,74 @@ def gerarAssemblyMultiple(all_tokens: List[List[str]], codigoAssembly: List[str]
     gerar_secao_codigo_multiplo(codigoAssembly, all_tokens)
     gerar_rotinas_auxiliares(codigoAssembly)
     gerar_footer(codigoAssembly)
+
+def gerarAssemblyTokens(linhas_tokens: list, codigoAssembly: List[str]) -> None:
+    """
+    Como gerarAssemblyMultiple, com os Token da análise léxica de cada linha
+    (lista de Token ou Linha_Fluxo; parênteses e FIM são ignorados) no lugar
+    dos lexemas. O Assembly gerado é o mesmo.
+    """
+    codigoAssembly.clear()
+    gerar_header(codigoAssembly)
+    gerar_secao_dados(codigoAssembly)
+    gerar_secao_codigo_tokens(codigoAssembly, linhas_tokens)
+    gerar_rotinas_auxiliares(codigoAssembly)
+    gerar_footer(codigoAssembly)
+
+
+def _escreve(arquivo, codigo: List[str]) -> None:
+    if codigo:
+        arquivo.write("\n".join(codigo) + "\n")
+        codigo.clear()
+
+
+class Saida_Assembly:
+    """
+    O mesmo arquivo de gerarAssemblyTokens + save_assembly, gerado uma
+    operação de cada vez (modo --continuo). O corpo de cada operação é
+    escrito assim que ela chega em um SpooledTemporaryFile (em memória até
+    'memoria_maxima' caracteres, depois em disco); salva() monta o arquivo
+    final, com main chamando as operações antes dos corpos.
+    """
+
+    def __init__(self, memoria_maxima: int = 1 << 20):
+        self.corpos = tempfile.SpooledTemporaryFile(max_size=memoria_maxima, mode="w+", encoding="utf-8")
+        self.operacoes = 0
+
+    def adiciona(self, tokens) -> None:
+        """Gera a próxima operação a partir dos Token da linha."""
+        self.operacoes += 1
+        codigo = []
+        gerar_processamento_tokens(codigo, tokens, self.operacoes)
+        _escreve(self.corpos, codigo)
+
+    def salva(self, nome_arquivo: str | Path = "programa.s") -> bool:
+        """Escreve o arquivo completo e descarta os corpos guardados."""
+        try:
+            caminho_arquivo = Path(nome_arquivo)
+            caminho_arquivo.parent.mkdir(parents=True, exist_ok=True)
+
+            with caminho_arquivo.open('w', encoding='utf-8') as arquivo:
+                codigo = []
+                gerar_header(codigo)
+                gerar_secao_dados(codigo)
+                gerar_inicio_main(codigo)
+                for i in range(1, self.operacoes + 1):
+                    gerar_chamada_operacao(codigo, i)
+                    if len(codigo) >= LINHAS_POR_ESCRITA:
+                        _escreve(arquivo, codigo)
+                gerar_fim_main(codigo)
+                _escreve(arquivo, codigo)
+                self.corpos.seek(0)
+                shutil.copyfileobj(self.corpos, arquivo)
+                gerar_rotinas_auxiliares(codigo)
+                gerar_footer(codigo)
+                _escreve(arquivo, codigo)
+
+            print(f"Código Assembly salvo em: {caminho_arquivo} (16-bit version)")
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar arquivo Assembly: {e}")
+            return False
+        finally:
+            self.corpos.close()
@@ -1,10 +1,53 @@
+from ..python.tokens import Tipo_de_Token, NUM_TIPOS, LEXEMA_TIPO, TIPO_POR_LEXEMA
 from .operations import (
     is_number, is_integer, is_variable_mem,
-    gerar_push_int, gerar_operacao,
+    gerar_push_int, gerar_operacao_tipo,
+    TIPOS_OPERADORES, TIPOS_CONTROLE,
 )
 
+# Tokens que não geram código na versão com Token (no texto, os parênteses são filtrados antes)
+_TIPOS_IGNORADOS = frozenset((Tipo_de_Token.ABRE_PARENTESES, Tipo_de_Token.FECHA_PARENTESES, Tipo_de_Token.FIM))
+
+# Código de cada tipo de token que não depende do valor (índice = Tipo_de_Token);
+# os números são empilhados à parte
+_LINHAS_POR_TIPO: list[list[str]] = [[] for _ in range(NUM_TIPOS)]
+for _tipo in TIPOS_OPERADORES:
+    _LINHAS_POR_TIPO[_tipo] = gerar_operacao_tipo(_tipo)
+for _tipo in TIPOS_CONTROLE:
+    _LINHAS_POR_TIPO[_tipo] = [
+        f"    ; Estrutura de controle: {LEXEMA_TIPO[_tipo]}",
+        "    ; (A implementação completa será feita em uma atualização futura)",
+        ""
+    ]
+_LINHAS_POR_TIPO[Tipo_de_Token.RES] = ["    rcall comando_res", ""]
+# Toda variável (MEM ou outro nome) é tratada como MEM
+_LINHAS_POR_TIPO[Tipo_de_Token.VARIAVEL] = ["    rcall comando_mem", ""]
+
 def gerar_secao_codigo_multiplo(codigo: list[str], all_tokens: list[list[str]]) -> None:
     """Gera o código principal para múltiplas operações RPN."""
+    gerar_inicio_main(codigo)
+
+    # Gerar chamadas para cada operação
+    for i in range(len(all_tokens)):
+        gerar_chamada_operacao(codigo, i + 1)
+
+    gerar_fim_main(codigo)
+
+    # Gerar função para cada operação
+    for i, tokens in enumerate(all_tokens, 1):
+        _gerar_processamento_operacao(codigo, tokens, i)
+
+def gerar_secao_codigo_tokens(codigo: list[str], linhas_tokens: list) -> None:
+    """Como gerar_secao_codigo_multiplo, com os Token de cada linha (ver gerar_processamento_tokens)."""
+    gerar_inicio_main(codigo)
+    for i in range(len(linhas_tokens)):
+        gerar_chamada_operacao(codigo, i + 1)
+    gerar_fim_main(codigo)
+    for i, tokens in enumerate(linhas_tokens, 1):
+        gerar_processamento_tokens(codigo, tokens, i)
+
+def gerar_inicio_main(codigo: list[str]) -> None:
+    """Início de main: pilha do AVR, UART e pilha RPN."""
     codigo_principal = [
         "; ====================================================================",
         "; SEÇÃO DE CÓDIGO PRINCIPAL - MÚLTIPLAS OPERAÇÕES RPN - 16-BIT VERSION",
@@ -24,28 +67,90 @@ def gerar_secao_codigo_multiplo(codigo: list[str], all_tokens: list[list[str]])
         "    ; Processar todas as operações RPN sequencialmente",
     ]
     codigo.extend(codigo_principal)
-    
-    # Gerar chamadas para cada operação
-    for i in range(len(all_tokens)):
-        codigo.extend([
-            f"    ; Operação {i+1}",
-            f"    rcall processar_rpn_op{i+1}",
-            "    rcall send_result",
-            ""
-        ])
-    
+
+def gerar_chamada_operacao(codigo: list[str], op_number: int) -> None:
+    """Chamada, em main, da operação op_number e do envio do seu resultado."""
+    codigo.extend([
+        f"    ; Operação {op_number}",
+        f"    rcall processar_rpn_op{op_number}",
+        "    rcall send_result",
+        ""
+    ])
+
+def gerar_fim_main(codigo: list[str]) -> None:
     codigo.extend([
         "    ; Loop infinito",
         "    rjmp end_program",
         ""
     ])
-    
-    # Gerar função para cada operação
-    for i, tokens in enumerate(all_tokens, 1):
-        _gerar_processamento_operacao(codigo, tokens, i)
 
 def _gerar_processamento_operacao(codigo: list[str], tokens: list[str], op_number: int) -> None:
     """Gera o processamento de uma operação RPN específica."""
+    _gerar_inicio_operacao(codigo, " ".join(tokens), op_number)
+
+    # Processar tokens (reutilizando a lógica existente)
+    for i, token in enumerate(tokens):
+        codigo.append(f"    ; Processando token {i}: '{token}'")
+        # Tipo do lexema (None para números e identificadores)
+        tipo = TIPO_POR_LEXEMA.get(token)
+
+        if tipo is None and is_number(token):
+            valor = int(float(token)) if not is_integer(token) else int(float(token))
+            if valor > 65535:
+                valor = valor & 0xFFFF
+            codigo.extend(gerar_push_int(valor))
+
+        elif tipo in TIPOS_OPERADORES:
+            codigo.extend(gerar_operacao_tipo(tipo))
+
+        elif token == 'MEM':
+            codigo.extend(["    rcall comando_mem", ""])
+
+        elif tipo == Tipo_de_Token.RES:
+            codigo.extend(["    rcall comando_res", ""])
+
+        elif tipo in TIPOS_CONTROLE:
+            codigo.extend([
+                f"    ; Estrutura de controle: {token}",
+                "    ; (A implementação completa será feita em uma atualização futura)",
+                ""
+            ])
+
+        elif is_variable_mem(token):
+            # Todas as sequências de caracteres que não são tokens especiais são tratadas como MEM
+            codigo.extend(["    rcall comando_mem", ""])
+                
+        else:
+            codigo.extend([f"    ; Token desconhecido: {token}", ""])
+
+    _gerar_fim_operacao(codigo)
+
+def gerar_processamento_tokens(codigo: list[str], tokens, op_number: int) -> None:
+    """
+    Como _gerar_processamento_operacao, mas com os Token da análise léxica:
+    o código de cada token sai do seu tipo, sem reclassificar o texto.
+    Parênteses e FIM são ignorados.
+    """
+    tokens = [token for token in tokens if token.tipo not in _TIPOS_IGNORADOS]
+    lexemas = [str(token.valor) for token in tokens]
+    _gerar_inicio_operacao(codigo, " ".join(lexemas), op_number)
+
+    linhas_por_tipo = _LINHAS_POR_TIPO
+    for i, token in enumerate(tokens):
+        codigo.append(f"    ; Processando token {i}: '{lexemas[i]}'")
+        tipo = token.tipo
+        if tipo == Tipo_de_Token.NUMERO_REAL:
+            valor = int(token.valor)
+            if valor > 65535:
+                valor = valor & 0xFFFF
+            codigo.extend(gerar_push_int(valor))
+        else:
+            codigo.extend(linhas_por_tipo[tipo])
+
+    _gerar_fim_operacao(codigo)
+
+def _gerar_inicio_operacao(codigo: list[str], token_str: str, op_number: int) -> None:
+    """Rótulo da operação e o código que mostra o cabeçalho e a expressão pela serial."""
     codigo.extend([
         "; ====================================================================",
         f"; PROCESSAMENTO OPERAÇÃO {op_number} - 16-BIT VERSION",
@@ -55,7 +160,6 @@ def _gerar_processamento_operacao(codigo: list[str], tokens: list[str], op_numbe
         f"    ; Processando operação {op_number} com suporte 16-bit:",
     ])
 
-    token_str = " ".join(tokens)
     codigo.append(f"    ; Expressão: {token_str}")
     codigo.append("")
 
@@ -173,39 +277,7 @@ def _gerar_processamento_operacao(codigo: list[str], tokens: list[str], op_numbe
         ""
     ])
 
-    # Processar tokens (reutilizando a lógica existente)
-    for i, token in enumerate(tokens):
-        codigo.append(f"    ; Processando token {i}: '{token}'")
-
-        if is_number(token):
-            valor = int(float(token)) if not is_integer(token) else int(float(token))
-            if valor > 65535:
-                valor = valor & 0xFFFF
-            codigo.extend(gerar_push_int(valor))
-
-        elif token in ['+', '-', '*', '/', '%', '^', '<', '>', '==', '<=', '>=', '!=', '!', '||', '&&']:
-            codigo.extend(gerar_operacao(token))
-
-        elif token == 'MEM':
-            codigo.extend(["    rcall comando_mem", ""])
-
-        elif token == 'RES':
-            codigo.extend(["    rcall comando_res", ""])
-
-        elif token in ['WHILE', 'FOR', 'IFELSE']:
-            codigo.extend([
-                f"    ; Estrutura de controle: {token}",
-                "    ; (A implementação completa será feita em uma atualização futura)",
-                ""
-            ])
-
-        elif is_variable_mem(token):
-            # Todas as sequências de caracteres que não são tokens especiais são tratadas como MEM
-            codigo.extend(["    rcall comando_mem", ""])
-                
-        else:
-            codigo.extend([f"    ; Token desconhecido: {token}", ""])
-
+def _gerar_fim_operacao(codigo: list[str]) -> None:
     # Cabeçalho do resultado
     codigo.extend([
         "    ; Mostrar resultado",
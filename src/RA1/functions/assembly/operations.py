@@ -1,6 +1,8 @@
 # operations.py
 from typing import List
 
+from ..python.tokens import Tipo_de_Token, NUM_TIPOS, TIPO_POR_LEXEMA
+
 # -----------------------------
 # Helpers de análise de tokens
 # -----------------------------
@@ -9,9 +11,18 @@ from typing import List
 OPERADORES = ['+', '-', '*', '/', '%', '^', '<', '>', '==', '<=', '>=', '!=', '!', '||', '&&']
 COMANDOS_ESPECIAIS = ['RES', 'WHILE', 'FOR', 'IFELSE']
 
+# Conjuntos indexados por Tipo_de_Token (um teste por token, sem varrer listas)
+TIPOS_OPERADORES = frozenset(TIPO_POR_LEXEMA[op] for op in OPERADORES)
+TIPOS_COMPARACAO = frozenset((Tipo_de_Token.MENOR, Tipo_de_Token.MAIOR, Tipo_de_Token.IGUAL,
+                              Tipo_de_Token.MENOR_IGUAL, Tipo_de_Token.MAIOR_IGUAL, Tipo_de_Token.DIFERENTE))
+TIPOS_LOGICOS = frozenset((Tipo_de_Token.NOT, Tipo_de_Token.OR, Tipo_de_Token.AND))
+TIPOS_CONTROLE = frozenset((Tipo_de_Token.WHILE, Tipo_de_Token.FOR, Tipo_de_Token.IFELSE))
+
+_RESERVADOS = frozenset(OPERADORES) | frozenset(COMANDOS_ESPECIAIS)
+
 def is_number(token: str) -> bool:
     # Ignora operadores e comandos especiais silenciosamente
-    if token in OPERADORES or token in COMANDOS_ESPECIAIS:
+    if token in _RESERVADOS:
         return False
     try:
         float(token)
@@ -21,7 +32,7 @@ def is_number(token: str) -> bool:
 
 def is_integer(token: str) -> bool:
     # Ignora operadores e comandos especiais silenciosamente
-    if token in OPERADORES or token in COMANDOS_ESPECIAIS:
+    if token in _RESERVADOS:
         return False
     try:
         val = float(token)
@@ -31,18 +42,16 @@ def is_integer(token: str) -> bool:
 
 def is_variable_mem(token: str) -> bool:
     # Qualquer sequência de caracteres que não seja um operador ou comando especial
-    return (token not in OPERADORES and 
-            token not in COMANDOS_ESPECIAIS and 
-            not is_number(token))
+    return token not in _RESERVADOS and not is_number(token)
 
 def is_comparison_operator(token: str) -> bool:
-    return token in ['<', '>', '==', '<=', '>=', '!=']
+    return TIPO_POR_LEXEMA.get(token) in TIPOS_COMPARACAO
 
 def is_logical_operator(token: str) -> bool:
-    return token in ['!', '||', '&&']
+    return TIPO_POR_LEXEMA.get(token) in TIPOS_LOGICOS
 
 def is_control_structure(token: str) -> bool:
-    return token in ['WHILE', 'FOR', 'IFELSE']
+    return TIPO_POR_LEXEMA.get(token) in TIPOS_CONTROLE
 
 # ---------------------------------
 # Geração de PUSH (público + interno)
@@ -348,14 +357,28 @@ def _operacao_map() -> dict[str, List[str]]:
         ],
     }
 
+# Tabela montada uma única vez: OPERACOES_POR_TIPO[tipo] -> linhas Assembly
+OPERACOES_POR_TIPO: list[List[str] | None] = [None] * NUM_TIPOS
+for _lexema, _linhas in _operacao_map().items():
+    OPERACOES_POR_TIPO[TIPO_POR_LEXEMA[_lexema]] = _linhas
+
+def gerar_operacao_tipo(tipo: int) -> List[str]:
+    """Retorna as linhas Assembly para o operador de tipo 'tipo'."""
+    linhas = OPERACOES_POR_TIPO[tipo]
+    if linhas is None:
+        return [f"    ; Operação {tipo} não implementada", ""]
+    return list(linhas)
+
 def gerar_operacao(operador: str) -> List[str]:
     """Retorna as linhas Assembly para o operador informado."""
-    mapa = _operacao_map()
-    return mapa.get(operador, [f"    ; Operação {operador} não implementada", ""])
+    tipo = TIPO_POR_LEXEMA.get(operador)
+    if tipo is None or OPERACOES_POR_TIPO[tipo] is None:
+        return [f"    ; Operação {operador} não implementada", ""]
+    return list(OPERACOES_POR_TIPO[tipo])
 
 __all__ = [
     "is_number", "is_integer", "is_variable_mem",
     "is_comparison_operator", "is_logical_operator",
     "is_control_structure", "is_special_identifier",
-    "gerar_push_int", "gerar_operacao",
+    "gerar_push_int", "gerar_operacao", "gerar_operacao_tipo",
 ]
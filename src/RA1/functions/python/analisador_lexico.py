@@ -1,10 +1,11 @@
 # analisador_lexico.py
 
-from .tokens import Token, Tipo_de_Token
+from .tokens import Token, Tipo_de_Token, parear_parenteses
 
 class Analisador_Lexico:
-    def __init__(self, texto_fonte: str):
+    def __init__(self, texto_fonte: str, inteiro: bool = False):
         self.texto_fonte = texto_fonte
+        self.inteiro = inteiro      # literais sem ponto decimal viram int (modo inteiro)
         self.ponteiro = 0
         self.caractere = self.texto_fonte[self.ponteiro] if self.texto_fonte else None
         self.resultado = ""
@@ -22,13 +23,15 @@ class Analisador_Lexico:
         while self.caractere is not None and self.caractere.isspace():
             self.avanca_ponteiro()
 
-    def analise(self):
+    def analise(self, pares: bool = False):
         tokens = []
         while self.caractere is not None:
             token = self.estado_zero()
             if token:
                 tokens.append(token)
         tokens.append(Token(Tipo_de_Token.FIM, None))
+        if pares:
+            return tokens, parear_parenteses(tokens)
         return tokens
 
     def estado_zero(self):
@@ -116,25 +119,25 @@ class Analisador_Lexico:
         raise ValueError(f"ERRO -> Caractere inválido: '{self.caractere}'")
 
     def estado_numero(self):
-        resultado = ""
+        # O lexema é recortado uma única vez da fonte (sem concatenar caractere a caractere)
+        inicio = self.ponteiro
         while self.caractere is not None and self.caractere.isdigit():
-            resultado += self.caractere
             self.avanca_ponteiro()
         if self.caractere == '.':
-            resultado += self.caractere
             self.avanca_ponteiro()
             if not (self.caractere and self.caractere.isdigit()):
                 raise ValueError("ERRO -> Espera-se dígito após o ponto decimal.")
             while self.caractere is not None and self.caractere.isdigit():
-                resultado += self.caractere
                 self.avanca_ponteiro()
-        return Token(Tipo_de_Token.NUMERO_REAL, float(resultado))
+        resultado = self.texto_fonte[inicio:self.ponteiro]
+        valor = int(resultado) if self.inteiro and '.' not in resultado else float(resultado)
+        return Token(Tipo_de_Token.NUMERO_REAL, valor, self.texto_fonte, inicio, self.ponteiro)
 
     def estado_comando(self):
-        resultado = ""
+        inicio = self.ponteiro
         while self.caractere is not None and (self.caractere.isalpha() or self.caractere.isdigit() or self.caractere == '_'):
-            resultado += self.caractere
             self.avanca_ponteiro()
+        resultado = self.texto_fonte[inicio:self.ponteiro]
             
         # Lista de palavras-chave
         palavras_chave = {
@@ -146,7 +149,7 @@ class Analisador_Lexico:
         
         # Verifica se é uma palavra-chave
         if resultado in palavras_chave:
-            return Token(palavras_chave[resultado], resultado)
+            return Token(palavras_chave[resultado], resultado, self.texto_fonte, inicio, self.ponteiro)
         else:
             # Qualquer sequência não reconhecida é considerada uma variável
-            return Token(Tipo_de_Token.VARIAVEL, resultado)
\ No newline at end of file
+            return Token(Tipo_de_Token.VARIAVEL, resultado, self.texto_fonte, inicio, self.ponteiro)
\ No newline at end of file
@@ -0,0 +1,432 @@
+# analisador_tabela.py - Analisador léxico dirigido por tabela de transições
+
+from array import array
+
+from .tokens import Token, Tipo_de_Token, VALOR_PENDENTE, parear_parenteses
+from .fluxo_tokens import Fluxo_Tokens
+
+# -----------------------------
+# Classes de caracteres
+# -----------------------------
+C_ESPACO = 0
+C_LETRA = 1
+C_DIGITO = 2
+C_SUBLINHADO = 3
+C_PONTO = 4
+C_ABRE = 5
+C_FECHA = 6
+C_MAIS = 7
+C_MENOS = 8
+C_ASTERISCO = 9
+C_BARRA = 10
+C_PORCENTO = 11
+C_CIRCUNFLEXO = 12
+C_MENOR = 13
+C_MAIOR = 14
+C_IGUAL = 15
+C_EXCLAMACAO = 16
+C_BARRA_VERTICAL = 17
+C_E_COMERCIAL = 18
+C_OUTRO = 19
+NUM_CLASSES = 20
+
+_CLASSES_SIMBOLOS = {
+    '_': C_SUBLINHADO, '.': C_PONTO, '(': C_ABRE, ')': C_FECHA,
+    '+': C_MAIS, '-': C_MENOS, '*': C_ASTERISCO, '/': C_BARRA,
+    '%': C_PORCENTO, '^': C_CIRCUNFLEXO, '<': C_MENOR, '>': C_MAIOR,
+    '=': C_IGUAL, '!': C_EXCLAMACAO, '|': C_BARRA_VERTICAL, '&': C_E_COMERCIAL,
+}
+
+def classificar_caractere(c: str) -> int:
+    """Classifica um caractere na mesma ordem de testes do Analisador_Lexico."""
+    if c.isspace():
+        return C_ESPACO
+    if c.isalpha():
+        return C_LETRA
+    if c.isdigit():
+        return C_DIGITO
+    return _CLASSES_SIMBOLOS.get(c, C_OUTRO)
+
+# Cache caractere -> classe (pré-preenchido com ASCII; demais caracteres entram sob demanda)
+_CLASSE_CARACTERE = {chr(i): classificar_caractere(chr(i)) for i in range(128)}
+# Classe de cada byte ASCII (índice = valor do byte), para textos em bytes
+_CLASSE_BYTE = [_CLASSE_CARACTERE[chr(i)] for i in range(128)]
+
+# -----------------------------
+# Estados do autômato
+# -----------------------------
+ERRO = -1
+(E_INICIO, E_INTEIRO, E_PONTO, E_FRACAO, E_IDENTIFICADOR,
+ E_ABRE, E_FECHA, E_SOMA, E_SUBTRACAO, E_MULT, E_DIV, E_RESTO, E_POT,
+ E_MENOR, E_MENOR_IGUAL, E_MAIOR, E_MAIOR_IGUAL,
+ E_IGUAL, E_IGUAL_IGUAL, E_EXCLAMACAO, E_DIFERENTE,
+ E_BARRA_VERTICAL, E_OR, E_E_COMERCIAL, E_AND) = range(25)
+NUM_ESTADOS = 25
+
+def _construir_transicoes() -> list[list[int]]:
+    """Monta a tabela estado x classe -> próximo estado (construída uma única vez)."""
+    tabela = [[ERRO] * NUM_CLASSES for _ in range(NUM_ESTADOS)]
+
+    # Estado inicial: espaço permanece no início; demais classes abrem um lexema
+    inicio = tabela[E_INICIO]
+    inicio[C_ESPACO] = E_INICIO
+    inicio[C_LETRA] = E_IDENTIFICADOR
+    inicio[C_DIGITO] = E_INTEIRO
+    inicio[C_ABRE] = E_ABRE
+    inicio[C_FECHA] = E_FECHA
+    inicio[C_MAIS] = E_SOMA
+    inicio[C_MENOS] = E_SUBTRACAO
+    inicio[C_ASTERISCO] = E_MULT
+    inicio[C_BARRA] = E_DIV
+    inicio[C_PORCENTO] = E_RESTO
+    inicio[C_CIRCUNFLEXO] = E_POT
+    inicio[C_MENOR] = E_MENOR
+    inicio[C_MAIOR] = E_MAIOR
+    inicio[C_IGUAL] = E_IGUAL
+    inicio[C_EXCLAMACAO] = E_EXCLAMACAO
+    inicio[C_BARRA_VERTICAL] = E_BARRA_VERTICAL
+    inicio[C_E_COMERCIAL] = E_E_COMERCIAL
+
+    # Números: dígitos+ ('.' dígitos+)?
+    tabela[E_INTEIRO][C_DIGITO] = E_INTEIRO
+    tabela[E_INTEIRO][C_PONTO] = E_PONTO
+    tabela[E_PONTO][C_DIGITO] = E_FRACAO
+    tabela[E_FRACAO][C_DIGITO] = E_FRACAO
+
+    # Identificadores: letra (letra | dígito | '_')*
+    for classe in (C_LETRA, C_DIGITO, C_SUBLINHADO):
+        tabela[E_IDENTIFICADOR][classe] = E_IDENTIFICADOR
+
+    # Operadores de dois caracteres
+    tabela[E_MENOR][C_IGUAL] = E_MENOR_IGUAL
+    tabela[E_MAIOR][C_IGUAL] = E_MAIOR_IGUAL
+    tabela[E_IGUAL][C_IGUAL] = E_IGUAL_IGUAL
+    tabela[E_EXCLAMACAO][C_IGUAL] = E_DIFERENTE
+    tabela[E_BARRA_VERTICAL][C_BARRA_VERTICAL] = E_OR
+    tabela[E_E_COMERCIAL][C_E_COMERCIAL] = E_AND
+    return tabela
+
+TRANSICOES = _construir_transicoes()
+
+# Estados sem nenhuma transição de saída: o lexema termina no próprio caractere
+TERMINAIS = [all(proximo == ERRO for proximo in linha) for linha in TRANSICOES]
+
+# Estados de aceitação -> tipo de token
+ACEITACAO = [None] * NUM_ESTADOS
+ACEITACAO[E_INTEIRO] = Tipo_de_Token.NUMERO_REAL
+ACEITACAO[E_FRACAO] = Tipo_de_Token.NUMERO_REAL
+ACEITACAO[E_IDENTIFICADOR] = Tipo_de_Token.VARIAVEL
+ACEITACAO[E_ABRE] = Tipo_de_Token.ABRE_PARENTESES
+ACEITACAO[E_FECHA] = Tipo_de_Token.FECHA_PARENTESES
+ACEITACAO[E_SOMA] = Tipo_de_Token.SOMA
+ACEITACAO[E_SUBTRACAO] = Tipo_de_Token.SUBTRACAO
+ACEITACAO[E_MULT] = Tipo_de_Token.MULTIPLICACAO
+ACEITACAO[E_DIV] = Tipo_de_Token.DIVISAO
+ACEITACAO[E_RESTO] = Tipo_de_Token.RESTO
+ACEITACAO[E_POT] = Tipo_de_Token.POTENCIA
+ACEITACAO[E_MENOR] = Tipo_de_Token.MENOR
+ACEITACAO[E_MENOR_IGUAL] = Tipo_de_Token.MENOR_IGUAL
+ACEITACAO[E_MAIOR] = Tipo_de_Token.MAIOR
+ACEITACAO[E_MAIOR_IGUAL] = Tipo_de_Token.MAIOR_IGUAL
+ACEITACAO[E_IGUAL_IGUAL] = Tipo_de_Token.IGUAL
+ACEITACAO[E_EXCLAMACAO] = Tipo_de_Token.NOT
+ACEITACAO[E_DIFERENTE] = Tipo_de_Token.DIFERENTE
+ACEITACAO[E_OR] = Tipo_de_Token.OR
+ACEITACAO[E_AND] = Tipo_de_Token.AND
+
+# Lexema fixo dos estados de operador (números e identificadores são lidos da fonte)
+LEXEMAS = [None] * NUM_ESTADOS
+LEXEMAS[E_ABRE] = '('
+LEXEMAS[E_FECHA] = ')'
+LEXEMAS[E_SOMA] = '+'
+LEXEMAS[E_SUBTRACAO] = '-'
+LEXEMAS[E_MULT] = '*'
+LEXEMAS[E_DIV] = '/'
+LEXEMAS[E_RESTO] = '%'
+LEXEMAS[E_POT] = '^'
+LEXEMAS[E_MENOR] = '<'
+LEXEMAS[E_MENOR_IGUAL] = '<='
+LEXEMAS[E_MAIOR] = '>'
+LEXEMAS[E_MAIOR_IGUAL] = '>='
+LEXEMAS[E_IGUAL_IGUAL] = '=='
+LEXEMAS[E_EXCLAMACAO] = '!'
+LEXEMAS[E_DIFERENTE] = '!='
+LEXEMAS[E_OR] = '||'
+LEXEMAS[E_AND] = '&&'
+
+# Mensagens para estados não finais (mesmas do Analisador_Lexico)
+MENSAGENS_ERRO = {
+    E_PONTO: "ERRO -> Espera-se dígito após o ponto decimal.",
+    E_IGUAL: "ERRO -> Esperado '=' após '='",
+    E_BARRA_VERTICAL: "ERRO -> Esperado '|' após '|'",
+    E_E_COMERCIAL: "ERRO -> Esperado '&' após '&'",
+}
+
+PALAVRAS_CHAVE = {
+    "RES": Tipo_de_Token.RES,
+    "WHILE": Tipo_de_Token.WHILE,
+    "FOR": Tipo_de_Token.FOR,
+    "IFELSE": Tipo_de_Token.IFELSE,
+}
+# Só identificadores com um destes tamanhos precisam ser recortados para comparação
+_TAMANHOS_PALAVRAS_CHAVE = frozenset(len(palavra) for palavra in PALAVRAS_CHAVE)
+# Palavras-chave em bytes -> (tipo, lexema em str)
+_PALAVRAS_CHAVE_BYTES = {palavra.encode(): (tipo, palavra) for palavra, tipo in PALAVRAS_CHAVE.items()}
+
+
+def _analisar_trecho(texto: str, i: int, n: int, adiciona, adiado: bool, inteiro: bool = False) -> None:
+    """
+    Reconhece os tokens de texto[i:n], entregando cada um a 'adiciona'.
+    Cada token guarda o intervalo do lexema; com 'adiado' (texto ASCII,
+    em que todo lexema numérico é um float válido) números e
+    identificadores só são convertidos quando 'valor' for lido.
+    Com 'inteiro', literais só de dígitos viram int já na análise.
+    """
+    transicoes = TRANSICOES
+    linha_inicio = transicoes[E_INICIO]
+    terminais = TERMINAIS
+    aceitacao = ACEITACAO
+    lexemas = LEXEMAS
+    classes = _CLASSE_CARACTERE
+    numero = Tipo_de_Token.NUMERO_REAL
+    variavel = Tipo_de_Token.VARIAVEL
+
+    while i < n:
+        caractere = texto[i]
+        classe = classes.get(caractere)
+        if classe is None:
+            classe = classes[caractere] = classificar_caractere(caractere)
+        estado = linha_inicio[classe]
+        if estado == E_INICIO:
+            i += 1
+            continue
+        if estado == ERRO:
+            raise ValueError(f"ERRO -> Caractere inválido: '{caractere}'")
+        if terminais[estado]:
+            adiciona(Token(aceitacao[estado], lexemas[estado], texto, i, i + 1))
+            i += 1
+            continue
+
+        # Consome o maior lexema possível a partir de 'inicio'
+        inicio = i
+        i += 1
+        linha = transicoes[estado]
+        while i < n:
+            caractere = texto[i]
+            classe = classes.get(caractere)
+            if classe is None:
+                classe = classes[caractere] = classificar_caractere(caractere)
+            proximo = linha[classe]
+            if proximo == ERRO:
+                break
+            estado = proximo
+            linha = transicoes[estado]
+            i += 1
+
+        tipo = aceitacao[estado]
+        if tipo is None:
+            raise ValueError(MENSAGENS_ERRO[estado])
+        if tipo == numero:
+            if inteiro:
+                lexema = texto[inicio:i]
+                valor = int(lexema) if lexema.isascii() and lexema.isdigit() else float(lexema)
+                adiciona(Token(tipo, valor, texto, inicio, i))
+            elif adiado:
+                adiciona(Token(tipo, VALOR_PENDENTE, texto, inicio, i))
+            else:
+                # Dígitos não ASCII (ex.: '²') devem falhar aqui, durante a análise
+                adiciona(Token(tipo, float(texto[inicio:i]), texto, inicio, i))
+        elif tipo == variavel:
+            if i - inicio in _TAMANHOS_PALAVRAS_CHAVE:
+                lexema = texto[inicio:i]
+                palavra_chave = PALAVRAS_CHAVE.get(lexema)
+                if palavra_chave is not None:
+                    adiciona(Token(palavra_chave, lexema, texto, inicio, i))
+                    continue
+            adiciona(Token(tipo, VALOR_PENDENTE, texto, inicio, i))
+        else:
+            adiciona(Token(tipo, lexemas[estado], texto, inicio, i))
+
+
+def _analisar_trecho_bytes(texto: bytes, i: int, n: int, adiciona, inteiro: bool = False) -> None:
+    """
+    _analisar_trecho para bytes só ASCII: cada byte já é o índice da sua
+    classe, sem decodificar a linha. Os tokens guardam o intervalo nos
+    bytes e números e identificadores são convertidos no primeiro acesso
+    a 'valor', como no texto ASCII.
+    """
+    transicoes = TRANSICOES
+    linha_inicio = transicoes[E_INICIO]
+    terminais = TERMINAIS
+    aceitacao = ACEITACAO
+    lexemas = LEXEMAS
+    classes = _CLASSE_BYTE
+    numero = Tipo_de_Token.NUMERO_REAL
+    variavel = Tipo_de_Token.VARIAVEL
+
+    while i < n:
+        estado = linha_inicio[classes[texto[i]]]
+        if estado == E_INICIO:
+            i += 1
+            continue
+        if estado == ERRO:
+            raise ValueError(f"ERRO -> Caractere inválido: '{chr(texto[i])}'")
+        if terminais[estado]:
+            adiciona(Token(aceitacao[estado], lexemas[estado], texto, i, i + 1))
+            i += 1
+            continue
+
+        # Consome o maior lexema possível a partir de 'inicio'
+        inicio = i
+        i += 1
+        linha = transicoes[estado]
+        while i < n:
+            proximo = linha[classes[texto[i]]]
+            if proximo == ERRO:
+                break
+            estado = proximo
+            linha = transicoes[estado]
+            i += 1
+
+        tipo = aceitacao[estado]
+        if tipo is None:
+            raise ValueError(MENSAGENS_ERRO[estado])
+        if tipo == numero:
+            if inteiro:
+                lexema = texto[inicio:i]
+                adiciona(Token(tipo, int(lexema) if lexema.isdigit() else float(lexema), texto, inicio, i))
+            else:
+                adiciona(Token(tipo, VALOR_PENDENTE, texto, inicio, i))
+        elif tipo == variavel:
+            if i - inicio in _TAMANHOS_PALAVRAS_CHAVE:
+                palavra_chave = _PALAVRAS_CHAVE_BYTES.get(texto[inicio:i])
+                if palavra_chave is not None:
+                    adiciona(Token(palavra_chave[0], palavra_chave[1], texto, inicio, i))
+                    continue
+            adiciona(Token(tipo, VALOR_PENDENTE, texto, inicio, i))
+        else:
+            adiciona(Token(tipo, lexemas[estado], texto, inicio, i))
+
+
+class Tokens_Arquivo:
+    """
+    Tokens de um arquivo inteiro, analisado em uma única passada.
+    A linha k (apenas linhas não vazias, como em lerArquivo) ocupa
+    tokens[inicio_tokens[k]:inicio_tokens[k + 1]], terminando em FIM.
+    Linhas com erro léxico não têm tokens e guardam a mensagem em 'erros'.
+    """
+
+    def __init__(self, texto: str):
+        self.texto = texto
+        self.tokens = []
+        self.inicio_tokens = array('Q', [0])
+        self.inicio_linhas = array('Q')   # offsets da linha bruta no texto
+        self.fim_linhas = array('Q')
+        self.erros = {}                   # índice da linha -> mensagem de erro
+
+    def __len__(self):
+        return len(self.inicio_linhas)
+
+    def tokens_linha(self, k: int) -> list[Token]:
+        return self.tokens[self.inicio_tokens[k]:self.inicio_tokens[k + 1]]
+
+    def lexemas_linha(self, k: int) -> list[str]:
+        """Texto de cada token da linha (sem o FIM), como gravado em tokens_gerados.txt."""
+        return [str(token.valor) for token in self.tokens_linha(k) if token.tipo != Tipo_de_Token.FIM]
+
+    def texto_linha(self, k: int) -> str:
+        # A linha só é recortada do buffer quando alguém precisa exibi-la
+        return self.texto[self.inicio_linhas[k]:self.fim_linhas[k]].strip()
+
+
+class Analisador_Lexico_Tabela:
+    """Mesma interface do Analisador_Lexico, com uma consulta de tabela por caractere."""
+
+    def __init__(self, texto_fonte: str | bytes, inteiro: bool = False):
+        self.texto_fonte = texto_fonte
+        self.inteiro = inteiro      # literais sem ponto decimal viram int (modo inteiro)
+
+    def analise(self, pares: bool = False):
+        """
+        Com pares=True devolve (tokens, tabela de parear_parenteses).
+        Um texto em bytes (UTF-8) só ASCII é analisado sem ser decodificado.
+        """
+        tokens = []
+        texto = self.texto_fonte
+        if isinstance(texto, bytes):
+            if texto.isascii():
+                _analisar_trecho_bytes(texto, 0, len(texto), tokens.append, self.inteiro)
+            else:
+                texto = texto.decode("utf-8")
+                _analisar_trecho(texto, 0, len(texto), tokens.append, False, self.inteiro)
+        else:
+            _analisar_trecho(texto, 0, len(texto), tokens.append, texto.isascii(), self.inteiro)
+        tokens.append(Token(Tipo_de_Token.FIM, None))
+        if pares:
+            return tokens, parear_parenteses(tokens)
+        return tokens
+
+    def analise_buffer(self) -> Tokens_Arquivo:
+        """
+        Analisa o texto inteiro de uma vez, linha a linha, sem criar um
+        analisador nem uma string por linha. Um erro em uma linha não
+        interrompe as demais.
+        """
+        texto = self.texto_fonte
+        resultado = Tokens_Arquivo(texto)
+        tokens = resultado.tokens
+        adiciona = tokens.append
+        adiado = texto.isascii()
+
+        for inicio, fim in _linhas_brutas(texto):
+            marca = len(tokens)
+            try:
+                _analisar_trecho(texto, inicio, fim, adiciona, adiado, self.inteiro)
+            except ValueError as e:
+                del tokens[marca:]
+                resultado.erros[len(resultado.inicio_linhas)] = str(e)
+            else:
+                if len(tokens) == marca:
+                    # Linha em branco: ignorada, como em lerArquivo
+                    continue
+                adiciona(Token(Tipo_de_Token.FIM, None))
+            resultado.inicio_linhas.append(inicio)
+            resultado.fim_linhas.append(fim)
+            resultado.inicio_tokens.append(len(tokens))
+
+        return resultado
+
+    def analise_fluxo(self) -> Fluxo_Tokens:
+        """
+        Como analise_buffer, mas grava os tokens direto em um Fluxo_Tokens.
+        Apenas os Token de uma linha existem ao mesmo tempo.
+        """
+        texto = self.texto_fonte
+        fluxo = Fluxo_Tokens(texto)
+        tokens = []
+        adiciona = tokens.append
+        adiado = texto.isascii()
+
+        for inicio, fim in _linhas_brutas(texto):
+            tokens.clear()
+            try:
+                _analisar_trecho(texto, inicio, fim, adiciona, adiado, self.inteiro)
+            except ValueError as e:
+                fluxo.adiciona_erro(str(e), inicio, fim)
+                continue
+            if tokens:
+                fluxo.adiciona_linha(tokens, inicio, fim)
+
+        return fluxo
+
+
+def _linhas_brutas(texto: str):
+    """Gera os intervalos [inicio, fim) de cada linha do texto (sem o '\\n')."""
+    n = len(texto)
+    inicio = 0
+    while inicio <= n:
+        fim = texto.find('\n', inicio)
+        if fim < 0:
+            fim = n
+        yield inicio, fim
+        inicio = fim + 1
@@ -0,0 +1,237 @@
+# binario_tokens.py - Arquivo binário de tokens (tokens_gerados.bin)
+#
+# Guarda as mesmas linhas de tokens_gerados.txt em colunas de largura fixa,
+# para que outra etapa (RA2, ferramentas) leia os tokens sem analisar o
+# texto de novo e vá direto a qualquer linha. Formato (versão 1, little-endian):
+#
+#   cabeçalho (CABECALHO, 64 bytes): MAGICA, versão, reservado, nº de nomes,
+#       nº de linhas, nº de tokens e a posição de cada seção
+#   valores:  float64 por token (o número, o índice do nome em VARIAVEL, 0.0 nos demais)
+#   tipos:    uint8 por token (Tipo_de_Token; MARCA_INTEIRO marca número int do modo inteiro)
+#   linhas:   uint64 por linha + 1; a linha k ocupa os tokens [linhas[k], linhas[k + 1])
+#   nomes:    uint64 por nome + 1 (fim de cada nome no texto) e o texto UTF-8 dos nomes
+#
+# As seções de 8 bytes começam em posições múltiplas de 8. Tokens_Binario
+# mapeia o arquivo (mmap) e lê as colunas sem copiá-las: abrir um arquivo
+# enorme e pegar um trecho de linhas não depende do tamanho do resto.
+
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from .tokens import Token, Tipo_de_Token, LEXEMA_TIPO
+
+MAGICA = b"RA1TOKEN"
+VERSAO = 1
+CABECALHO = struct.Struct("<8sHHIQQQQQQ")
+MARCA_INTEIRO = 0x80
+TOKENS_POR_ESCRITA = 1 << 16
+
+
+def _alinha(arquivo) -> None:
+    """Completa com zeros até a próxima posição múltipla de 8."""
+    resto = arquivo.tell() % 8
+    if resto:
+        arquivo.write(bytes(8 - resto))
+
+
+class Saida_Tokens_Binario:
+    """
+    Monta um tokens_gerados.bin uma linha de cada vez (também no modo
+    --continuo). As colunas vão em blocos para SpooledTemporaryFile (em
+    memória até 'memoria_maxima' bytes, depois em disco); salva() escreve
+    o cabeçalho e as seções.
+    """
+
+    def __init__(self, memoria_maxima: int = 1 << 20):
+        self.colunas = [tempfile.SpooledTemporaryFile(max_size=memoria_maxima) for _ in range(3)]
+        self.valores = array('d')
+        self.tipos = array('B')
+        self.inicio_tokens = array('Q', [0])
+        self.nomes = []
+        self.indice_nomes = {}
+        self.linhas = 0
+        self.descarregados = 0      # tokens já passados para os arquivos temporários
+
+    def adiciona(self, tokens: Iterable[Token]) -> None:
+        """Acrescenta uma linha (o FIM, se houver, é descartado)."""
+        valores = self.valores
+        tipos = self.tipos
+        for token in tokens:
+            tipo = token.tipo
+            if tipo == Tipo_de_Token.NUMERO_REAL:
+                valor = token.valor
+                tipos.append(tipo | MARCA_INTEIRO if isinstance(valor, int) else tipo)
+                valores.append(valor)
+            elif tipo == Tipo_de_Token.VARIAVEL:
+                nome = token.valor
+                indice = self.indice_nomes.get(nome)
+                if indice is None:
+                    indice = self.indice_nomes[nome] = len(self.nomes)
+                    self.nomes.append(nome)
+                tipos.append(tipo)
+                valores.append(indice)
+            elif tipo != Tipo_de_Token.FIM:
+                tipos.append(tipo)
+                valores.append(0.0)
+        self.linhas += 1
+        self.inicio_tokens.append(self.descarregados + len(tipos))
+        if len(tipos) >= TOKENS_POR_ESCRITA:
+            self._descarrega()
+
+    def _descarrega(self) -> None:
+        """Passa os blocos em memória para os arquivos temporários."""
+        arquivo_valores, arquivo_tipos, arquivo_linhas = self.colunas
+        self.valores.tofile(arquivo_valores)
+        self.tipos.tofile(arquivo_tipos)
+        self.inicio_tokens.tofile(arquivo_linhas)
+        self.descarregados += len(self.tipos)
+        self.valores = array('d')
+        self.tipos = array('B')
+        self.inicio_tokens = array('Q')
+
+    def salva(self, nome_arquivo: str | Path) -> bool:
+        """Escreve o arquivo completo e descarta as colunas guardadas."""
+        try:
+            self._descarrega()
+            destino = Path(nome_arquivo)
+            destino.parent.mkdir(parents=True, exist_ok=True)
+
+            textos = [nome.encode("utf-8") for nome in self.nomes]
+            fim_nomes = array('Q')
+            total = 0
+            for texto in textos:
+                total += len(texto)
+                fim_nomes.append(total)
+
+            arquivo_valores, arquivo_tipos, arquivo_linhas = self.colunas
+            with destino.open("wb") as f:
+                f.write(bytes(CABECALHO.size))
+                posicoes = []
+                for coluna in self.colunas:
+                    _alinha(f)
+                    posicoes.append(f.tell())
+                    coluna.seek(0)
+                    shutil.copyfileobj(coluna, f)
+                _alinha(f)
+                posicoes.append(f.tell())
+                array('Q', [0]).tofile(f)
+                fim_nomes.tofile(f)
+                f.write(b"".join(textos))
+                f.seek(0)
+                f.write(CABECALHO.pack(MAGICA, VERSAO, 0, len(self.nomes), self.linhas, self.descarregados,
+                                       *posicoes))
+            return True
+        except Exception as e:
+            print(f'ERRO -> Falha ao escrever os tokens no arquivo binário: {e}')
+            return False
+        finally:
+            for coluna in self.colunas:
+                coluna.close()
+
+
+def salvarTokensBinario(tokens_por_linha: Iterable[Iterable[Token]], nome_arquivo: str | Path) -> bool:
+    """Como salvar_tokens, com os Token de cada linha e no formato binário."""
+    saida = Saida_Tokens_Binario()
+    for tokens in tokens_por_linha:
+        saida.adiciona(tokens)
+    return saida.salva(nome_arquivo)
+
+
+class Tokens_Binario:
+    """
+    Leitura de um tokens_gerados.bin mapeado em memória. 'tipos', 'valores'
+    e 'inicio_tokens' são memoryviews das colunas do arquivo; cada nome só
+    é decodificado na primeira vez em que aparece. Use com 'with' (ou
+    fecha()) para liberar o mapeamento.
+    """
+
+    def __init__(self, nome_arquivo: str | Path):
+        with open(nome_arquivo, "rb") as arquivo:
+            try:
+                self.mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"ERRO -> Arquivo de tokens binário vazio: {nome_arquivo}") from None
+        try:
+            self._abre(nome_arquivo)
+        except ValueError:
+            self.fecha()
+            raise
+
+    def _abre(self, nome_arquivo) -> None:
+        mapa = self.mapa
+        if len(mapa) < CABECALHO.size or mapa[:len(MAGICA)] != MAGICA:
+            raise ValueError(f"ERRO -> Não é um arquivo de tokens binário: {nome_arquivo}")
+        (_, versao, _, n_nomes, n_linhas, n_tokens,
+         pos_valores, pos_tipos, pos_linhas, pos_nomes) = CABECALHO.unpack_from(mapa)
+        if versao != VERSAO:
+            raise ValueError(f"ERRO -> Versão {versao} do arquivo de tokens binário não suportada (esperada {VERSAO})")
+        pos_texto_nomes = pos_nomes + 8 * (n_nomes + 1)
+        if (pos_valores + 8 * n_tokens > len(mapa) or pos_tipos + n_tokens > len(mapa)
+                or pos_linhas + 8 * (n_linhas + 1) > len(mapa) or pos_texto_nomes > len(mapa)):
+            raise ValueError(f"ERRO -> Arquivo de tokens binário incompleto: {nome_arquivo}")
+
+        self._visao = memoryview(mapa)
+        self.valores = self._visao[pos_valores:pos_valores + 8 * n_tokens].cast('d')
+        self.tipos = self._visao[pos_tipos:pos_tipos + n_tokens]
+        self.inicio_tokens = self._visao[pos_linhas:pos_linhas + 8 * (n_linhas + 1)].cast('Q')
+        self._fim_nomes = self._visao[pos_nomes:pos_texto_nomes].cast('Q')
+        self._pos_texto_nomes = pos_texto_nomes
+        self._nomes = [None] * n_nomes
+
+    def __len__(self):
+        return len(self.inicio_tokens) - 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fecha()
+
+    def fecha(self) -> None:
+        for visao in ("valores", "tipos", "inicio_tokens", "_fim_nomes", "_visao"):
+            if hasattr(self, visao):
+                getattr(self, visao).release()
+        self.mapa.close()
+
+    def nome(self, indice: int) -> str:
+        nome = self._nomes[indice]
+        if nome is None:
+            fim_nomes = self._fim_nomes
+            inicio = self._pos_texto_nomes + fim_nomes[indice]
+            fim = self._pos_texto_nomes + fim_nomes[indice + 1]
+            nome = self._nomes[indice] = sys.intern(self.mapa[inicio:fim].decode("utf-8"))
+        return nome
+
+    def tokens_linha(self, k: int) -> list[Token]:
+        """Os Token da linha k, terminando em FIM (como Tokens_Arquivo.tokens_linha)."""
+        tipos = self.tipos
+        valores = self.valores
+        tokens = []
+        for j in range(self.inicio_tokens[k], self.inicio_tokens[k + 1]):
+            codigo = tipos[j]
+            if codigo == Tipo_de_Token.NUMERO_REAL:
+                tokens.append(Token(codigo, valores[j]))
+            elif codigo == Tipo_de_Token.NUMERO_REAL | MARCA_INTEIRO:
+                tokens.append(Token(Tipo_de_Token.NUMERO_REAL, int(valores[j])))
+            elif codigo == Tipo_de_Token.VARIAVEL:
+                tokens.append(Token(codigo, self.nome(int(valores[j]))))
+            else:
+                tokens.append(Token(codigo, LEXEMA_TIPO[codigo]))
+        tokens.append(Token(Tipo_de_Token.FIM, None))
+        return tokens
+
+    def lexemas_linha(self, k: int) -> list[str]:
+        """Texto de cada token da linha, como gravado em tokens_gerados.txt."""
+        return [str(token.valor) for token in self.tokens_linha(k)[:-1]]
+
+    def linhas(self, inicio: int = 0, fim: int | None = None) -> Iterator[list[Token]]:
+        """Os Token de cada linha em [inicio, fim), sem ler as demais; fim passa de len() é cortado."""
+        fim = len(self) if fim is None else min(fim, len(self))
+        for k in range(inicio, fim):
+            yield self.tokens_linha(k)
@@ -0,0 +1,692 @@
+# compilador_rpn.py - Compila uma linha RPN para bytecode da máquina virtual
+#
+# Cada token RPN vira (quase) uma instrução de pilha. A profundidade da pilha
+# é conhecida em tempo de compilação, então os casos de operandos
+# insuficientes já viram a instrução de erro correspondente, e as estruturas
+# de controle viram saltos. A semântica é exatamente a de
+# executarExpressao/processarTokens (rpn_calc), inclusive as mensagens de erro
+# e a ordem em que são impressas.
+
+import operator
+
+from .tokens import Token, Tipo_de_Token, parear_parenteses
+from .fluxo_tokens import Linha_Fluxo
+from .memoria_rpn import SIMBOLOS, SLOT_FOR_COUNTER
+from .otimizador_rpn import dobrarConstantes
+from .memo_rpn import Unidade_Memo, Cache_Memo
+from .diagnosticos_rpn import Codigo_Diagnostico
+from .rpn_calc import (
+    MAX_ITERACOES, BLOCOS_ESTRUTURA,
+    OPERACOES_ARITMETICAS, OPERACOES_COMPARACAO, OPERACOES_LOGICAS,
+    TIPOS_CONTROLE, TIPOS_DELIMITADORES,
+)
+
+# ---------------------------------------------------------------
+# Instruções da máquina virtual (ver maquina_rpn.executarPrograma)
+# ---------------------------------------------------------------
+
+class Instrucao:
+    # Cada instrução é uma tupla (código, a, b); a pilha guarda floats.
+    CONST = 0            # empilha a
+    CARREGA = 1          # empilha o valor do slot a (b = nome da variável)
+    ARITMETICA = 2       # a = função; resultado arredondado, 0.0 em erro numérico
+    COMPARACAO = 3       # a = função; 1.0 / 0.0
+    LOGICA = 4           # a = função sobre dois bool; 1.0 / 0.0
+    NAO = 5
+    RES_INDICE = 6       # desempilha o índice; imprime erro se fora do histórico (b = índice do token)
+    RES_ULTIMO = 7       # a = imprime aviso se o histórico estiver vazio (b = índice do token)
+    ERRO = 8             # imprime a e empilha 0.0; b = (código do diagnóstico, índice do token)
+    ARREDONDA = 9        # arredondar_16bit no topo
+    DESCARTA = 10
+    GUARDA_TEMP = 11     # temps[a] = desempilha
+    CARREGA_TEMP = 12
+    ATRIBUI = 13         # slot a = topo (sem desempilhar); b = nome
+    INICIALIZA = 14      # marca o slot a como definido (vale 0.0 se ainda não existia)
+    SALTA = 15
+    SALTA_SE_ZERO = 16   # desempilha; salta para a se for 0.0
+    TENTA = 17           # início de estrutura: erro salta para a; b = (nome da estrutura, índice do token)
+    FIM_TENTA = 18
+    ENQUANTO_INICIO = 19 # zera o contador de iterações do laço a
+    ENQUANTO_TESTA = 20  # salta para b se o laço a já fez MAX_ITERACOES
+    PROXIMA = 21         # conta uma iteração do laço a (WHILE)
+    PARA_LIMITE = 22     # desempilha int(valor) para o campo b do laço a
+    PARA_INICIO = 23     # contador = inicial e cria _FOR_COUNTER
+    PARA_TESTA = 24      # salta para b se o FOR a terminou, senão atualiza _FOR_COUNTER
+    PARA_PROXIMA = 25    # contador += incremento
+    PARA_FIM = 26        # remove _FOR_COUNTER
+    RETORNA = 27
+    MANTEM_TOPO = 28     # remove os a valores abaixo do topo
+    MEMO_INICIO = 29     # a = Unidade_Memo; se o cache tiver o valor, empilha e pula b instruções
+    MEMO_FIM = 30        # guarda o topo no cache com a chave do MEMO_INICIO correspondente
+    PARA_FECHADO = 31    # a = Laco_Fechado do FOR b; se der para calcular sem iterar, empilha e salta para o PARA_FIM
+    ARITMETICA_DIRETA = 32  # a = função que já devolve o valor do modo (inteiro_rpn, meia_rpn); zero em erro numérico
+
+
+NOMES_INSTRUCOES = {valor: nome for nome, valor in vars(Instrucao).items() if not nome.startswith('_')}
+
+# Campos do estado de um FOR (ver PARA_LIMITE)
+PARA_INICIAL, PARA_FINAL, PARA_INCREMENTO, PARA_CONTADOR, PARA_ITERACOES = range(5)
+
+# Tipo do operador -> instrução pronta
+INSTRUCAO_BINARIA = {}
+for _tipo, _operacao in OPERACOES_ARITMETICAS.items():
+    INSTRUCAO_BINARIA[_tipo] = (Instrucao.ARITMETICA, _operacao, None)
+for _tipo, _operacao in OPERACOES_COMPARACAO.items():
+    INSTRUCAO_BINARIA[_tipo] = (Instrucao.COMPARACAO, _operacao, None)
+for _tipo, _operacao in OPERACOES_LOGICAS.items():
+    INSTRUCAO_BINARIA[_tipo] = (Instrucao.LOGICA, _operacao, None)
+
+
+NUMERO = Tipo_de_Token.NUMERO_REAL
+VARIAVEL = Tipo_de_Token.VARIAVEL
+ABRE = Tipo_de_Token.ABRE_PARENTESES
+FECHA = Tipo_de_Token.FECHA_PARENTESES
+RES = Tipo_de_Token.RES
+NOT = Tipo_de_Token.NOT
+
+CONST = Instrucao.CONST
+CARREGA = Instrucao.CARREGA
+CARREGA_TEMP = Instrucao.CARREGA_TEMP
+GUARDA_TEMP = Instrucao.GUARDA_TEMP
+
+
+class _Compilador:
+    """
+    Gera o bytecode de uma linha. Grupos (processarTokens) não têm saltos e são
+    montados em listas próprias; declarações e estruturas de controle são
+    escritas direto em self.codigo, onde os endereços dos saltos são absolutos.
+
+    Declarações, blocos e corpos são intervalos [inicio, fim) da linha; o fim
+    de cada bloco vem da tabela de parear_parenteses, sem nova contagem.
+    """
+
+    def __init__(self, tokens: list[Token], pares: list[int]):
+        self.tokens = tokens
+        self.pares = pares
+        self.codigo = []
+        self.num_temps = 0
+        self.num_lacos = 0
+        self.memo = None           # Cache_Memo: memoiza as expressões dentro de laços
+        self.arredondar = True     # False: sem ARREDONDA nem PARA_FECHADO (ver compilarLinha)
+        self.lacos_abertos = 0
+        self.originais = tokens    # tokens antes da dobra de constantes (índices dos diagnósticos)
+        self.indices = None
+
+    def emite(self, codigo: int, a=None, b=None) -> int:
+        self.codigo.append((codigo, a, b))
+        return len(self.codigo) - 1
+
+    def corrige(self, pc: int, a=None, b=None) -> None:
+        codigo, a_antigo, b_antigo = self.codigo[pc]
+        self.codigo[pc] = (codigo, a_antigo if a is None else a, b_antigo if b is None else b)
+
+    def emite_expressao(self, codigo: list) -> None:
+        """Emite o código de um grupo; dentro de laços, com memoização se ela estiver ligada."""
+        if self.memo is not None and self.lacos_abertos:
+            codigo = _memoizavel(codigo)
+        self.codigo += codigo
+
+    def emite_atribuicao(self, nome: str) -> None:
+        self.emite(Instrucao.ATRIBUI, SIMBOLOS.slot(nome), nome)
+
+    def indice(self, token: Token) -> int | None:
+        """Posição do token na linha original (None para os criados pela dobra de constantes)."""
+        if self.indices is None:
+            self.indices = {id(original): k for k, original in enumerate(self.originais)}
+        return self.indices.get(id(token))
+
+    def fecha(self, i: int, fim: int) -> int:
+        """Posição do ')' que fecha o '(' em i dentro de [.., fim) (fim se não fechar)."""
+        j = self.pares[i]
+        return j if j < fim else fim
+
+    # --- declarações (executarExpressao) ---
+
+    def declaracao(self, inicio: int, fim: int) -> None:
+        """Mesma decisão de executarExpressao; deixa o resultado no topo da pilha."""
+        limpos = [token for token in self.tokens[inicio:fim] if token.tipo not in TIPOS_DELIMITADORES]
+
+        if not limpos:
+            self.emite(CONST, 0.0)
+            return
+
+        # Atribuição simples (NUMERO VARIAVEL): valor sem arredondamento
+        if len(limpos) == 2 and limpos[0].tipo == NUMERO and limpos[1].tipo == VARIAVEL:
+            self.emite(CONST, float(limpos[0].valor))
+            self.emite_atribuicao(limpos[1].valor)
+            return
+
+        for token in limpos:
+            if token.tipo in TIPOS_CONTROLE:
+                self.estrutura(inicio, fim)
+                return
+
+        if len(limpos) >= 2 and limpos[-1].tipo == VARIAVEL:
+            self.emite_expressao(self.grupo(limpos, 0, len(limpos) - 1)[0])
+            self.emite_atribuicao(limpos[-1].valor)
+            return
+
+        self.emite_expressao(self.grupo(limpos, 0, len(limpos))[0])
+
+    def estrutura(self, inicio: int, fim: int) -> None:
+        """Mesma decisão de processarEstruturaControle."""
+        tokens = self.tokens
+        for i in range(inicio, fim):
+            tipo = tokens[i].tipo
+            if tipo in TIPOS_CONTROLE:
+                num_blocos, mensagem = BLOCOS_ESTRUTURA[tipo]
+                blocos = self.blocos(i + 1, fim, num_blocos)
+                if len(blocos) != num_blocos:
+                    self.emite(Instrucao.ERRO, mensagem, (Codigo_Diagnostico.ESTRUTURA_INCOMPLETA, self.indice(tokens[i])))
+                elif tipo == Tipo_de_Token.IFELSE:
+                    self.se_senao(blocos, self.indice(tokens[i]))
+                elif tipo == Tipo_de_Token.WHILE:
+                    self.enquanto(blocos, self.indice(tokens[i]))
+                else:
+                    self.para(blocos, self.indice(tokens[i]))
+                return
+        self.emite(CONST, 0.0)
+
+    def blocos(self, i: int, fim: int, num_blocos: int) -> list[tuple[int, int]]:
+        """Intervalos dos blocos, como em encontrar_blocos_controle (grupos sem fechamento não contam)."""
+        tokens = self.tokens
+        blocos = []
+        while i < fim and len(blocos) < num_blocos:
+            if tokens[i].tipo != ABRE:
+                i += 1
+                continue
+            j = self.pares[i]
+            if j >= fim:
+                break
+            blocos.append((i + 1, j))
+            i = j + 1
+        return blocos
+
+    def bloco(self, bloco: tuple[int, int]) -> None:
+        self.emite_expressao(self.grupo(self.tokens, *bloco)[0])
+
+    def se_senao(self, blocos: list, indice: int | None) -> None:
+        tenta = self.emite(Instrucao.TENTA, None, ("IFELSE", indice))
+        self.bloco(blocos[0])
+        salto_senao = self.emite(Instrucao.SALTA_SE_ZERO)
+        self.bloco(blocos[1])
+        salto_fim = self.emite(Instrucao.SALTA)
+        self.corrige(salto_senao, len(self.codigo))
+        self.bloco(blocos[2])
+        self.corrige(salto_fim, len(self.codigo))
+        self.emite(Instrucao.FIM_TENTA)
+        self.corrige(tenta, len(self.codigo))
+
+    def enquanto(self, blocos: list, indice: int | None) -> None:
+        laco = self.novo_laco()
+        tenta = self.emite(Instrucao.TENTA, None, ("WHILE", indice))
+        self.emite(Instrucao.ENQUANTO_INICIO, laco)
+        self.emite(CONST, 0.0)
+        teste = self.emite(Instrucao.ENQUANTO_TESTA, laco)
+        self.lacos_abertos += 1
+        self.bloco(blocos[0])
+        salto_fim = self.emite(Instrucao.SALTA_SE_ZERO)
+        self.emite(Instrucao.DESCARTA)
+        self.corpo(*blocos[1])
+        self.lacos_abertos -= 1
+        self.emite(Instrucao.PROXIMA, laco)
+        self.emite(Instrucao.SALTA, teste)
+        self.corrige(teste, b=len(self.codigo))
+        self.corrige(salto_fim, len(self.codigo))
+        self.emite(Instrucao.FIM_TENTA)
+        self.corrige(tenta, len(self.codigo))
+
+    def para(self, blocos: list, indice: int | None) -> None:
+        laco = self.novo_laco()
+        tenta = self.emite(Instrucao.TENTA, None, ("FOR", indice))
+        # Cada limite é convertido logo após ser avaliado, como no int() original
+        for campo, bloco in zip((PARA_INICIAL, PARA_FINAL, PARA_INCREMENTO), blocos):
+            self.bloco(bloco)
+            self.emite(Instrucao.PARA_LIMITE, laco, campo)
+        self.emite(Instrucao.PARA_INICIO, laco)
+        self.lacos_abertos += 1
+        inicio, fim = blocos[3]
+        corpo = None
+        fechado = None
+        if not any(token.tipo in TIPOS_CONTROLE for token in self.tokens[inicio:fim]):
+            # Sem estruturas o corpo não tem saltos: é compilado à parte e analisado
+            codigo = self.codigo
+            self.codigo = []
+            self.corpo(inicio, fim)
+            corpo, self.codigo = self.codigo, codigo
+            fechado = _laco_fechado(corpo) if self.arredondar else None
+            if fechado is not None:
+                self.emite(Instrucao.PARA_FECHADO, fechado, laco)
+        self.emite(CONST, 0.0)
+        teste = self.emite(Instrucao.PARA_TESTA, laco)
+        self.emite(Instrucao.DESCARTA)
+        if corpo is None:
+            self.corpo(inicio, fim)
+        else:
+            self.codigo += corpo
+        self.lacos_abertos -= 1
+        self.emite(Instrucao.PARA_PROXIMA, laco)
+        self.emite(Instrucao.SALTA, teste)
+        self.corrige(teste, b=len(self.codigo))
+        if fechado is not None:
+            fechado.destino = len(self.codigo)
+        self.emite(Instrucao.PARA_FIM)
+        self.emite(Instrucao.FIM_TENTA)
+        self.corrige(tenta, len(self.codigo))
+
+    def novo_laco(self) -> int:
+        self.num_lacos += 1
+        return self.num_lacos - 1
+
+    def corpo(self, inicio: int, fim: int) -> None:
+        """Mesma divisão em expressões de executarCorpoLoop; só o último valor fica na pilha."""
+        if inicio >= fim:
+            self.emite(CONST, 0.0)
+            return
+
+        tokens = self.tokens
+        primeira = True
+        i = inicio
+        while i < fim:
+            if tokens[i].tipo == ABRE:
+                j = self.fecha(i, fim)
+                if j > i + 1:
+                    if not primeira:
+                        self.emite(Instrucao.DESCARTA)
+                    primeira = False
+                    if tokens[j - 1].tipo == VARIAVEL:
+                        nome = tokens[j - 1].valor
+                        self.emite(Instrucao.INICIALIZA, SIMBOLOS.slot(nome), nome)
+                    self.declaracao(i + 1, j)
+                i = j + 1
+            else:
+                i += 1
+
+        if primeira:
+            self.emite_expressao(self.grupo(tokens, inicio, fim)[0])
+
+    # --- grupos (processarTokens) ---
+
+    def grupo(self, tokens: list[Token], inicio: int, fim: int) -> tuple[list, bool, bool]:
+        """
+        Código de processarTokens(tokens[inicio:fim]): deixa exatamente um valor
+        na pilha. Devolve também se o código pode imprimir alguma mensagem e se
+        o valor já sai arredondado (arredondar_16bit não o alteraria).
+
+        Os subgrupos são compilados de dentro para fora com uma pilha de grupos
+        abertos, sem recursão: o aninhamento não tem limite de profundidade.
+        """
+        abertos = []    # (itens do grupo de fora, posição do '(')
+        itens = []
+        for i in range(inicio, fim):
+            token = tokens[i]
+            tipo = token.tipo
+            if tipo == ABRE:
+                abertos.append((itens, i))
+                itens = []
+            elif tipo == FECHA and abertos:
+                itens = self._fecha_subgrupo(tokens, abertos, itens, i)
+            else:
+                itens.append(token)
+        # Grupos sem ')' vão até o fim
+        while abertos:
+            itens = self._fecha_subgrupo(tokens, abertos, itens, fim)
+        return self._compila_grupo(tokens, inicio, fim, itens)
+
+    def _fecha_subgrupo(self, tokens: list[Token], abertos: list, itens: list, fim: int) -> list:
+        """Compila o grupo aberto mais interno e devolve os itens do grupo de fora."""
+        externos, abre = abertos.pop()
+        if fim > abre + 1:
+            externos.append(self._compila_grupo(tokens, abre + 1, fim, itens))
+        return externos
+
+    def _compila_grupo(self, tokens: list[Token], inicio: int, fim: int, itens: list) -> tuple[list, bool, bool]:
+        """Código de um grupo cujos subgrupos já estão compilados (tuplas em 'itens')."""
+        n = fim - inicio
+        if not n:
+            return [(CONST, 0.0, None)], False, True
+
+        if n == 1:
+            token = tokens[inicio]
+            if token.tipo == NUMERO:
+                valor = float(token.valor)
+                return [(CONST, valor, None)], False, round(valor, 2) == valor
+            elif token.tipo == VARIAVEL:
+                return [(CARREGA, SIMBOLOS.slot(token.valor), token.valor)], False, False
+            elif token.tipo == RES:
+                return [(Instrucao.RES_ULTIMO, False, self.indice(token))], False, False
+            return [(CONST, 0.0, None)], False, True
+
+        if n == 2 and tokens[inicio].tipo == NUMERO and tokens[inicio + 1].tipo == RES:
+            return [(CONST, float(tokens[inicio].valor), None),
+                    (Instrucao.RES_INDICE, None, self.indice(tokens[inicio + 1]))], True, False
+
+        codigo = []
+        efeito = False
+        temps = None
+        if any(item.__class__ is tuple and item[1] for item in itens) and _pilha_imprime(itens):
+            # processarTokens avalia todos os subgrupos antes da pilha: os que
+            # imprimem vão antes, guardados em temporários
+            temps = {}
+            for k, item in enumerate(itens):
+                if item.__class__ is tuple and item[1]:
+                    codigo += item[0]
+                    codigo.append((GUARDA_TEMP, self.num_temps, None))
+                    temps[k] = self.num_temps
+                    self.num_temps += 1
+            efeito = True
+
+        # Para cada valor na pilha: onde começa o seu código e se ele imprime algo
+        inicios = []
+        efeitos = []
+        binarios = INSTRUCAO_BINARIA
+        arredondado = True     # o topo já está como arredondar_16bit o deixaria
+        for k, item in enumerate(itens):
+            if item.__class__ is tuple:
+                sub_codigo, sub_efeito, arredondado = item
+                inicios.append(len(codigo))
+                if temps is not None and k in temps:
+                    codigo.append((CARREGA_TEMP, temps[k], None))
+                    efeitos.append(False)
+                else:
+                    codigo += sub_codigo
+                    efeitos.append(sub_efeito)
+                    efeito = efeito or sub_efeito
+                continue
+            tipo = item.tipo
+            if tipo == NUMERO:
+                valor = float(item.valor)
+                inicios.append(len(codigo))
+                efeitos.append(False)
+                codigo.append((CONST, valor, None))
+                arredondado = round(valor, 2) == valor
+            elif tipo == VARIAVEL:
+                inicios.append(len(codigo))
+                efeitos.append(False)
+                codigo.append((CARREGA, SIMBOLOS.slot(item.valor), item.valor))
+                arredondado = False
+            elif tipo in binarios:
+                if len(inicios) >= 2:
+                    codigo.append(binarios[tipo])
+                    inicios.pop()
+                    efeito_b = efeitos.pop()
+                    efeitos[-1] = efeitos[-1] or efeito_b
+                else:
+                    inicios.append(len(codigo))
+                    efeitos.append(True)
+                    codigo.append((Instrucao.ERRO, f"ERRO -> Tokens insuficientes para o operador '{item.valor}'",
+                                   (Codigo_Diagnostico.OPERANDOS_INSUFICIENTES, self.indice(item))))
+                    efeito = True
+                arredondado = True
+            elif tipo == RES:
+                if inicios:
+                    codigo.append((Instrucao.RES_INDICE, None, self.indice(item)))
+                    efeitos[-1] = True
+                else:
+                    inicios.append(len(codigo))
+                    efeitos.append(True)
+                    codigo.append((Instrucao.RES_ULTIMO, True, self.indice(item)))
+                arredondado = False
+                efeito = True
+            elif tipo == NOT:
+                if inicios:
+                    codigo.append((Instrucao.NAO, None, None))
+                else:
+                    inicios.append(len(codigo))
+                    efeitos.append(True)
+                    codigo.append((Instrucao.ERRO, "ERRO -> Token insuficiente para o operador '!'",
+                                   (Codigo_Diagnostico.OPERANDOS_INSUFICIENTES, self.indice(item))))
+                    efeito = True
+                arredondado = True
+
+        profundidade = len(inicios)
+        if not profundidade:
+            codigo.append((CONST, 0.0, None))
+            return codigo, efeito, True
+
+        if profundidade > 1:
+            # Valores abaixo do topo são descartados: só o código dos que
+            # imprimem algo precisa ser mantido
+            mantidos = [k for k in range(profundidade - 1) if efeitos[k]]
+            if len(mantidos) < profundidade - 1:
+                inicios.append(len(codigo))
+                novo = codigo[:inicios[0]]
+                for k in mantidos:
+                    novo += codigo[inicios[k]:inicios[k + 1]]
+                novo += codigo[inicios[-2]:]
+                codigo = novo
+            if mantidos:
+                codigo.append((Instrucao.MANTEM_TOPO, len(mantidos), None))
+        if not arredondado and self.arredondar:
+            codigo.append((Instrucao.ARREDONDA, None, None))
+        return codigo, efeito, True
+
+
+# Instruções que não impedem a memoização e as que contam como trabalho poupado
+_INSTRUCOES_PURAS = frozenset((
+    Instrucao.CONST, Instrucao.CARREGA, Instrucao.ARITMETICA, Instrucao.COMPARACAO,
+    Instrucao.LOGICA, Instrucao.NAO, Instrucao.ARREDONDA, Instrucao.MANTEM_TOPO, Instrucao.ARITMETICA_DIRETA,
+))
+_INSTRUCOES_OPERACAO = frozenset((Instrucao.ARITMETICA, Instrucao.COMPARACAO, Instrucao.LOGICA, Instrucao.NAO,
+                                  Instrucao.ARITMETICA_DIRETA))
+
+# Abaixo disto a consulta ao cache custa mais do que recalcular
+MEMO_MINIMO_OPERACOES = 3
+
+
+def _memoizavel(codigo: list) -> list:
+    """
+    Envolve o código de um grupo em MEMO_INICIO/MEMO_FIM se ele for puro
+    (sem RES, mensagens ou temporários) e fizer operações suficientes.
+    """
+    slots = []
+    operacoes = 0
+    for operacao, a, _ in codigo:
+        if operacao not in _INSTRUCOES_PURAS:
+            return codigo
+        if operacao == CARREGA:
+            if a not in slots:
+                slots.append(a)
+        elif operacao in _INSTRUCOES_OPERACAO:
+            operacoes += 1
+    if operacoes < MEMO_MINIMO_OPERACOES:
+        return codigo
+    unidade = Unidade_Memo(tuple(slots))
+    return [(Instrucao.MEMO_INICIO, unidade, len(codigo) + 1)] + codigo + [(Instrucao.MEMO_FIM, None, None)]
+
+
+def _pilha_imprime(itens: list) -> bool:
+    """Indica se a parte de pilha de um grupo (sem os subgrupos) pode imprimir algo."""
+    profundidade = 0
+    for item in itens:
+        if item.__class__ is tuple:
+            profundidade += 1
+            continue
+        tipo = item.tipo
+        if tipo == NUMERO or tipo == VARIAVEL:
+            profundidade += 1
+        elif tipo in INSTRUCAO_BINARIA:
+            if profundidade < 2:
+                return True
+            profundidade -= 1
+        elif tipo == RES:
+            return True
+        elif tipo == NOT and not profundidade:
+            return True
+    return False
+
+
+# ---------------------------------------------------------------
+# FOR calculado sem iterar (ver maquina_rpn._calcula_laco_fechado)
+# ---------------------------------------------------------------
+#
+# Só acumuladores de parcela constante, como (P P 1 +), e declarações que
+# valem o da última iteração. Uma parcela que lê o contador, como em
+# (S S _FOR_COUNTER +), mudaria a cada iteração e pediria uma série (ou o
+# cálculo de todas as parcelas com executarLote); como o analisador léxico
+# não aceita '_', nenhuma linha lê _FOR_COUNTER (dependencias_rpn conta
+# com isso) e esses laços ficam com a execução normal.
+
+# Tipos de termo de um Laco_Fechado
+ULTIMO_VALOR = 0        # declaração recalculada só com os valores da última iteração
+ACUMULA_CONSTANTE = 1   # V = V ± c, c igual em todas as iterações
+
+_INSTRUCOES_UM_OPERANDO = frozenset((Instrucao.NAO, Instrucao.ARREDONDA))
+
+
+class Laco_Fechado:
+    """
+    Corpo de um FOR em que nada além dos acumuladores passa de uma iteração
+    para a seguinte. Cada termo é (tipo, slot atribuído ou None, Programa,
+    subtrai): o Programa calcula a declaração inteira (ULTIMO_VALOR) ou só a
+    parcela somada ao acumulador. 'destino' é o PARA_FIM do laço.
+    """
+
+    __slots__ = ("termos", "destino")
+
+    def __init__(self, termos: list[tuple]):
+        self.termos = termos
+        self.destino = None
+
+    def __repr__(self):
+        return f"Laco_Fechado({[(tipo, slot) for tipo, slot, _, _ in self.termos]})"
+
+
+def _valor_unico(codigo: list) -> bool:
+    """Indica se o código deixa exatamente um valor na pilha sem consumir nada que estava abaixo."""
+    profundidade = 0
+    for operacao, a, _ in codigo:
+        if operacao == CONST or operacao == CARREGA:
+            profundidade += 1
+        elif operacao in _INSTRUCOES_UM_OPERANDO:
+            if profundidade < 1:
+                return False
+        elif operacao == Instrucao.MANTEM_TOPO:
+            if profundidade < a + 1:
+                return False
+            profundidade -= a
+        else:
+            if profundidade < 2:
+                return False
+            profundidade -= 1
+    return profundidade == 1
+
+
+def _acumulacao(expressao: list, alvo: int | None) -> tuple[list, bool] | None:
+    """(código da parcela, subtrai) se a expressão for alvo + parcela, parcela + alvo ou alvo - parcela."""
+    if alvo is None or len(expressao) < 3:
+        return None
+    operacao, funcao, _ = expressao[-1]
+    if operacao != Instrucao.ARITMETICA or (funcao is not operator.add and funcao is not operator.sub):
+        return None
+    if expressao[0][0] == CARREGA and expressao[0][1] == alvo:
+        parcela = expressao[1:-1]
+    elif funcao is operator.add and expressao[-2][0] == CARREGA and expressao[-2][1] == alvo:
+        parcela = expressao[:-2]
+    else:
+        return None
+    if not _valor_unico(parcela):
+        return None
+    return parcela, funcao is operator.sub
+
+
+def _laco_fechado(corpo: list) -> Laco_Fechado | None:
+    """
+    Reconhece o código de um corpo de FOR (sem estruturas) que pode ser
+    calculado sem iterar: cada declaração é pura e ou acumula (V = V ± parcela,
+    com a parcela lendo só variáveis que o corpo não escreve) ou
+    só lê variáveis já escritas antes dela no próprio corpo, o contador e
+    variáveis que o corpo não escreve; então o valor final dela é o da
+    última iteração. Cada variável é escrita por uma declaração só.
+    """
+    declaracoes = [[]]
+    for instrucao in corpo:
+        operacao = instrucao[0]
+        if operacao == Instrucao.DESCARTA:
+            declaracoes.append([])
+        elif operacao != Instrucao.MEMO_INICIO and operacao != Instrucao.MEMO_FIM:
+            declaracoes[-1].append(instrucao)
+
+    escritas = {}   # slot -> declaração que o escreve
+    for k, declaracao in enumerate(declaracoes):
+        for operacao, a, _ in declaracao:
+            if operacao == Instrucao.ATRIBUI:
+                if a in escritas or a == SLOT_FOR_COUNTER:
+                    return None
+                escritas[a] = k
+            elif operacao != Instrucao.INICIALIZA and operacao not in _INSTRUCOES_PURAS:
+                return None
+
+    termos = []
+    for k, declaracao in enumerate(declaracoes):
+        alvo = declaracao[-1][1] if declaracao[-1][0] == Instrucao.ATRIBUI else None
+        expressao = [instrucao for instrucao in declaracao
+                     if instrucao[0] != Instrucao.INICIALIZA and instrucao[0] != Instrucao.ATRIBUI]
+        acumulacao = _acumulacao(expressao, alvo)
+        if acumulacao is not None:
+            parcela, subtrai = acumulacao
+            lidos = {a for operacao, a, _ in parcela if operacao == CARREGA}
+            # Parcela que lê o contador: laço normal (ver o comentário acima de Laco_Fechado)
+            if lidos & escritas.keys() or SLOT_FOR_COUNTER in lidos:
+                return None
+            termos.append((ACUMULA_CONSTANTE, alvo, Programa(parcela + [(Instrucao.RETORNA, None, None)], 0, 0),
+                           subtrai))
+            continue
+        for operacao, a, _ in expressao:
+            if operacao == CARREGA and escritas.get(a, -1) >= k:
+                return None
+        termos.append((ULTIMO_VALOR, alvo, Programa(declaracao + [(Instrucao.RETORNA, None, None)], 0, 0), False))
+    return Laco_Fechado(termos)
+
+
+# ---------------------------------------------------------------
+# Programa compilado
+# ---------------------------------------------------------------
+
+class Programa:
+    """Bytecode de uma linha, quantos temporários e laços ele usa e o cache das unidades memoizadas."""
+
+    __slots__ = ("codigo", "num_temps", "num_lacos", "memo")
+
+    def __init__(self, codigo: list, num_temps: int, num_lacos: int, memo: Cache_Memo | None = None):
+        self.codigo = codigo
+        self.num_temps = num_temps
+        self.num_lacos = num_lacos
+        self.memo = memo
+
+    def __repr__(self):
+        return "\n".join(_formata_instrucao(pc, instrucao) for pc, instrucao in enumerate(self.codigo))
+
+
+def _formata_instrucao(pc: int, instrucao: tuple) -> str:
+    codigo, a, b = instrucao
+    argumentos = " ".join(repr(getattr(x, "__name__", x)) for x in (a, b) if x is not None)
+    return f"{pc:4d} {NOMES_INSTRUCOES[codigo]} {argumentos}".rstrip()
+
+
+def compilarLinha(tokens, pares: list[int] | None = None, memo: Cache_Memo | None = None,
+                  arredondar: bool = True) -> Programa:
+    """
+    Compila uma linha (lista de tokens ou Linha_Fluxo, como em executarExpressao)
+    para bytecode, depois da dobra de constantes. arredondar=False é para os
+    modos que não arredondam para 2 casas (inteiro_rpn, meia_rpn): sem a dobra
+    (que calcula em float), sem ARREDONDA e sem PARA_FECHADO. 'pares' é a tabela de parênteses da linha, se o
+    analisador já a produziu (analise(pares=True)); senão é montada aqui.
+    Com 'memo', as expressões puras dentro de WHILE/FOR consultam esse cache
+    antes de serem calculadas.
+    """
+    if isinstance(tokens, Linha_Fluxo):
+        tokens = tokens.para_tokens()
+    originais = tokens
+    dobrados = dobrarConstantes(tokens) if arredondar else tokens
+    if dobrados is not tokens:
+        tokens, pares = dobrados, None
+    if pares is None:
+        pares = parear_parenteses(tokens)
+    compilador = _Compilador(tokens, pares)
+    compilador.memo = memo
+    compilador.arredondar = arredondar
+    compilador.originais = originais
+    compilador.declaracao(0, len(tokens))
+    compilador.emite(Instrucao.RETORNA)
+    return Programa(compilador.codigo, compilador.num_temps, compilador.num_lacos, memo)
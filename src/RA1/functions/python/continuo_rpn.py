@@ -0,0 +1,149 @@
+# continuo_rpn.py - Leitura e análise do arquivo uma linha de cada vez (--continuo)
+#
+# lerLinhas lê o arquivo sob demanda e analisarLinhas analisa cada linha só
+# quando ela é pedida; exibirResultados avalia a linha, grava seus tokens e a
+# passa ao Assembly (assembly.Saida_Assembly) antes de a próxima ser lida.
+# Nada guarda o arquivo inteiro: a primeira linha é avaliada antes de o
+# arquivo terminar de ser lido e a memória não cresce com o número de linhas
+# (a não ser pelo histórico do RES, que --historico N limita).
+#
+# lerLinhasMapeadas faz o mesmo com o arquivo mapeado em memória (mmap): só
+# um trecho de cerca de BYTES_POR_BLOCO é recortado por vez, em bytes, e uma
+# linha só ASCII vai direto ao analisador sem ser decodificada. As páginas
+# já lidas são devolvidas ao sistema a cada BYTES_POR_LIBERACAO, então nem o
+# arquivo fica na memória.
+#
+# Cada bloco é copiado do mmap uma vez (mapa[inicio:fim]) e depois partido em
+# linhas por bytes.split, que copia de novo cada linha. A cópia é deliberada:
+# os Token guardam a fonte da linha para extrair o lexema, e views
+# (memoryview) do mapa presas a eles impediriam fechar o mmap e tornariam a
+# liberação das páginas (MADV_DONTNEED) insegura. Recortar linha a linha direto
+# do mapa, com find e uma fatia por linha, evita a cópia do bloco mas fica
+# cerca de 4x mais lento num arquivo de um milhão de linhas curtas, porque o
+# laço sai do C; o bloco de BYTES_POR_BLOCO limita a cópia extra a 1 MiB.
+
+import mmap
+from collections.abc import Iterable, Iterator
+
+from .analisador_tabela import Analisador_Lexico_Tabela, Tokens_Arquivo
+from .fluxo_tokens import Fluxo_Tokens, linhaArquivo
+
+# Tamanho aproximado de cada trecho recortado do arquivo mapeado e o
+# intervalo (em bytes do arquivo) entre as liberações das páginas já lidas
+BYTES_POR_BLOCO = 1 << 20
+BYTES_POR_LIBERACAO = 1 << 24
+
+
+class Linha_Lida:
+    """
+    Uma linha não vazia do arquivo: o texto (sem espaços nas pontas) e os
+    tokens (terminando em FIM) com seus lexemas, ou a mensagem de erro léxico.
+    """
+
+    __slots__ = ("texto", "tokens", "lexemas", "erro")
+
+    def __init__(self, texto: str, tokens=None, lexemas: list[str] | None = None, erro: str | None = None):
+        self.texto = texto
+        self.tokens = tokens
+        self.lexemas = lexemas
+        self.erro = erro
+
+    def __repr__(self):
+        if self.erro is not None:
+            return f"Linha_Lida({self.texto!r}, erro={self.erro!r})"
+        return f"Linha_Lida({self.texto!r}, {self.lexemas})"
+
+
+def lerLinhas(nomeArquivo: str) -> Iterator[str]:
+    """Linhas do arquivo (sem o '\\n'), lidas só quando pedidas."""
+    try:
+        with open(nomeArquivo, 'r', encoding="utf-8") as arquivo:
+            for linha in arquivo:
+                yield linha.rstrip('\n')
+    except FileNotFoundError:
+        print(f'ERRO -> Arquivo não encontrado: {nomeArquivo}')
+
+
+def lerLinhasMapeadas(nomeArquivo: str) -> Iterator[bytes]:
+    """
+    Linhas do arquivo em bytes (sem o '\\n'), recortadas de um mmap em
+    blocos de BYTES_POR_BLOCO que terminam em fim de linha. '\\r\\n' e '\\r'
+    também terminam a linha, como na leitura em modo texto de lerLinhas.
+    Cada bloco é copiado do mapa antes de ser partido (ver o comentário do
+    módulo): as linhas entregues não dependem do mmap continuar aberto.
+    """
+    try:
+        with open(nomeArquivo, 'rb') as arquivo:
+            try:
+                mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Arquivo vazio: não há o que mapear
+                return
+    except FileNotFoundError:
+        print(f'ERRO -> Arquivo não encontrado: {nomeArquivo}')
+        return
+
+    with mapa:
+        liberar = hasattr(mmap, "MADV_DONTNEED")
+        if liberar:
+            mapa.madvise(mmap.MADV_SEQUENTIAL)
+        n = len(mapa)
+        inicio = liberado = 0
+        while inicio < n:
+            fim = n
+            if n - inicio > BYTES_POR_BLOCO:
+                # O bloco vai até o último '\n' antes do limite (ou além, se a linha for maior)
+                fim = mapa.rfind(b'\n', inicio, inicio + BYTES_POR_BLOCO)
+                if fim < 0:
+                    fim = mapa.find(b'\n', inicio + BYTES_POR_BLOCO)
+                    if fim < 0:
+                        fim = n
+            bloco = mapa[inicio:fim]
+            inicio = fim + 1
+            if b'\r' in bloco:
+                for linha in bloco.split(b'\n'):
+                    yield from linha.removesuffix(b'\r').split(b'\r')
+            else:
+                yield from bloco.split(b'\n')
+            if liberar and inicio - liberado >= BYTES_POR_LIBERACAO:
+                # Os blocos já foram copiados: as páginas lidas podem sair da memória
+                pagina = min(inicio, n) // mmap.PAGESIZE * mmap.PAGESIZE
+                mapa.madvise(mmap.MADV_DONTNEED, liberado, pagina - liberado)
+                liberado = pagina
+
+
+def analisarLinhas(linhas: Iterable[str | bytes], inteiro: bool = False) -> Iterator[Linha_Lida]:
+    """
+    Analisa cada linha quando ela é pedida; linhas em branco são puladas,
+    como em parseArquivo. Um erro léxico vira uma Linha_Lida com 'erro'.
+    Linhas em bytes (lerLinhasMapeadas) só são decodificadas se não forem
+    ASCII; as demais vão em bytes ao analisador.
+    """
+    for linha in linhas:
+        if isinstance(linha, bytes) and not linha.isascii():
+            linha = linha.decode("utf-8")
+        try:
+            tokens = Analisador_Lexico_Tabela(linha, inteiro).analise()
+        except ValueError as e:
+            yield Linha_Lida(_texto(linha), erro=str(e))
+            continue
+        if len(tokens) == 1:
+            continue
+        yield Linha_Lida(_texto(linha), tokens, [str(token.valor) for token in tokens[:-1]])
+
+
+def _texto(linha: str | bytes) -> str:
+    """Texto da linha sem espaços nas pontas (bytes aqui são sempre ASCII)."""
+    if isinstance(linha, bytes):
+        return linha.decode("ascii").strip()
+    return linha.strip()
+
+
+def linhasArquivo(arquivo: Tokens_Arquivo | Fluxo_Tokens) -> Iterator[Linha_Lida]:
+    """Linha_Lida de cada linha de um arquivo já analisado (parseArquivo/parseArquivoFluxo)."""
+    for k in range(len(arquivo)):
+        erro = arquivo.erros.get(k)
+        if erro is not None:
+            yield Linha_Lida(arquivo.texto_linha(k), erro=erro)
+        else:
+            yield Linha_Lida(arquivo.texto_linha(k), linhaArquivo(arquivo, k), arquivo.lexemas_linha(k))
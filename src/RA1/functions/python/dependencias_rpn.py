@@ -0,0 +1,126 @@
+# dependencias_rpn.py - Acessos de cada linha e grafo de dependências entre linhas
+#
+# Uma passada sobre os tokens de cada linha dá as variáveis que ela pode ler
+# e escrever e as posições do histórico que o RES pode consultar. A análise é
+# conservadora: na dúvida, a linha lê (ou escreve) mais do que de fato faz.
+# _FOR_COUNTER não entra: o analisador léxico não aceita '_', então nenhuma
+# linha o lê, e cada FOR o cria e o remove.
+
+from .tokens import Token, Tipo_de_Token
+from .fluxo_tokens import Linha_Fluxo
+from .rpn_calc import TIPOS_DELIMITADORES
+
+NUMERO = Tipo_de_Token.NUMERO_REAL
+VARIAVEL = Tipo_de_Token.VARIAVEL
+ABRE = Tipo_de_Token.ABRE_PARENTESES
+RES = Tipo_de_Token.RES
+
+
+class Acessos_Linha:
+    """
+    Variáveis lidas e escritas por uma linha e os deslocamentos do histórico
+    que ela consulta (1 = linha anterior); historico None = qualquer posição.
+    """
+
+    __slots__ = ("leituras", "escritas", "historico")
+
+    def __init__(self, leituras: frozenset[str], escritas: frozenset[str], historico: frozenset[int] | None):
+        self.leituras = leituras
+        self.escritas = escritas
+        self.historico = historico
+
+    def __repr__(self):
+        historico = "qualquer" if self.historico is None else sorted(self.historico)
+        return f"Acessos_Linha(leituras={sorted(self.leituras)}, escritas={sorted(self.escritas)}, historico={historico})"
+
+
+def _indice_res(token: Token) -> set[int]:
+    """Deslocamento consultado por 'N RES' com N literal (int() como no RES; inválido não consulta nada)."""
+    try:
+        idx = int(float(token.valor))
+    except (ValueError, OverflowError):
+        return set()
+    return {idx} if idx > 0 else set()
+
+
+def analisarAcessos(tokens) -> Acessos_Linha:
+    """
+    Leituras, escritas e consultas ao histórico de uma linha.
+
+    Escrita: variável seguida de parêntese ou do fim da linha (alvo de uma
+    atribuição; sobra alguma leitura contada como escrita, o que só acrescenta
+    dependências). Toda variável conta como leitura.
+    RES: o índice é o topo da pilha. Um número logo antes dá o índice; RES no
+    início da linha é o último resultado; depois de '(' pode ser qualquer um
+    dos dois (os parênteses da declaração são removidos, os dos blocos não).
+    Qualquer outro caso pode consultar qualquer posição.
+    """
+    if isinstance(tokens, Linha_Fluxo):
+        tokens = tokens.para_tokens()
+    leituras = set()
+    escritas = set()
+    historico = set()
+    anterior = None     # token imediatamente anterior
+    operando = None     # último token que não é parêntese
+    for token in tokens:
+        tipo = token.tipo
+        if tipo in TIPOS_DELIMITADORES:
+            if anterior is not None and anterior.tipo == VARIAVEL:
+                escritas.add(anterior.valor)
+        elif tipo == VARIAVEL:
+            leituras.add(token.valor)
+        elif tipo == RES and historico is not None:
+            if anterior is not None and anterior.tipo == NUMERO:
+                historico |= _indice_res(anterior)
+            elif operando is None:
+                historico.add(1)
+            elif anterior.tipo == ABRE and operando.tipo == NUMERO:
+                historico |= _indice_res(operando)
+                historico.add(1)
+            else:
+                historico = None
+        anterior = token
+        if tipo not in TIPOS_DELIMITADORES:
+            operando = token
+    if anterior is not None and anterior.tipo == VARIAVEL:
+        escritas.add(anterior.valor)
+    return Acessos_Linha(frozenset(leituras), frozenset(escritas),
+                         None if historico is None else frozenset(historico))
+
+
+def grafoDependencias(acessos: list[Acessos_Linha | None]) -> list[list[int] | range]:
+    """
+    Para cada linha, as linhas anteriores que precisam ser avaliadas antes
+    dela: quem escreveu uma variável que ela lê ou escreve, quem leu uma
+    variável que ela escreve e as linhas cujo resultado ela consulta pelo RES.
+    Uma linha que pode consultar qualquer posição do histórico depende de
+    todas as anteriores (range(i)). None = linha sem acessos (erro léxico).
+
+    Basta a última escrita de cada variável e as leituras feitas depois dela:
+    as anteriores já são dependências (transitivas) dessa escrita.
+    """
+    ultima_escrita = {}
+    leituras_desde = {}
+    dependencias = []
+    for i, linha in enumerate(acessos):
+        if linha is None:
+            dependencias.append([])
+            continue
+        if linha.historico is None:
+            dependencias.append(range(i))
+        else:
+            deps = {i - k for k in linha.historico if k <= i}
+            for nome in linha.leituras | linha.escritas:
+                j = ultima_escrita.get(nome)
+                if j is not None:
+                    deps.add(j)
+            for nome in linha.escritas:
+                deps.update(leituras_desde.get(nome, ()))
+            deps.discard(i)
+            dependencias.append(sorted(deps))
+        for nome in linha.escritas:
+            ultima_escrita[nome] = i
+            leituras_desde[nome] = []
+        for nome in linha.leituras:
+            leituras_desde.setdefault(nome, []).append(i)
+    return dependencias
@@ -0,0 +1,103 @@
+# diagnosticos_rpn.py - Coleta das mensagens de erro da avaliação em vez de print()
+#
+# Com um Coletor_Diagnosticos, a máquina virtual registra cada erro (operandos
+# insuficientes, RES fora do histórico, erro dentro de uma estrutura...) com
+# um código, a linha e a posição do token, em vez de imprimir a mensagem.
+# Os primeiros diagnósticos ficam guardados inteiros, um por local (linha,
+# token e código: um operador dentro de um laço falha a cada iteração, mas
+# aparece uma vez com o número de repetições); todos entram na contagem por
+# código.
+
+from collections import Counter
+
+
+class Codigo_Diagnostico:
+    OPERANDOS_INSUFICIENTES = "OPERANDOS_INSUFICIENTES"   # operador sem operandos na pilha
+    HISTORICO_VAZIO = "HISTORICO_VAZIO"                   # RES antes do primeiro resultado
+    INDICE_HISTORICO = "INDICE_HISTORICO"                 # N RES fora do histórico guardado
+    ESTRUTURA_INCOMPLETA = "ESTRUTURA_INCOMPLETA"         # IFELSE/WHILE/FOR sem todos os blocos
+    ERRO_ESTRUTURA = "ERRO_ESTRUTURA"                     # exceção dentro de uma estrutura ("ERRO no X")
+    LEXICO = "LEXICO"                                     # linha com erro léxico, não avaliada
+    ORCAMENTO = "ORCAMENTO"                               # linha interrompida por um limite do orçamento
+
+
+class Diagnostico:
+    """
+    Um erro: código, mensagem (a mesma que seria impressa), linha e índice do
+    token na linha, e quantas vezes ocorreu nesse local.
+    """
+
+    __slots__ = ("codigo", "mensagem", "linha", "indice", "repeticoes")
+
+    def __init__(self, codigo: str, mensagem: str, linha: int | None, indice: int | None):
+        self.codigo = codigo
+        self.mensagem = mensagem
+        self.linha = linha
+        self.indice = indice
+        self.repeticoes = 1
+
+    def __repr__(self):
+        return f"Diagnostico({self.codigo}, linha={self.linha}, indice={self.indice}, {self.mensagem!r})"
+
+    def __str__(self):
+        onde = f"Linha {self.linha:02d}" if self.linha is not None else "Linha ?"
+        if self.indice is not None:
+            onde += f", token {self.indice}"
+        texto = f"{onde}: [{self.codigo}] {self.mensagem}"
+        if self.repeticoes > 1:
+            texto += f" ({self.repeticoes} vezes)"
+        return texto
+
+
+class Coletor_Diagnosticos:
+    """
+    Diagnósticos de uma execução. 'linha' é a linha em avaliação (quem
+    avalia o arquivo a atualiza); guarda o primeiro diagnóstico de cada
+    local (linha, token, código), até 'maximo' locais, e conta todos por
+    código e as linhas que tiveram algum.
+    """
+
+    __slots__ = ("maximo", "diagnosticos", "contadores", "linhas_com_erro", "linha", "_ultima_linha", "_locais")
+
+    def __init__(self, maximo: int = 100):
+        if maximo < 0:
+            raise ValueError(f"maximo deve ser >= 0 (recebido {maximo})")
+        self.maximo = maximo
+        self.diagnosticos = []
+        self.contadores = Counter()
+        self.linhas_com_erro = 0
+        self.linha = None
+        self._ultima_linha = None
+        self._locais = {}       # (linha, indice, codigo) -> Diagnostico guardado
+
+    def registra(self, codigo: str, mensagem: str, indice: int | None = None) -> None:
+        self.contadores[codigo] += 1
+        if self.linha != self._ultima_linha or self.linhas_com_erro == 0:
+            self.linhas_com_erro += 1
+            self._ultima_linha = self.linha
+        local = (self.linha, indice, codigo)
+        diagnostico = self._locais.get(local)
+        if diagnostico is not None:
+            diagnostico.repeticoes += 1
+        elif len(self.diagnosticos) < self.maximo:
+            diagnostico = self._locais[local] = Diagnostico(codigo, mensagem, self.linha, indice)
+            self.diagnosticos.append(diagnostico)
+
+    def __len__(self):
+        return sum(self.contadores.values())
+
+    def relatorio(self) -> str:
+        """Contagem por código e os diagnósticos guardados, um por linha de texto."""
+        total = len(self)
+        if not total:
+            return "Nenhum diagnóstico"
+        partes = [f"{total} diagnósticos em {self.linhas_com_erro} linhas"]
+        for codigo, quantidade in self.contadores.most_common():
+            partes.append(f"  {codigo}: {quantidade}")
+        if self.diagnosticos:
+            omitidos = total - sum(diagnostico.repeticoes for diagnostico in self.diagnosticos)
+            partes.append("Primeiros diagnósticos:" if omitidos else "Diagnósticos:")
+            partes.extend(f"  {diagnostico}" for diagnostico in self.diagnosticos)
+            if omitidos:
+                partes.append(f"  ... mais {omitidos}")
+        return "\n".join(partes)
@@ -0,0 +1,137 @@
+# fluxo_tokens.py - Representação compacta (colunar) de um arquivo de tokens
+
+import sys
+from array import array
+
+from .tokens import Token, Tipo_de_Token, LEXEMA_TIPO
+
+class Fluxo_Tokens:
+    """
+    Tokens de um arquivo em colunas (struct-of-arrays):
+    - tipos:   array('B') com o Tipo_de_Token de cada token
+    - valores: array('d') com o número (NUMERO_REAL) ou o índice em 'nomes' (VARIAVEL)
+    - nomes:   tabela de identificadores internados
+    A linha k ocupa as posições [inicio_tokens[k], inicio_tokens[k + 1]) (sem FIM).
+    """
+
+    def __init__(self, texto: str = ""):
+        self.texto = texto
+        self.tipos = array('B')
+        self.valores = array('d')
+        self.nomes = []
+        self.indice_nomes = {}
+        self.inicio_tokens = array('Q', [0])
+        self.inicio_linhas = array('Q')
+        self.fim_linhas = array('Q')
+        self.erros = {}
+
+    def __len__(self):
+        return len(self.inicio_tokens) - 1
+
+    def indice_nome(self, nome: str) -> int:
+        indice = self.indice_nomes.get(nome)
+        if indice is None:
+            indice = self.indice_nomes[nome] = len(self.nomes)
+            self.nomes.append(sys.intern(nome))
+        return indice
+
+    def adiciona_linha(self, tokens: list[Token], inicio: int = 0, fim: int = 0) -> None:
+        """Acrescenta uma linha de tokens (o FIM, se houver, é descartado)."""
+        tipos = self.tipos
+        valores = self.valores
+        for token in tokens:
+            tipo = token.tipo
+            if tipo == Tipo_de_Token.FIM:
+                continue
+            tipos.append(tipo)
+            if tipo == Tipo_de_Token.NUMERO_REAL:
+                valores.append(token.valor)
+            elif tipo == Tipo_de_Token.VARIAVEL:
+                valores.append(self.indice_nome(token.valor))
+            else:
+                valores.append(0.0)
+        self.inicio_tokens.append(len(tipos))
+        self.inicio_linhas.append(inicio)
+        self.fim_linhas.append(fim)
+
+    def adiciona_erro(self, mensagem: str, inicio: int = 0, fim: int = 0) -> None:
+        """Registra uma linha com erro léxico (sem tokens)."""
+        self.erros[len(self)] = mensagem
+        self.inicio_tokens.append(len(self.tipos))
+        self.inicio_linhas.append(inicio)
+        self.fim_linhas.append(fim)
+
+    def linha(self, k: int) -> "Linha_Fluxo":
+        return Linha_Fluxo(self, self.inicio_tokens[k], self.inicio_tokens[k + 1])
+
+    def texto_linha(self, k: int) -> str:
+        return self.texto[self.inicio_linhas[k]:self.fim_linhas[k]].strip()
+
+    def lexemas_linha(self, k: int) -> list[str]:
+        """Texto de cada token da linha, no mesmo formato de str(token.valor)."""
+        return self.linha(k).lexemas()
+
+    def tokens_linha(self, k: int) -> list[Token]:
+        return self.linha(k).para_tokens()
+
+
+class Linha_Fluxo:
+    """Visão (sem cópia) dos tokens de uma linha dentro de um Fluxo_Tokens."""
+
+    __slots__ = ("fluxo", "inicio", "fim")
+
+    def __init__(self, fluxo: Fluxo_Tokens, inicio: int, fim: int):
+        self.fluxo = fluxo
+        self.inicio = inicio
+        self.fim = fim
+
+    def __len__(self):
+        return self.fim - self.inicio
+
+    def __iter__(self):
+        """Os tokens da linha como Token (sem o FIM)."""
+        tokens = self.para_tokens()
+        tokens.pop()
+        return iter(tokens)
+
+    def lexemas(self) -> list[str]:
+        tipos = self.fluxo.tipos
+        valores = self.fluxo.valores
+        nomes = self.fluxo.nomes
+        lexemas = []
+        for j in range(self.inicio, self.fim):
+            codigo = tipos[j]
+            if codigo == Tipo_de_Token.NUMERO_REAL:
+                lexemas.append(str(valores[j]))
+            elif codigo == Tipo_de_Token.VARIAVEL:
+                lexemas.append(nomes[int(valores[j])])
+            else:
+                lexemas.append(LEXEMA_TIPO[codigo])
+        return lexemas
+
+    def para_tokens(self) -> list[Token]:
+        """Materializa a linha como lista de Token (terminada em FIM)."""
+        tipos = self.fluxo.tipos
+        valores = self.fluxo.valores
+        nomes = self.fluxo.nomes
+        tokens = []
+        for j in range(self.inicio, self.fim):
+            codigo = tipos[j]
+            if codigo == Tipo_de_Token.NUMERO_REAL:
+                tokens.append(Token(Tipo_de_Token.NUMERO_REAL, valores[j]))
+            elif codigo == Tipo_de_Token.VARIAVEL:
+                tokens.append(Token(Tipo_de_Token.VARIAVEL, nomes[int(valores[j])]))
+            else:
+                tokens.append(Token(codigo, LEXEMA_TIPO[codigo]))
+        tokens.append(Token(Tipo_de_Token.FIM, None))
+        return tokens
+
+
+def linhaArquivo(arquivo, k: int):
+    """
+    Os tokens da linha k de um arquivo analisado: Linha_Fluxo (sem cópia) de
+    um Fluxo_Tokens, lista de Token de um Tokens_Arquivo ou Tokens_Binario.
+    """
+    if isinstance(arquivo, Fluxo_Tokens):
+        return arquivo.linha(k)
+    return arquivo.tokens_linha(k)
@@ -0,0 +1,114 @@
+# inteiro_rpn.py - Modo inteiro: valores de 16 bits sem sinal, como no backend AVR
+#
+# Os arquivos de inputs/RA1/int só têm inteiros, e o Assembly gerado para o
+# Arduino calcula em 16 bits: soma, subtração, multiplicação e potência ficam
+# com os 16 bits de baixo (& 0xFFFF), divisão e resto são sem sinal (divisão
+# por zero dá 0xFFFF e resto por zero devolve o dividendo, como divide_int e
+# modulo_int) e <, >, <=, >= comparam com sinal (brlt/brge). Aqui a linha é
+# compilada pelo compilador_rpn sem arredondar (compilarLinha(arredondar=False))
+# e o bytecode é executado pela máquina virtual no MODO_INTEIRO, sobre ints,
+# sem float() nem round(): as variáveis e o histórico ficam em array('H')
+# (Memoria_Slots(inteiro=True)).
+
+from .tokens import Tipo_de_Token
+from .compilador_rpn import Instrucao, Programa, compilarLinha
+from .memoria_rpn import Memoria_Slots, Historico, CHAVE_HISTORICO, TIPO_INTEIRO
+from .maquina_rpn import Modo_Numerico, executarPrograma
+from .diagnosticos_rpn import Coletor_Diagnosticos
+from .rpn_calc import OPERACOES_ARITMETICAS, OPERACOES_COMPARACAO
+
+MASCARA_16BIT = 0xFFFF
+SINAL_16BIT = 0x8000
+
+
+def inteiro16(valor) -> int:
+    """Valor como o AVR o guarda: int(float(valor)) nos 16 bits de baixo (inf/nan viram 0)."""
+    try:
+        return int(float(valor)) & MASCARA_16BIT
+    except (ValueError, OverflowError):
+        return 0
+
+
+def _dividir(x: int, y: int) -> int:
+    return x // y if y else MASCARA_16BIT
+
+def _resto(x: int, y: int) -> int:
+    return x % y if y else x
+
+OPERACOES_INTEIRAS = {
+    Tipo_de_Token.SOMA: lambda x, y: (x + y) & MASCARA_16BIT,
+    Tipo_de_Token.SUBTRACAO: lambda x, y: (x - y) & MASCARA_16BIT,
+    Tipo_de_Token.MULTIPLICACAO: lambda x, y: (x * y) & MASCARA_16BIT,
+    Tipo_de_Token.DIVISAO: _dividir,
+    Tipo_de_Token.RESTO: _resto,
+    Tipo_de_Token.POTENCIA: lambda x, y: pow(x, y, MASCARA_16BIT + 1),
+}
+
+# Com o bit de sinal invertido, a ordem sem sinal é a ordem com sinal
+COMPARACOES_INTEIRAS = {
+    Tipo_de_Token.MENOR: lambda x, y: (x ^ SINAL_16BIT) < (y ^ SINAL_16BIT),
+    Tipo_de_Token.MAIOR: lambda x, y: (x ^ SINAL_16BIT) > (y ^ SINAL_16BIT),
+    Tipo_de_Token.IGUAL: lambda x, y: x == y,
+    Tipo_de_Token.MENOR_IGUAL: lambda x, y: (x ^ SINAL_16BIT) <= (y ^ SINAL_16BIT),
+    Tipo_de_Token.MAIOR_IGUAL: lambda x, y: (x ^ SINAL_16BIT) >= (y ^ SINAL_16BIT),
+    Tipo_de_Token.DIFERENTE: lambda x, y: x != y,
+}
+
+# Função do bytecode em float -> função inteira equivalente
+_TRADUCAO = {OPERACOES_ARITMETICAS[tipo]: operacao for tipo, operacao in OPERACOES_INTEIRAS.items()}
+_TRADUCAO.update({OPERACOES_COMPARACAO[tipo]: operacao for tipo, operacao in COMPARACOES_INTEIRAS.items()})
+
+CONST = Instrucao.CONST
+ARITMETICA = Instrucao.ARITMETICA
+COMPARACAO = Instrucao.COMPARACAO
+ARITMETICA_DIRETA = Instrucao.ARITMETICA_DIRETA
+
+
+def compilarLinhaInteira(tokens, pares: list[int] | None = None) -> Programa:
+    """
+    Bytecode da linha para o MODO_INTEIRO: constantes em 16 bits e operações
+    inteiras (ARITMETICA_DIRETA, sem round()); o FOR é sempre iterado.
+    """
+    programa = compilarLinha(tokens, pares, arredondar=False)
+    codigo = []
+    for operacao, a, b in programa.codigo:
+        if operacao == CONST:
+            a = inteiro16(a)
+        elif operacao == ARITMETICA:
+            operacao, a = ARITMETICA_DIRETA, _TRADUCAO[a]
+        elif operacao == COMPARACAO:
+            a = _TRADUCAO[a]
+        codigo.append((operacao, a, b))
+    return Programa(codigo, programa.num_temps, programa.num_lacos)
+
+
+def _memoria_inteira(memoria) -> Memoria_Slots:
+    """Cópia de um dict (ou de uma Memoria_Slots em float) com as variáveis e o histórico em 16 bits."""
+    slots = Memoria_Slots(inteiro=True)
+    for nome, valor in memoria.items():
+        if nome != CHAVE_HISTORICO:
+            slots[nome] = inteiro16(valor)
+    historico = memoria[CHAVE_HISTORICO] if CHAVE_HISTORICO in memoria else []
+    slots.historico = Historico.de_valores(map(inteiro16, historico), getattr(historico, "profundidade", None),
+                                           TIPO_INTEIRO)
+    return slots
+
+
+# Ints de 16 bits na pilha (erros empilham 0) e na memória
+MODO_INTEIRO = Modo_Numerico(0, 1, Memoria_Slots, TIPO_INTEIRO, _memoria_inteira)
+
+
+def executarProgramaInteiro(programa: Programa, memoria: Memoria_Slots | dict,
+                            diagnosticos: Coletor_Diagnosticos | None = None) -> int:
+    """
+    Executa o bytecode de compilarLinhaInteira na máquina virtual, no
+    MODO_INTEIRO. Uma memória que não seja Memoria_Slots(inteiro=True) é
+    convertida e atualizada no final.
+    """
+    return executarPrograma(programa, memoria, diagnosticos=diagnosticos, modo=MODO_INTEIRO)
+
+
+def executarLinhaInteira(tokens, memoria: Memoria_Slots | dict, pares: list[int] | None = None,
+                         diagnosticos: Coletor_Diagnosticos | None = None) -> int:
+    """Compila e executa uma linha no modo inteiro."""
+    return executarProgramaInteiro(compilarLinhaInteira(tokens, pares), memoria, diagnosticos)
@@ -1,5 +1,6 @@
 # io_utils.py
 
+import sys
 from pathlib import Path
 
 def lerArquivo(nomeArquivo: str):
@@ -10,7 +11,31 @@ def lerArquivo(nomeArquivo: str):
         print(f'ERRO -> Arquivo não encontrado: {nomeArquivo}')
         return []
 
-from pathlib import Path
+def lerTexto(nomeArquivo: str) -> str:
+    try:
+        with open(nomeArquivo, 'r', encoding="utf-8") as arquivo_teste:
+            return arquivo_teste.read()
+    except FileNotFoundError:
+        print(f'ERRO -> Arquivo não encontrado: {nomeArquivo}')
+        return ""
+
+class Saida_Lotes:
+    """Junta linhas de texto e as escreve no destino a cada 'linhas_por_lote' (um write por lote)."""
+
+    def __init__(self, destino=None, linhas_por_lote: int = 1024):
+        self.destino = sys.stdout if destino is None else destino
+        self.linhas_por_lote = linhas_por_lote
+        self.linhas = []
+
+    def escreve(self, texto: str) -> None:
+        self.linhas.append(texto)
+        if len(self.linhas) >= self.linhas_por_lote:
+            self.descarrega()
+
+    def descarrega(self) -> None:
+        if self.linhas:
+            self.destino.write("\n".join(self.linhas) + "\n")
+            self.linhas.clear()
 
 def salvar_tokens(tokens_por_linha, nome_arquivo: str | Path) -> bool:
     try:
@@ -0,0 +1,373 @@
+# jit_rpn.py - Traduz cada linha RPN para uma função Python compilada com compile()
+#
+# Os grupos (processarTokens) são traduzidos a partir do bytecode de
+# compilador_rpn com uma pilha simbólica: cada valor vira uma expressão
+# Python e só as instruções que imprimem viram comandos, na ordem original.
+# IFELSE/WHILE/FOR viram if/while de verdade dentro de try/except, e as
+# variáveis lidas pela linha são lidas dos seus slots (Memoria_Slots) uma
+# vez, para variáveis locais da função.
+# A semântica é a mesma da máquina virtual (maquina_rpn).
+
+import math
+import operator
+
+from .tokens import Tipo_de_Token, parear_parenteses
+from .fluxo_tokens import Linha_Fluxo
+from .compilador_rpn import _Compilador, Instrucao, compilarLinha, MAX_ITERACOES
+from .rpn_calc import (
+    BLOCOS_ESTRUTURA, NOME_ESTRUTURA, OPERACOES_COMPARACAO, OPERACOES_LOGICAS,
+    TIPOS_CONTROLE, TIPOS_DELIMITADORES,
+)
+from .maquina_rpn import executarPrograma
+from .otimizador_rpn import dobrarConstantes
+from .memoria_rpn import Historico, Memoria_Slots, SIMBOLOS, SLOT_FOR_COUNTER
+
+NUMERO = Tipo_de_Token.NUMERO_REAL
+VARIAVEL = Tipo_de_Token.VARIAVEL
+ABRE = Tipo_de_Token.ABRE_PARENTESES
+
+# Expressões Python equivalentes às operações (x e y já são expressões)
+_MODELOS = {
+    operator.add: "round({x} + {y}, 2)",
+    operator.sub: "round({x} - {y}, 2)",
+    operator.mul: "round({x} * {y}, 2)",
+}
+for _tipo, _modelo in (
+    (Tipo_de_Token.MENOR, "{x} < {y}"),
+    (Tipo_de_Token.MAIOR, "{x} > {y}"),
+    (Tipo_de_Token.IGUAL, "abs({x} - {y}) < 1e-10"),
+    (Tipo_de_Token.MENOR_IGUAL, "{x} <= {y}"),
+    (Tipo_de_Token.MAIOR_IGUAL, "{x} >= {y}"),
+    (Tipo_de_Token.DIFERENTE, "abs({x} - {y}) >= 1e-10"),
+):
+    _MODELOS[OPERACOES_COMPARACAO[_tipo]] = "(1.0 if " + _modelo + " else 0.0)"
+_MODELOS[OPERACOES_LOGICAS[Tipo_de_Token.AND]] = "(1.0 if {x} != 0.0 and {y} != 0.0 else 0.0)"
+_MODELOS[OPERACOES_LOGICAS[Tipo_de_Token.OR]] = "(1.0 if {x} != 0.0 or {y} != 0.0 else 0.0)"
+
+# Acima desta profundidade a expressão vai para uma variável temporária
+# (compile() tem limite de aninhamento)
+PROFUNDIDADE_MAXIMA = 30
+
+# --- funções auxiliares usadas pelo código gerado ---
+
+def _aritmetica(operacao, x: float, y: float) -> float:
+    # /, %, ^: mesmo tratamento de erro da instrução ARITMETICA
+    try:
+        return round(float(operacao(x, y)), 2)
+    except (ZeroDivisionError, ValueError, OverflowError):
+        return 0.0
+
+
+def _res_indice(historico: Historico, valor: float) -> float:
+    return historico.consulta(int(valor))
+
+
+def _res_ultimo(historico: Historico, avisa: bool) -> float:
+    if historico:
+        return historico[-1]
+    if avisa:
+        print("ERRO -> Histórico vazio")
+    return 0.0
+
+
+_AMBIENTE = {
+    '_aritmetica': _aritmetica,
+    '_res_indice': _res_indice,
+    '_res_ultimo': _res_ultimo,
+    '_INF': math.inf,
+    '_NAN': math.nan,
+}
+
+
+class _Gerador(_Compilador):
+    """
+    Gera o código-fonte Python de uma linha. Reaproveita do _Compilador a
+    localização dos blocos e o bytecode dos grupos; declarações e estruturas
+    são reescritas como comandos Python.
+    """
+
+    def __init__(self, tokens, pares):
+        super().__init__(tokens, pares)
+        self.linhas = []
+        self.recuo = 1
+        self.variaveis = {}      # slot -> variável local
+        self.constantes = {}     # objeto -> nome no ambiente da função
+        self.num_locais = 0
+
+    def escreve(self, linha: str) -> None:
+        self.linhas.append("    " * self.recuo + linha)
+
+    def novo_local(self, prefixo: str) -> str:
+        self.num_locais += 1
+        return f"{prefixo}{self.num_locais}"
+
+    def constante(self, objeto) -> str:
+        if objeto not in self.constantes:
+            self.constantes[objeto] = f"_k{len(self.constantes)}"
+        return self.constantes[objeto]
+
+    def literal(self, valor: float) -> str:
+        if math.isfinite(valor):
+            return repr(valor)
+        if valor != valor:
+            return "_NAN"
+        return "_INF" if valor > 0 else "-_INF"
+
+    def le(self, slot: int) -> str:
+        if slot not in self.variaveis:
+            self.variaveis[slot] = f"v{len(self.variaveis)}"
+        return self.variaveis[slot]
+
+    def atribui(self, nome: str, expressao: str) -> str:
+        slot = SIMBOLOS.slot(nome)
+        local = self.le(slot)
+        self.escreve(f"{local} = valores[{slot}] = {expressao}")
+        self.escreve(f"definidos[{slot}] = 1")
+        return local
+
+    def guarda(self, expressao: str) -> str:
+        """Avalia a expressão agora, em uma variável local."""
+        local = self.novo_local("r")
+        self.escreve(f"{local} = {expressao}")
+        return local
+
+    # --- grupos: bytecode sem saltos -> expressão ---
+
+    def expressao(self, codigo: list) -> str:
+        """Expressão Python do valor que o código do grupo deixa na pilha."""
+        pilha = []    # (expressão, profundidade)
+
+        def empilha(texto: str, profundidade: int) -> None:
+            if profundidade > PROFUNDIDADE_MAXIMA:
+                texto, profundidade = self.guarda(texto), 0
+            pilha.append((texto, profundidade))
+
+        for operacao, a, b in codigo:
+            if operacao == Instrucao.CONST:
+                pilha.append((self.literal(a), 0))
+            elif operacao == Instrucao.CARREGA:
+                pilha.append((self.le(a), 0))
+            elif operacao in (Instrucao.ARITMETICA, Instrucao.COMPARACAO, Instrucao.LOGICA):
+                y, py = pilha.pop()
+                x, px = pilha.pop()
+                modelo = _MODELOS.get(a)
+                if modelo is None:
+                    texto = f"_aritmetica({self.constante(a)}, {x}, {y})"
+                else:
+                    texto = modelo.format(x=f"({x})", y=f"({y})")
+                empilha(texto, max(px, py) + 1)
+            elif operacao == Instrucao.NAO:
+                x, px = pilha.pop()
+                empilha(f"(1.0 if ({x}) == 0.0 else 0.0)", px + 1)
+            elif operacao == Instrucao.ARREDONDA:
+                x, px = pilha.pop()
+                empilha(f"round({x}, 2)", px + 1)
+            elif operacao == Instrucao.RES_INDICE:
+                x, _ = pilha.pop()
+                pilha.append((self.guarda(f"_res_indice(historico, {x})"), 0))
+            elif operacao == Instrucao.RES_ULTIMO:
+                pilha.append((self.guarda(f"_res_ultimo(historico, {a})"), 0))
+            elif operacao == Instrucao.ERRO:
+                self.escreve(f"print({a!r})")
+                pilha.append(("0.0", 0))
+            elif operacao == Instrucao.GUARDA_TEMP:
+                x, _ = pilha.pop()
+                self.escreve(f"g{a} = {x}")
+            elif operacao == Instrucao.CARREGA_TEMP:
+                pilha.append((f"g{a}", 0))
+            elif operacao == Instrucao.MANTEM_TOPO:
+                del pilha[-a - 1:-1]
+        return pilha[-1][0]
+
+    def valor_grupo(self, tokens, inicio: int, fim: int) -> str:
+        return self.expressao(self.grupo(tokens, inicio, fim)[0])
+
+    # --- declarações e estruturas -> comandos ---
+
+    def declaracao(self, inicio: int, fim: int) -> str:
+        """Mesma decisão de executarExpressao; devolve a expressão do resultado."""
+        limpos = [token for token in self.tokens[inicio:fim] if token.tipo not in TIPOS_DELIMITADORES]
+
+        if not limpos:
+            return "0.0"
+
+        if len(limpos) == 2 and limpos[0].tipo == NUMERO and limpos[1].tipo == VARIAVEL:
+            return self.atribui(limpos[1].valor, self.literal(float(limpos[0].valor)))
+
+        for token in limpos:
+            if token.tipo in TIPOS_CONTROLE:
+                return self.estrutura(inicio, fim)
+
+        if len(limpos) >= 2 and limpos[-1].tipo == VARIAVEL:
+            return self.atribui(limpos[-1].valor, self.valor_grupo(limpos, 0, len(limpos) - 1))
+
+        return self.valor_grupo(limpos, 0, len(limpos))
+
+    def estrutura(self, inicio: int, fim: int) -> str:
+        """Mesma decisão de processarEstruturaControle."""
+        tokens = self.tokens
+        for i in range(inicio, fim):
+            tipo = tokens[i].tipo
+            if tipo in TIPOS_CONTROLE:
+                num_blocos, mensagem = BLOCOS_ESTRUTURA[tipo]
+                blocos = self.blocos(i + 1, fim, num_blocos)
+                if len(blocos) != num_blocos:
+                    self.escreve(f"print({mensagem!r})")
+                    return "0.0"
+                resultado = self.novo_local("r")
+                nome = NOME_ESTRUTURA[tipo]
+                self.escreve("try:")
+                self.recuo += 1
+                if tipo == Tipo_de_Token.IFELSE:
+                    self.se_senao(blocos, resultado)
+                elif tipo == Tipo_de_Token.WHILE:
+                    self.enquanto(blocos, resultado)
+                else:
+                    self.para(blocos, resultado)
+                self.recuo -= 1
+                self.escreve("except Exception as e:")
+                self.escreve(f"    print(f\"ERRO no {nome}: {{e}}\")")
+                self.escreve(f"    {resultado} = 0.0")
+                return resultado
+        return "0.0"
+
+    def se_senao(self, blocos: list, resultado: str) -> None:
+        condicao = self.valor_grupo(self.tokens, *blocos[0])
+        self.escreve(f"if ({condicao}) != 0.0:")
+        self.recuo += 1
+        self.escreve(f"{resultado} = {self.valor_grupo(self.tokens, *blocos[1])}")
+        self.recuo -= 1
+        self.escreve("else:")
+        self.recuo += 1
+        self.escreve(f"{resultado} = {self.valor_grupo(self.tokens, *blocos[2])}")
+        self.recuo -= 1
+
+    def enquanto(self, blocos: list, resultado: str) -> None:
+        iteracoes = self.novo_local("n")
+        self.escreve(f"{resultado} = 0.0")
+        self.escreve(f"{iteracoes} = 0")
+        self.escreve(f"while {iteracoes} < {MAX_ITERACOES}:")
+        self.recuo += 1
+        condicao = self.valor_grupo(self.tokens, *blocos[0])
+        self.escreve(f"if ({condicao}) == 0.0:")
+        self.escreve("    break")
+        self.escreve(f"{resultado} = {self.corpo(*blocos[1])}")
+        self.escreve(f"{iteracoes} += 1")
+        self.recuo -= 1
+
+    def para(self, blocos: list, resultado: str) -> None:
+        # Cada limite é convertido logo após ser avaliado, como no int() original
+        limites = []
+        for bloco in blocos[:3]:
+            limites.append(self.guarda(f"int({self.valor_grupo(self.tokens, *bloco)})"))
+        inicial, final, incremento = limites
+        contador = self.novo_local("c")
+        iteracoes = self.novo_local("n")
+        self.escreve(f"{incremento} = {incremento} or 1")
+        self.escreve(f"{contador} = {inicial}")
+        self.escreve(f"valores[{SLOT_FOR_COUNTER}] = {contador}")
+        self.escreve(f"definidos[{SLOT_FOR_COUNTER}] = 1")
+        self.escreve(f"{resultado} = 0.0")
+        self.escreve(f"{iteracoes} = 0")
+        self.escreve(f"while {contador} < {final} and {iteracoes} < {MAX_ITERACOES}:")
+        self.recuo += 1
+        self.escreve(f"valores[{SLOT_FOR_COUNTER}] = {contador}")
+        self.escreve(f"{resultado} = {self.corpo(*blocos[3])}")
+        self.escreve(f"{contador} += {incremento}")
+        self.escreve(f"{iteracoes} += 1")
+        self.recuo -= 1
+        self.escreve(f"valores[{SLOT_FOR_COUNTER}] = 0.0")
+        self.escreve(f"definidos[{SLOT_FOR_COUNTER}] = 0")
+
+    def corpo(self, inicio: int, fim: int) -> str:
+        """Mesma divisão em expressões de executarCorpoLoop; devolve o valor da última."""
+        if inicio >= fim:
+            return "0.0"
+
+        tokens = self.tokens
+        resultado = None
+        i = inicio
+        while i < fim:
+            if tokens[i].tipo == ABRE:
+                j = self.fecha(i, fim)
+                if j > i + 1:
+                    if tokens[j - 1].tipo == VARIAVEL:
+                        # Slot ainda não definido já vale 0.0
+                        self.escreve(f"definidos[{SIMBOLOS.slot(tokens[j - 1].valor)}] = 1")
+                    resultado = self.declaracao(i + 1, j)
+                i = j + 1
+            else:
+                i += 1
+
+        if resultado is None:
+            return self.valor_grupo(tokens, inicio, fim)
+        return resultado
+
+    def fonte(self, resultado: str) -> str:
+        cabecalho = [
+            "def linha(memoria):",
+            "    valores = memoria.valores",
+            "    definidos = memoria.definidos",
+            "    historico = memoria.historico",
+        ]
+        cabecalho += [f"    {local} = valores[{slot}]" for slot, local in self.variaveis.items()]
+        return "\n".join(cabecalho + self.linhas + [f"    return {resultado}"])
+
+
+def gerarFonte(tokens, pares: list[int] | None = None) -> tuple[str, dict]:
+    """Código-fonte Python da linha (depois da dobra de constantes) e as constantes de que ele precisa."""
+    if isinstance(tokens, Linha_Fluxo):
+        tokens = tokens.para_tokens()
+    dobrados = dobrarConstantes(tokens)
+    if dobrados is not tokens:
+        tokens, pares = dobrados, None
+    if pares is None:
+        pares = parear_parenteses(tokens)
+    gerador = _Gerador(tokens, pares)
+    resultado = gerador.declaracao(0, len(tokens))
+    constantes = {nome: objeto for objeto, nome in gerador.constantes.items()}
+    return gerador.fonte(resultado), constantes
+
+
+def compilarFuncao(tokens, pares: list[int] | None = None):
+    """
+    Função Python equivalente à linha: funcao(memoria) -> resultado, com
+    memoria um Memoria_Slots.
+    Se o código gerado passar dos limites do compile() (aninhamento de
+    blocos), a linha fica na máquina virtual.
+    """
+    if isinstance(tokens, Linha_Fluxo):
+        tokens = tokens.para_tokens()
+    try:
+        fonte, constantes = gerarFonte(tokens, pares)
+        ambiente = dict(_AMBIENTE, **constantes)
+        exec(compile(fonte, "<rpn>", "exec"), ambiente)
+        return ambiente["linha"]
+    except (SyntaxError, RecursionError, MemoryError):
+        programa = compilarLinha(tokens, pares)
+        return lambda memoria: executarPrograma(programa, memoria)
+
+
+# Funções já compiladas, pela sequência (tipo, valor) dos tokens da linha
+_funcoes = {}
+MAX_FUNCOES = 4096
+
+
+def executarLinhaJIT(tokens, memoria: Memoria_Slots | dict, pares: list[int] | None = None) -> float:
+    """Como maquina_rpn.executarLinha, reaproveitando a função de linhas já vistas."""
+    if not isinstance(memoria, Memoria_Slots):
+        slots = Memoria_Slots.de_dicionario(memoria)
+        try:
+            return executarLinhaJIT(tokens, slots, pares)
+        finally:
+            slots.copia_para(memoria)
+    if isinstance(tokens, Linha_Fluxo):
+        tokens = tokens.para_tokens()
+    chave = tuple([(token.tipo, token.valor) for token in tokens])
+    funcao = _funcoes.get(chave)
+    if funcao is None:
+        if len(_funcoes) >= MAX_FUNCOES:
+            _funcoes.clear()
+        funcao = _funcoes[chave] = compilarFuncao(tokens, pares)
+        memoria.garante_capacidade()
+    return funcao(memoria)
@@ -0,0 +1,408 @@
+# lote_rpn.py - Avaliação vetorizada de uma linha compilada sobre muitas ligações de variáveis
+#
+# Cada variável é um array NumPy com um valor por ligação ("pista"); o
+# bytecode de compilador_rpn é executado uma vez, com operações sobre os
+# arrays inteiros. IFELSE vira np.where; WHILE/FOR repetem o corpo enquanto
+# alguma pista ainda está no laço, com uma máscara das pistas ativas.
+# Os valores são os mesmos de executarPrograma em cada pista; mensagens de
+# erro são impressas uma vez por ocorrência, não uma vez por pista.
+# Com meia=True (modo float16 de meia_rpn) cada resultado é arredondado para
+# numpy.float16 em vez de 2 casas, e as variáveis voltam como arrays float16.
+#
+# NumPy é opcional: só este módulo depende dele.
+
+import math
+import operator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .tokens import Tipo_de_Token
+from .compilador_rpn import Instrucao, Programa, compilarLinha, MAX_ITERACOES
+from .memoria_rpn import CHAVE_HISTORICO, SIMBOLOS, SLOT_FOR_COUNTER
+from .rpn_calc import OPERACOES_ARITMETICAS, OPERACOES_LOGICAS
+from .meia_rpn import compilarLinhaMeia, ORIGINAIS_MEIA
+
+CONST = Instrucao.CONST
+CARREGA = Instrucao.CARREGA
+ARITMETICA = Instrucao.ARITMETICA
+COMPARACAO = Instrucao.COMPARACAO
+LOGICA = Instrucao.LOGICA
+NAO = Instrucao.NAO
+RES_INDICE = Instrucao.RES_INDICE
+RES_ULTIMO = Instrucao.RES_ULTIMO
+ERRO = Instrucao.ERRO
+ARREDONDA = Instrucao.ARREDONDA
+DESCARTA = Instrucao.DESCARTA
+GUARDA_TEMP = Instrucao.GUARDA_TEMP
+CARREGA_TEMP = Instrucao.CARREGA_TEMP
+ATRIBUI = Instrucao.ATRIBUI
+INICIALIZA = Instrucao.INICIALIZA
+SALTA_SE_ZERO = Instrucao.SALTA_SE_ZERO
+TENTA = Instrucao.TENTA
+PARA_LIMITE = Instrucao.PARA_LIMITE
+PARA_TESTA = Instrucao.PARA_TESTA
+MANTEM_TOPO = Instrucao.MANTEM_TOPO
+MEMO_INICIO = Instrucao.MEMO_INICIO
+MEMO_FIM = Instrucao.MEMO_FIM
+ARITMETICA_DIRETA = Instrucao.ARITMETICA_DIRETA
+
+# A partir daqui a distância entre floats vizinhos passa de 0.01 e
+# round(x, 2) devolve o próprio x
+_SEM_CASAS = 2.0 ** 46
+
+
+def _arredonda(x):
+    """round(x, 2) de cada elemento, com o mesmo resultado do round do Python (meio-par no valor exato)."""
+    x = np.asarray(x, dtype=float)
+    a = np.abs(x)
+    p = a * 100.0
+    # a * 100 exato = p + e (produto de Dekker: 100 cabe na metade baixa)
+    c = a * 134217729.0
+    alto = c - (c - a)
+    baixo = a - alto
+    e = (alto * 100.0 - p) + baixo * 100.0
+    n = np.floor(p)
+    s = ((p - n) - 0.5) + e
+    n = np.where((s > 0.0) | ((s == 0.0) & (np.fmod(n, 2.0) != 0.0)), n + 1.0, n)
+    return np.where(a < _SEM_CASAS, np.copysign(n / 100.0, x), x)
+
+
+def _arredonda_meia(x):
+    """Cada elemento arredondado para float16 (meio-par, acima de 65504 vira inf), de volta em float64."""
+    with np.errstate(over='ignore'):
+        return np.asarray(x, dtype=float).astype(np.float16).astype(float)
+
+
+def _dividir(x, y):
+    return np.where(y != 0.0, np.true_divide(x, y), 0.0)
+
+
+def _resto(x, y):
+    return np.where(y != 0.0, np.mod(x, y), 0.0)
+
+
+def _potencia_escalar(x: float, y: float) -> float:
+    try:
+        return math.pow(x, y)
+    except (ValueError, OverflowError):
+        return 0.0
+
+
+def _potencia(x, y):
+    # Elemento a elemento com math.pow: np.power difere no último bit em
+    # parte das entradas, e o arredondamento para 2 casas amplifica isso
+    return np.asarray(_POTENCIA(x, y), dtype=float)
+
+
+# Função escalar da instrução -> versão vetorizada
+_VETORIAIS = {
+    OPERACOES_ARITMETICAS[Tipo_de_Token.SOMA]: operator.add,
+    OPERACOES_ARITMETICAS[Tipo_de_Token.SUBTRACAO]: operator.sub,
+    OPERACOES_ARITMETICAS[Tipo_de_Token.MULTIPLICACAO]: operator.mul,
+    OPERACOES_ARITMETICAS[Tipo_de_Token.DIVISAO]: _dividir,
+    OPERACOES_ARITMETICAS[Tipo_de_Token.RESTO]: _resto,
+    OPERACOES_ARITMETICAS[Tipo_de_Token.POTENCIA]: _potencia,
+    OPERACOES_LOGICAS[Tipo_de_Token.AND]: lambda x, y: (x != 0.0) & (y != 0.0),
+    OPERACOES_LOGICAS[Tipo_de_Token.OR]: lambda x, y: (x != 0.0) | (y != 0.0),
+}
+# As operações em float16 de meia_rpn (ARITMETICA_DIRETA) usam a mesma versão;
+# o arredondamento é o de _Execucao_Lote.arredonda
+_VETORIAIS.update({aritmetica: _VETORIAIS[operacao] for aritmetica, operacao in ORIGINAIS_MEIA.items()})
+_POTENCIA = np.frompyfunc(_potencia_escalar, 2, 1) if np is not None else None
+# As comparações (operator.lt, abs(a - b) < 1e-10, ...) já funcionam com arrays
+
+
+def _inteiro_lote(x, ativo):
+    """int() de cada pista ativa; devolve (valores truncados, pistas em que int() falharia)."""
+    invalido = ativo & ~np.isfinite(x)
+    return np.where(invalido, 0.0, np.trunc(x)), invalido
+
+
+def _erros_de_int(x, invalido) -> list[Exception]:
+    """As exceções que int() levantaria nas pistas inválidas (uma por valor distinto: nan, inf, -inf)."""
+    erros = []
+    for valor in np.unique(x[invalido]):
+        try:
+            int(float(valor))
+        except (ValueError, OverflowError) as e:
+            erros.append(e)
+    return erros
+
+
+class _Falha:
+    """Pistas em que a estrutura em execução foi interrompida por um erro (TENTA)."""
+
+    __slots__ = ("nome", "pistas", "avisos")
+
+    def __init__(self, nome: str, tamanho: int):
+        self.nome = nome
+        self.pistas = np.zeros(tamanho, dtype=bool)
+        self.avisos = set()
+
+    def registra(self, invalido, erros: list[Exception]) -> None:
+        self.pistas |= invalido
+        for erro in erros:
+            aviso = f"ERRO no {self.nome}: {erro}"
+            if aviso not in self.avisos:
+                print(aviso)
+                self.avisos.add(aviso)
+
+
+class _Execucao_Lote:
+    """Estado de uma execução de executarLote: valores por slot, temporários e histórico."""
+
+    def __init__(self, programa: Programa, valores: dict, historico: list, tamanho: int, meia: bool = False):
+        self.codigo = programa.codigo
+        self.meia = meia
+        self.arredonda = _arredonda_meia if meia else _arredonda
+        self.valores = valores
+        # Pistas em que cada slot está definido (o nome existe na memória)
+        self.definidos = {slot: np.ones(tamanho, dtype=bool) for slot in valores}
+        self.historico = historico
+        self.tamanho = tamanho
+        self.temps = {}
+
+    def vetor(self, valor):
+        return np.broadcast_to(np.asarray(valor, dtype=float), (self.tamanho,))
+
+    def le(self, slot: int):
+        valor = self.valores.get(slot)
+        return 0.0 if valor is None else valor
+
+    def grava(self, slot: int, valor, ativo) -> None:
+        if self.meia:
+            # Os valores calculados já são float16; o contador do FOR não
+            valor = _arredonda_meia(valor)
+        self.valores[slot] = np.where(ativo, valor, self.le(slot))
+        self.inicializa(slot, ativo)
+
+    def inicializa(self, slot: int, ativo) -> None:
+        definidos = self.definidos.get(slot)
+        self.definidos[slot] = ativo if definidos is None else definidos | ativo
+
+    def apaga(self, slot: int, ativo) -> None:
+        self.valores[slot] = np.where(ativo, 0.0, self.le(slot))
+        definidos = self.definidos.get(slot)
+        if definidos is not None:
+            self.definidos[slot] = definidos & ~ativo
+
+    # --- trechos sem saltos ---
+
+    def executa(self, inicio: int, fim: int, ativo, falha: _Falha | None):
+        """
+        Executa codigo[inicio:fim] nas pistas 'ativo' e devolve o valor no topo.
+        Estruturas (TENTA) são executadas por se_senao/enquanto/para. Pistas em
+        que uma instrução falha saem de 'ativo' e ficam marcadas em 'falha'.
+        """
+        codigo = self.codigo
+        pilha = []
+        empilha = pilha.append
+        desempilha = pilha.pop
+        pc = inicio
+        while pc < fim:
+            operacao, a, b = codigo[pc]
+            pc += 1
+            if operacao == CONST:
+                empilha(a)
+            elif operacao == CARREGA:
+                empilha(self.le(a))
+            elif operacao == ARITMETICA or operacao == ARITMETICA_DIRETA:
+                y = desempilha()
+                x = desempilha()
+                empilha(self.arredonda(_VETORIAIS[a](x, y)))
+            elif operacao == COMPARACAO:
+                y = desempilha()
+                x = desempilha()
+                empilha(np.where(a(x, y), 1.0, 0.0))
+            elif operacao == LOGICA:
+                y = desempilha()
+                x = desempilha()
+                empilha(np.where(_VETORIAIS[a](x, y), 1.0, 0.0))
+            elif operacao == NAO:
+                empilha(np.where(desempilha() == 0.0, 1.0, 0.0))
+            elif operacao == ARREDONDA:
+                pilha[-1] = self.arredonda(pilha[-1])
+            elif operacao == ATRIBUI:
+                self.grava(a, pilha[-1], ativo)
+            elif operacao == INICIALIZA:
+                # Slot ainda não definido já vale 0.0
+                self.inicializa(a, ativo)
+            elif operacao == DESCARTA:
+                desempilha()
+            elif operacao == MANTEM_TOPO:
+                del pilha[-a - 1:-1]
+            elif operacao == RES_INDICE:
+                valor, ativo = self.res_indice(desempilha(), ativo, falha)
+                empilha(valor)
+            elif operacao == RES_ULTIMO:
+                if self.historico:
+                    empilha(self.historico[-1])
+                else:
+                    if a and ativo.any():
+                        print("ERRO -> Histórico vazio")
+                    empilha(0.0)
+            elif operacao == ERRO:
+                if ativo.any():
+                    print(a)
+                empilha(0.0)
+            elif operacao == GUARDA_TEMP:
+                self.temps[a] = desempilha()
+            elif operacao == CARREGA_TEMP:
+                empilha(self.temps[a])
+            elif operacao == TENTA:
+                nome = b[0]
+                estrutura = self.se_senao if nome == "IFELSE" else self.enquanto if nome == "WHILE" else self.para
+                empilha(estrutura(pc - 1, ativo))
+                pc = a
+            elif operacao == MEMO_INICIO or operacao == MEMO_FIM:
+                pass
+        return pilha[-1]
+
+    def res_indice(self, indice, ativo, falha: _Falha | None):
+        """N RES em cada pista: historico[-N], ou 0.0 com a mensagem de Historico.consulta."""
+        bruto = self.vetor(indice)
+        indice, invalido = _inteiro_lote(bruto, ativo)
+        if invalido.any():
+            erros = _erros_de_int(bruto, invalido)
+            if falha is None:
+                raise erros[0]
+            falha.registra(invalido, erros)
+            ativo = ativo & ~invalido
+        total = len(self.historico)
+        resultado = np.zeros(self.tamanho)
+        for idx in np.unique(indice[ativo]):
+            pistas = indice == idx
+            idx = int(idx)
+            if 0 < idx <= total:
+                resultado = np.where(pistas, self.historico[-idx], resultado)
+            else:
+                print(f"ERRO -> Índice {idx} fora do intervalo do histórico (tamanho: {total})")
+        return resultado, ativo
+
+    # --- estruturas (mesmo formato de código de _Compilador) ---
+
+    def proxima(self, pc: int, operacao: int) -> int:
+        while self.codigo[pc][0] != operacao:
+            pc += 1
+        return pc
+
+    def se_senao(self, tenta: int, ativo):
+        falha = _Falha("IFELSE", self.tamanho)
+        salto_senao = self.proxima(tenta + 1, SALTA_SE_ZERO)
+        inicio_senao = self.codigo[salto_senao][1]
+        fim = self.codigo[inicio_senao - 1][1]
+        condicao = self.executa(tenta + 1, salto_senao, ativo, falha)
+        ativo = ativo & ~falha.pistas
+        verdadeiro = self.vetor(condicao) != 0.0
+        # Cada ramo só nas pistas que o seguem (as mensagens dependem disso)
+        entao = self.executa(salto_senao + 1, inicio_senao - 1, ativo & verdadeiro, falha)
+        senao = self.executa(inicio_senao, fim, ativo & ~verdadeiro, falha)
+        return np.where(falha.pistas, 0.0, np.where(verdadeiro, entao, senao))
+
+    def enquanto(self, tenta: int, ativo):
+        falha = _Falha("WHILE", self.tamanho)
+        teste = tenta + 3
+        fim = self.codigo[teste][2]
+        salto_fim = self.proxima(teste + 1, SALTA_SE_ZERO)
+        resultado = np.zeros(self.tamanho)
+        vivos = ativo
+        for _ in range(MAX_ITERACOES):
+            condicao = self.executa(teste + 1, salto_fim, vivos, falha)
+            vivos = vivos & ~falha.pistas & (condicao != 0.0)
+            if not vivos.any():
+                break
+            valor = self.executa(salto_fim + 2, fim - 2, vivos, falha)
+            vivos = vivos & ~falha.pistas
+            resultado = np.where(vivos, valor, resultado)
+        return np.where(falha.pistas, 0.0, resultado)
+
+    def para(self, tenta: int, ativo):
+        falha = _Falha("FOR", self.tamanho)
+        limites = []
+        pc = tenta + 1
+        for _ in range(3):
+            limite = self.proxima(pc, PARA_LIMITE)
+            bruto = self.vetor(self.executa(pc, limite, ativo, falha))
+            ativo = ativo & ~falha.pistas
+            valor, invalido = _inteiro_lote(bruto, ativo)
+            if invalido.any():
+                falha.registra(invalido, _erros_de_int(bruto, invalido))
+                ativo = ativo & ~invalido
+            limites.append(valor)
+            pc = limite + 1
+        inicial, final, incremento = limites
+        incremento = np.where(incremento == 0.0, 1.0, incremento)
+
+        # PARA_INICIO, [PARA_FECHADO], CONST 0.0, PARA_TESTA, DESCARTA, corpo, PARA_PROXIMA, SALTA
+        teste = self.proxima(pc, PARA_TESTA)
+        fim = self.codigo[teste][2]
+        entraram = ativo
+        contador = inicial
+        self.grava(SLOT_FOR_COUNTER, contador, entraram)
+        resultado = np.zeros(self.tamanho)
+        vivos = entraram
+        for _ in range(MAX_ITERACOES):
+            vivos = vivos & ~falha.pistas & (contador < final)
+            if not vivos.any():
+                break
+            self.grava(SLOT_FOR_COUNTER, contador, vivos)
+            valor = self.executa(teste + 2, fim - 2, vivos, falha)
+            vivos = vivos & ~falha.pistas
+            resultado = np.where(vivos, valor, resultado)
+            contador = np.where(vivos, contador + incremento, contador)
+        # PARA_FIM só nas pistas que chegaram ao fim do laço
+        self.apaga(SLOT_FOR_COUNTER, entraram & ~falha.pistas)
+        return np.where(falha.pistas, 0.0, resultado)
+
+
+def executarLote(programa: Programa, memoria: dict, tamanho: int | None = None, meia: bool = False):
+    """
+    Executa o bytecode de uma linha para todas as ligações de uma vez.
+    'memoria' tem um array (ou um número, que vale para todas as pistas) por
+    variável e, opcionalmente, 'historico_resultados' com um valor ou array
+    por linha anterior; as variáveis atribuídas são gravadas de volta como
+    arrays. Devolve o array de resultados, um por pista.
+    Com meia=True (bytecode de meia_rpn.compilarLinhaMeia), as entradas são
+    arredondadas para float16, cada operação também, e as variáveis e o
+    resultado voltam como arrays float16.
+    """
+    if np is None:
+        raise ImportError("executarLote precisa do NumPy (pip install numpy)")
+    historico = list(memoria.get(CHAVE_HISTORICO, ()))
+    variaveis = {nome: np.asarray(valor, dtype=float) for nome, valor in memoria.items() if nome != CHAVE_HISTORICO}
+    if meia:
+        historico = [_arredonda_meia(valor) for valor in historico]
+        variaveis = {nome: _arredonda_meia(valor) for nome, valor in variaveis.items()}
+    if tamanho is None:
+        tamanho = max([valor.size for valor in variaveis.values()]
+                      + [np.size(valor) for valor in historico] + [1])
+    valores = {}
+    for nome, valor in variaveis.items():
+        if valor.ndim > 1:
+            raise ValueError(f"variável {nome}: esperado um array de uma dimensão (recebido {valor.shape})")
+        valores[SIMBOLOS.slot(nome)] = np.broadcast_to(valor, (tamanho,))
+
+    execucao = _Execucao_Lote(programa, valores, historico, tamanho, meia)
+    with np.errstate(all='ignore'):
+        resultado = execucao.executa(0, len(programa.codigo) - 1, np.ones(tamanho, dtype=bool), None)
+
+    nomes = SIMBOLOS.nomes
+    tipo = np.float16 if meia else float
+    for slot, definidos in execucao.definidos.items():
+        if definidos.any():
+            # Um slot só inicializado (o corpo nunca gravou nele) vale 0.0
+            memoria[nomes[slot]] = np.array(execucao.vetor(execucao.le(slot)), dtype=tipo)
+        else:
+            memoria.pop(nomes[slot], None)
+    return np.array(execucao.vetor(resultado), dtype=tipo)
+
+
+def executarLinhaLote(tokens, memoria: dict, tamanho: int | None = None, pares: list[int] | None = None,
+                      meia: bool = False):
+    """Compila e executa uma linha (lista de tokens ou Linha_Fluxo) com executarLote."""
+    if meia:
+        return executarLote(compilarLinhaMeia(tokens, pares), memoria, tamanho, meia=True)
+    return executarLote(compilarLinha(tokens, pares), memoria, tamanho)
@@ -0,0 +1,366 @@
+# maquina_rpn.py - Máquina virtual de pilha que executa o bytecode de compilador_rpn
+
+import math
+import time
+from functools import partial
+
+from .compilador_rpn import (
+    Instrucao, Programa, Laco_Fechado, compilarLinha, MAX_ITERACOES,
+    PARA_INICIAL, PARA_FINAL, PARA_INCREMENTO, PARA_CONTADOR, PARA_ITERACOES,
+    ULTIMO_VALOR,
+)
+from .memoria_rpn import Memoria_Slots, SLOT_FOR_COUNTER, TIPO_REAL
+from .memo_rpn import Cache_Memo
+from .orcamento_rpn import Orcamento, Orcamento_Excedido, ITERACOES_POR_VERIFICACAO
+from .diagnosticos_rpn import Codigo_Diagnostico, Coletor_Diagnosticos
+
+CONST = Instrucao.CONST
+CARREGA = Instrucao.CARREGA
+ARITMETICA = Instrucao.ARITMETICA
+COMPARACAO = Instrucao.COMPARACAO
+LOGICA = Instrucao.LOGICA
+NAO = Instrucao.NAO
+RES_INDICE = Instrucao.RES_INDICE
+RES_ULTIMO = Instrucao.RES_ULTIMO
+ERRO = Instrucao.ERRO
+ARREDONDA = Instrucao.ARREDONDA
+DESCARTA = Instrucao.DESCARTA
+GUARDA_TEMP = Instrucao.GUARDA_TEMP
+CARREGA_TEMP = Instrucao.CARREGA_TEMP
+ATRIBUI = Instrucao.ATRIBUI
+INICIALIZA = Instrucao.INICIALIZA
+SALTA = Instrucao.SALTA
+SALTA_SE_ZERO = Instrucao.SALTA_SE_ZERO
+TENTA = Instrucao.TENTA
+FIM_TENTA = Instrucao.FIM_TENTA
+ENQUANTO_INICIO = Instrucao.ENQUANTO_INICIO
+ENQUANTO_TESTA = Instrucao.ENQUANTO_TESTA
+PROXIMA = Instrucao.PROXIMA
+PARA_LIMITE = Instrucao.PARA_LIMITE
+PARA_INICIO = Instrucao.PARA_INICIO
+PARA_TESTA = Instrucao.PARA_TESTA
+PARA_PROXIMA = Instrucao.PARA_PROXIMA
+PARA_FIM = Instrucao.PARA_FIM
+RETORNA = Instrucao.RETORNA
+MANTEM_TOPO = Instrucao.MANTEM_TOPO
+MEMO_INICIO = Instrucao.MEMO_INICIO
+MEMO_FIM = Instrucao.MEMO_FIM
+PARA_FECHADO = Instrucao.PARA_FECHADO
+ARITMETICA_DIRETA = Instrucao.ARITMETICA_DIRETA
+
+# Com uma iteração só não há o que poupar
+FECHADO_MINIMO_ITERACOES = 2
+# Enquanto os acumuladores ficam abaixo disto, o erro de cada soma em float é
+# muito menor que 0.005 e round(x, 2) devolve o mesmo valor a cada iteração
+# que uma única soma no final
+LIMITE_FECHADO = 2.0 ** 33
+
+
+class Modo_Numerico:
+    """
+    Como a máquina virtual representa os valores de um modo: 'zero' e 'um' são
+    o que erros, comparações e operações lógicas empilham, e a memória é uma
+    'classe' (Memoria_Slots ou subclasse) com as variáveis em um array de
+    typecode 'tipo'. Outra memória (um dict, por exemplo) é convertida por
+    'converte' e atualizada no final.
+    """
+
+    __slots__ = ("zero", "um", "classe", "tipo", "converte")
+
+    def __init__(self, zero, um, classe: type, tipo: str, converte):
+        self.zero = zero
+        self.um = um
+        self.classe = classe
+        self.tipo = tipo
+        self.converte = converte
+
+
+# Modo padrão: floats arredondados para 2 casas
+MODO_REAL = Modo_Numerico(0.0, 1.0, Memoria_Slots, TIPO_REAL, Memoria_Slots.de_dicionario)
+
+
+def _calcula_laco_fechado(fechado: Laco_Fechado, estado: list, memoria: Memoria_Slots,
+                          max_iteracoes: float, restantes: float) -> float | None:
+    """
+    Executa um FOR reconhecido por _laco_fechado sem iterar e devolve o valor
+    da última iteração (com as iterações feitas no estado do laço), ou None
+    (sem alterar nada) se o laço deve ser executado normalmente: 'restantes'
+    é quantas iterações o orçamento da linha ainda permite. Cada acumulador faz
+    a primeira soma como no laço; as n - 1 seguintes, com parcelas de
+    centésimos exatos, viram uma soma só.
+    """
+    inicial = estado[PARA_INICIAL]
+    final = estado[PARA_FINAL]
+    incremento = estado[PARA_INCREMENTO]
+    if incremento > 0:
+        n = min(max(0, -((inicial - final) // incremento)), max_iteracoes)
+    elif inicial >= final:
+        n = 0
+    elif max_iteracoes < math.inf:
+        n = max_iteracoes
+    else:
+        return None
+    if n < FECHADO_MINIMO_ITERACOES or n > restantes:
+        return None
+    ultimo = inicial + (n - 1) * incremento
+    valores = memoria.valores
+
+    finais = []
+    for tipo, slot, programa, subtrai in fechado.termos:
+        if tipo == ULTIMO_VALOR:
+            finais.append(None)
+            continue
+        # ACUMULA_CONSTANTE: a parcela é a mesma em todas as iterações
+        parcela = executarPrograma(programa, memoria)
+        if round(parcela, 2) != parcela:
+            return None
+        primeira, magnitude, resto = parcela, abs(parcela) * n, (n - 1) * parcela
+        if subtrai:
+            primeira, resto = -primeira, -resto
+        try:
+            valor = round(float(valores[slot] + primeira), 2)
+        except (ValueError, OverflowError):
+            return None
+        if not abs(valor) + magnitude < LIMITE_FECHADO:
+            return None
+        valor = round(valor + resto, 2)
+        # Um zero no final pode ter sinal diferente do laço (0.0 e -0.0)
+        if valor == 0.0:
+            return None
+        finais.append(valor)
+
+    definidos = memoria.definidos
+    estado[PARA_ITERACOES] = n
+    valores[SLOT_FOR_COUNTER] = ultimo
+    resultado = 0.0
+    for (tipo, slot, programa, _), valor in zip(fechado.termos, finais):
+        if tipo == ULTIMO_VALOR:
+            resultado = executarPrograma(programa, memoria)
+        else:
+            valores[slot] = valor
+            definidos[slot] = 1
+            resultado = valor
+    return resultado
+
+
+def executarPrograma(programa: Programa, memoria: Memoria_Slots | dict, orcamento: Orcamento | None = None,
+                     diagnosticos: Coletor_Diagnosticos | None = None, modo: Modo_Numerico = MODO_REAL) -> float:
+    """
+    Executa o bytecode de uma linha sobre 'memoria'.
+    Produz o mesmo resultado, efeitos em memória e mensagens que executarExpressao.
+    Uma memória que não seja a do modo (um dict comum, por exemplo) é
+    convertida e atualizada no final.
+    Com 'orcamento', o teto de cada laço é o dele, o uso da linha é registrado
+    nele e a linha que passa de um limite levanta Orcamento_Excedido.
+    Com 'diagnosticos', as mensagens de erro são registradas nele em vez de impressas.
+    'modo' é a representação dos valores (MODO_REAL, inteiro_rpn.MODO_INTEIRO,
+    meia_rpn.MODO_MEIA); o bytecode dos outros modos vem dos seus compiladores.
+    """
+    if memoria.__class__ is not modo.classe or memoria.valores.typecode != modo.tipo:
+        slots = modo.converte(memoria)
+        try:
+            return executarPrograma(programa, slots, orcamento, diagnosticos, modo)
+        finally:
+            slots.copia_para(memoria)
+
+    memoria.garante_capacidade()
+    valores = memoria.valores
+    definidos = memoria.definidos
+    historico = memoria.historico
+    codigo = programa.codigo
+    zero = modo.zero
+    um = modo.um
+    pilha = []
+    empilha = pilha.append
+    desempilha = pilha.pop
+    temps = [0.0] * programa.num_temps if programa.num_temps else None
+    lacos = [None] * programa.num_lacos if programa.num_lacos else None
+    # (destino, altura da pilha, nome da estrutura) de cada estrutura em execução
+    tratadores = []
+    memo = programa.memo
+    chaves_memo = []     # chave de cada unidade memoizada em cálculo
+    pc = 0
+    # Passos (instruções executadas) = base + pc: cada salto acerta a base
+    base = 0
+    iteracoes = 0
+    if orcamento is None:
+        max_iteracoes = MAX_ITERACOES
+        teto_iteracoes = verificacao = math.inf
+    else:
+        max_iteracoes = math.inf if orcamento.max_iteracoes is None else orcamento.max_iteracoes
+        teto_iteracoes = orcamento.teto_iteracoes()
+        verificacao = min(ITERACOES_POR_VERIFICACAO, teto_iteracoes + 1)
+        inicio = time.perf_counter()
+
+    while True:
+        try:
+            # Instruções mais frequentes (corpo dos laços) primeiro
+            while True:
+                operacao, a, b = codigo[pc]
+                pc += 1
+                if operacao == CONST:
+                    empilha(a)
+                elif operacao == CARREGA:
+                    empilha(valores[a])
+                elif operacao == ARITMETICA:
+                    y = desempilha()
+                    x = desempilha()
+                    try:
+                        empilha(round(float(a(x, y)), 2))
+                    except (ZeroDivisionError, ValueError, OverflowError):
+                        empilha(0.0)
+                elif operacao == ATRIBUI:
+                    valores[a] = pilha[-1]
+                    definidos[a] = 1
+                elif operacao == DESCARTA:
+                    desempilha()
+                elif operacao == INICIALIZA:
+                    # Slot ainda não definido já vale 0.0
+                    definidos[a] = 1
+                elif operacao == COMPARACAO:
+                    y = desempilha()
+                    x = desempilha()
+                    empilha(um if a(x, y) else zero)
+                elif operacao == SALTA_SE_ZERO:
+                    if desempilha() == 0.0:
+                        base += pc - a
+                        pc = a
+                elif operacao == SALTA:
+                    base += pc - a
+                    pc = a
+                elif operacao == ARREDONDA:
+                    pilha[-1] = round(float(pilha[-1]), 2)
+                elif operacao == PARA_TESTA:
+                    estado = lacos[a]
+                    if estado[PARA_CONTADOR] < estado[PARA_FINAL] and estado[PARA_ITERACOES] < max_iteracoes:
+                        valores[SLOT_FOR_COUNTER] = estado[PARA_CONTADOR]
+                    else:
+                        base += pc - b
+                        pc = b
+                elif operacao == PARA_PROXIMA:
+                    estado = lacos[a]
+                    estado[PARA_CONTADOR] += estado[PARA_INCREMENTO]
+                    estado[PARA_ITERACOES] += 1
+                    iteracoes += 1
+                    if iteracoes >= verificacao:
+                        verificacao = orcamento.verifica(base + pc, iteracoes, inicio)
+                elif operacao == ENQUANTO_TESTA:
+                    if lacos[a] >= max_iteracoes:
+                        base += pc - b
+                        pc = b
+                elif operacao == PROXIMA:
+                    lacos[a] += 1
+                    iteracoes += 1
+                    if iteracoes >= verificacao:
+                        verificacao = orcamento.verifica(base + pc, iteracoes, inicio)
+                elif operacao == MANTEM_TOPO:
+                    del pilha[-a - 1:-1]
+                elif operacao == MEMO_INICIO:
+                    chave = (a, a.empacota(*[valores[slot] for slot in a.slots]))
+                    valor = memo.consulta(chave)
+                    if valor is None:
+                        chaves_memo.append(chave)
+                    else:
+                        empilha(valor)
+                        base -= b
+                        pc += b
+                elif operacao == MEMO_FIM:
+                    memo.guarda(chaves_memo.pop(), pilha[-1])
+                elif operacao == LOGICA:
+                    y = desempilha()
+                    x = desempilha()
+                    empilha(um if a(x != 0.0, y != 0.0) else zero)
+                elif operacao == NAO:
+                    empilha(um if desempilha() == 0.0 else zero)
+                elif operacao == RES_INDICE:
+                    if diagnosticos is None:
+                        empilha(historico.consulta(int(desempilha()), print, zero))
+                    else:
+                        avisa = partial(diagnosticos.registra, Codigo_Diagnostico.INDICE_HISTORICO, indice=b)
+                        empilha(historico.consulta(int(desempilha()), avisa, zero))
+                elif operacao == RES_ULTIMO:
+                    if historico:
+                        empilha(historico[-1])
+                    else:
+                        if a and diagnosticos is None:
+                            print("ERRO -> Histórico vazio")
+                        elif a:
+                            diagnosticos.registra(Codigo_Diagnostico.HISTORICO_VAZIO, "ERRO -> Histórico vazio", b)
+                        empilha(zero)
+                elif operacao == ERRO:
+                    if diagnosticos is None:
+                        print(a)
+                    else:
+                        diagnosticos.registra(b[0], a, b[1])
+                    empilha(zero)
+                elif operacao == GUARDA_TEMP:
+                    temps[a] = desempilha()
+                elif operacao == CARREGA_TEMP:
+                    empilha(temps[a])
+                elif operacao == TENTA:
+                    tratadores.append((a, len(pilha), b))
+                elif operacao == FIM_TENTA:
+                    tratadores.pop()
+                elif operacao == ENQUANTO_INICIO:
+                    lacos[a] = 0
+                elif operacao == PARA_LIMITE:
+                    if b == PARA_INICIAL:
+                        lacos[a] = [0, 0, 0, 0, 0]
+                    valor = int(desempilha())
+                    if b == PARA_INCREMENTO:
+                        valor = valor or 1
+                    lacos[a][b] = valor
+                elif operacao == PARA_INICIO:
+                    estado = lacos[a]
+                    estado[PARA_CONTADOR] = estado[PARA_INICIAL]
+                    valores[SLOT_FOR_COUNTER] = estado[PARA_CONTADOR]
+                    definidos[SLOT_FOR_COUNTER] = 1
+                elif operacao == PARA_FECHADO:
+                    valor = _calcula_laco_fechado(a, lacos[b], memoria, max_iteracoes, teto_iteracoes - iteracoes)
+                    if valor is not None:
+                        empilha(valor)
+                        base += pc - a.destino
+                        pc = a.destino
+                        iteracoes += lacos[b][PARA_ITERACOES]
+                        if iteracoes >= verificacao:
+                            verificacao = orcamento.verifica(base + pc, iteracoes, inicio)
+                elif operacao == PARA_FIM:
+                    valores[SLOT_FOR_COUNTER] = 0
+                    definidos[SLOT_FOR_COUNTER] = 0
+                elif operacao == RETORNA:
+                    if orcamento is not None:
+                        orcamento.encerra(base + pc, iteracoes, inicio)
+                    return desempilha()
+                elif operacao == ARITMETICA_DIRETA:
+                    y = desempilha()
+                    x = desempilha()
+                    try:
+                        empilha(a(x, y))
+                    except (ZeroDivisionError, ValueError, OverflowError):
+                        empilha(zero)
+        except Exception as e:
+            # Mesmo tratamento do try/except de processarIFELSE/WHILE/FOR;
+            # o orçamento excedido interrompe a linha inteira
+            if not tratadores or e.__class__ is Orcamento_Excedido:
+                raise
+            destino, altura, (estrutura, indice) = tratadores.pop()
+            if diagnosticos is None:
+                print(f"ERRO no {estrutura}: {e}")
+            else:
+                diagnosticos.registra(Codigo_Diagnostico.ERRO_ESTRUTURA, f"ERRO no {estrutura}: {e}", indice)
+            del pilha[altura:]
+            # Unidades memoizadas não contêm estruturas: as abertas foram abandonadas
+            chaves_memo.clear()
+            empilha(zero)
+            base += pc - destino
+            pc = destino
+
+
+def executarLinha(tokens, memoria: Memoria_Slots | dict, pares: list[int] | None = None,
+                  memo: Cache_Memo | None = None, orcamento: Orcamento | None = None,
+                  diagnosticos: Coletor_Diagnosticos | None = None) -> float:
+    """
+    Compila e executa uma linha (lista de tokens ou Linha_Fluxo), opcionalmente
+    com memoização, orçamento e coleta dos diagnósticos.
+    """
+    return executarPrograma(compilarLinha(tokens, pares, memo), memoria, orcamento, diagnosticos)
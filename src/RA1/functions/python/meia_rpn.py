@@ -0,0 +1,172 @@
+# meia_rpn.py - Modo float16: valores em meia precisão IEEE (binary16)
+#
+# O modo padrão imita a precisão reduzida com round(x, 2) depois de cada
+# operação. Aqui cada resultado é arredondado para o binary16 mais próximo
+# (struct 'e', meio-par; acima de 65504 vira inf) e as variáveis e o
+# histórico guardam os 16 bits de cada valor. O módulo array não tem o
+# formato 'e', então os arrays são 'H' com o padrão de bits (2 bytes por
+# valor, um quarto do array('d')) e DECODIFICA leva os bits de volta ao
+# float. A linha é compilada sem arredondar para 2 casas
+# (compilarLinha(arredondar=False)) e executada pela máquina virtual no
+# MODO_MEIA. O caminho em lote é lote_rpn.executarLote(..., meia=True), com
+# numpy.float16.
+
+import struct
+from array import array
+
+from .compilador_rpn import Instrucao, Programa, compilarLinha
+from .memoria_rpn import (
+    Memoria_Slots, Historico, Tabela_Simbolos, SIMBOLOS, CHAVE_HISTORICO, TIPO_INTEIRO,
+)
+from .maquina_rpn import Modo_Numerico, executarPrograma
+from .diagnosticos_rpn import Coletor_Diagnosticos
+from .rpn_calc import OPERACOES_ARITMETICAS
+
+# Os 16 bits de um valor ficam em um array('H')
+TIPO_MEIA = TIPO_INTEIRO
+INF_MEIA = 0x7C00
+MENOS_INF_MEIA = 0xFC00
+
+_MEIA = struct.Struct('<e')
+_BITS = struct.Struct('<H')
+
+# Bits -> float, para os 65536 padrões
+DECODIFICA = struct.unpack('<65536e', struct.pack('<65536H', *range(65536)))
+
+
+def codifica(valor) -> int:
+    """Bits do binary16 mais próximo de 'valor' (fora do intervalo vira ±inf)."""
+    try:
+        return _BITS.unpack(_MEIA.pack(valor))[0]
+    except OverflowError:
+        return INF_MEIA if valor > 0 else MENOS_INF_MEIA
+
+
+def meia(valor) -> float:
+    """'valor' arredondado para float16, como float."""
+    try:
+        return _MEIA.unpack(_MEIA.pack(valor))[0]
+    except OverflowError:
+        return DECODIFICA[INF_MEIA if valor > 0 else MENOS_INF_MEIA]
+
+
+class Historico_Meia(Historico):
+    """Historico com cada resultado guardado como os 16 bits do seu float16."""
+
+    __slots__ = ()
+
+    def __init__(self, profundidade: int | None = None, tipo: str = TIPO_MEIA):
+        super().__init__(profundidade, TIPO_MEIA)
+
+    def append(self, valor: float) -> None:
+        super().append(codifica(valor))
+
+    def _le(self, posicao: int) -> float:
+        return DECODIFICA[super()._le(posicao)]
+
+    def __repr__(self):
+        return f"Historico_Meia({list(self)}, profundidade={self.profundidade})"
+
+
+class Valores_Meia(array):
+    """
+    array('H') com os bits das variáveis, lido e gravado em float: é o que a
+    máquina virtual indexa em memoria.valores.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, slot: int) -> float:
+        return DECODIFICA[array.__getitem__(self, slot)]
+
+    def __setitem__(self, slot: int, valor) -> None:
+        array.__setitem__(self, slot, codifica(valor))
+
+
+class Memoria_Slots_Meia(Memoria_Slots):
+    """
+    Memoria_Slots com as variáveis em float16 (os bits em um Valores_Meia) e
+    um Historico_Meia. Por nome e por slot, lê e grava floats.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, capacidade: int = 64, simbolos: Tabela_Simbolos = SIMBOLOS,
+                 profundidade_historico: int | None = None):
+        super().__init__(capacidade, simbolos, profundidade_historico, inteiro=True)
+        self.valores = Valores_Meia(TIPO_MEIA, bytes(self.valores.itemsize * len(self.valores)))
+        self.historico = Historico_Meia(profundidade_historico)
+
+    def __setitem__(self, nome: str, valor) -> None:
+        if nome == CHAVE_HISTORICO:
+            if not isinstance(valor, Historico_Meia):
+                valor = Historico_Meia.de_valores(valor, self.historico.profundidade)
+            self.historico = valor
+            return
+        super().__setitem__(nome, valor)
+
+    def __repr__(self):
+        return f"Memoria_Slots_Meia({dict(self.items())})"
+
+
+def _aritmetica_meia(operacao):
+    """'operacao' com o resultado arredondado para float16 (instrução ARITMETICA_DIRETA)."""
+    def aritmetica(x, y):
+        return meia(operacao(x, y))
+    return aritmetica
+
+
+# Operação de ARITMETICA -> a mesma em float16, e o caminho de volta para lote_rpn
+OPERACOES_MEIA = {operacao: _aritmetica_meia(operacao) for operacao in OPERACOES_ARITMETICAS.values()}
+ORIGINAIS_MEIA = {aritmetica: operacao for operacao, aritmetica in OPERACOES_MEIA.items()}
+
+CONST = Instrucao.CONST
+ARITMETICA = Instrucao.ARITMETICA
+ARITMETICA_DIRETA = Instrucao.ARITMETICA_DIRETA
+
+
+def compilarLinhaMeia(tokens, pares: list[int] | None = None) -> Programa:
+    """
+    Bytecode da linha para o MODO_MEIA e para executarLote(meia=True): sem
+    arredondar para 2 casas, com as constantes já em float16 e cada operação
+    aritmética arredondada para float16 (ARITMETICA_DIRETA).
+    """
+    programa = compilarLinha(tokens, pares, arredondar=False)
+    codigo = []
+    for operacao, a, b in programa.codigo:
+        if operacao == CONST:
+            a = meia(a)
+        elif operacao == ARITMETICA:
+            operacao, a = ARITMETICA_DIRETA, OPERACOES_MEIA[a]
+        codigo.append((operacao, a, b))
+    return Programa(codigo, programa.num_temps, programa.num_lacos)
+
+
+def _memoria_meia(memoria) -> Memoria_Slots_Meia:
+    """Cópia de um dict (ou de outra Memoria_Slots) com as variáveis e o histórico em float16."""
+    slots = Memoria_Slots_Meia()
+    for nome, valor in memoria.items():
+        if nome != CHAVE_HISTORICO:
+            slots[nome] = valor
+    historico = memoria[CHAVE_HISTORICO] if CHAVE_HISTORICO in memoria else []
+    slots.historico = Historico_Meia.de_valores(historico, getattr(historico, "profundidade", None))
+    return slots
+
+
+# Floats na pilha e float16 na memória
+MODO_MEIA = Modo_Numerico(0.0, 1.0, Memoria_Slots_Meia, TIPO_MEIA, _memoria_meia)
+
+
+def executarProgramaMeia(programa: Programa, memoria: Memoria_Slots | dict,
+                         diagnosticos: Coletor_Diagnosticos | None = None) -> float:
+    """
+    Executa o bytecode de compilarLinhaMeia na máquina virtual, no MODO_MEIA.
+    Uma memória que não seja Memoria_Slots_Meia é convertida e atualizada no final.
+    """
+    return executarPrograma(programa, memoria, diagnosticos=diagnosticos, modo=MODO_MEIA)
+
+
+def executarLinhaMeia(tokens, memoria: Memoria_Slots | dict, pares: list[int] | None = None,
+                      diagnosticos: Coletor_Diagnosticos | None = None) -> float:
+    """Compila e executa uma linha no modo float16."""
+    return executarProgramaMeia(compilarLinhaMeia(tokens, pares), memoria, diagnosticos)
@@ -0,0 +1,56 @@
+# memo_rpn.py - Memoização de subexpressões puras da máquina virtual
+#
+# Uma subexpressão pura (sem RES e sem mensagens) só depende das variáveis
+# que lê. O compilador a marca com uma Unidade_Memo; a máquina virtual
+# procura (unidade, valores dessas variáveis) no Cache_Memo antes de
+# executá-la e, se não achar, guarda o resultado no final.
+
+from collections import OrderedDict
+from struct import Struct
+
+
+class Unidade_Memo:
+    """Uma subexpressão memoizável: os slots que ela lê e como empacotar seus valores."""
+
+    __slots__ = ("slots", "empacota")
+
+    def __init__(self, slots: tuple[int, ...]):
+        self.slots = slots
+        # Os bits exatos dos valores: 0.0 e -0.0 são entradas diferentes
+        self.empacota = Struct(f"<{len(slots)}d").pack
+
+    def __repr__(self):
+        return f"Unidade_Memo(slots={self.slots})"
+
+
+class Cache_Memo:
+    """LRU limitado dos resultados das subexpressões, com contadores de acertos e falhas."""
+
+    __slots__ = ("capacidade", "valores", "acertos", "falhas")
+
+    def __init__(self, capacidade: int = 4096):
+        if capacidade < 1:
+            raise ValueError(f"capacidade do cache deve ser >= 1 (recebido {capacidade})")
+        self.capacidade = capacidade
+        self.valores = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+
+    def consulta(self, chave) -> float | None:
+        valor = self.valores.get(chave)
+        if valor is None:
+            self.falhas += 1
+            return None
+        self.valores.move_to_end(chave)
+        self.acertos += 1
+        return valor
+
+    def guarda(self, chave, valor: float) -> None:
+        self.valores[chave] = valor
+        if len(self.valores) > self.capacidade:
+            self.valores.popitem(last=False)
+
+    def resumo(self) -> str:
+        total = self.acertos + self.falhas
+        taxa = 100.0 * self.acertos / total if total else 0.0
+        return f"{self.acertos} acertos, {self.falhas} falhas ({taxa:.1f}% de acertos), {len(self.valores)} entradas"
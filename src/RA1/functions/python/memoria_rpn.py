@@ -0,0 +1,233 @@
+# memoria_rpn.py - Memória de variáveis indexada por slot
+#
+# Cada identificador recebe um slot inteiro quando a linha é compilada
+# (Tabela_Simbolos); em tempo de execução a máquina virtual lê e grava
+# direto em um array('d'), sem consultar um dict por nome. O histórico de
+# resultados (Historico) fica fora do espaço de nomes das variáveis.
+# No modo inteiro (inteiro_rpn) os dois arrays são 'H': 16 bits sem sinal.
+
+from array import array
+from collections.abc import MutableMapping
+
+CHAVE_HISTORICO = 'historico_resultados'
+TIPO_REAL = 'd'
+TIPO_INTEIRO = 'H'
+
+
+class Tabela_Simbolos:
+    """Nome de variável -> slot; cada nome novo recebe o próximo slot livre."""
+
+    __slots__ = ("slots", "nomes")
+
+    def __init__(self):
+        self.slots = {}
+        self.nomes = []
+
+    def slot(self, nome: str) -> int:
+        slot = self.slots.get(nome)
+        if slot is None:
+            slot = self.slots[nome] = len(self.nomes)
+            self.nomes.append(nome)
+        return slot
+
+    def __len__(self):
+        return len(self.nomes)
+
+
+class Historico:
+    """
+    Resultados das linhas (o que RES consulta) em um array('d') (ou do
+    'tipo' dado). Com 'profundidade', guarda só os últimos resultados em um
+    buffer circular; len() continua contando todos os resultados já registrados.
+    """
+
+    __slots__ = ("valores", "profundidade", "total")
+
+    def __init__(self, profundidade: int | None = None, tipo: str = TIPO_REAL):
+        if profundidade is not None and profundidade < 1:
+            raise ValueError(f"profundidade do histórico deve ser >= 1 (recebido {profundidade})")
+        self.profundidade = profundidade
+        self.total = 0
+        self.valores = array(tipo) if profundidade is None else array(tipo, [0]) * profundidade
+
+    @classmethod
+    def de_valores(cls, valores, profundidade: int | None = None, tipo: str = TIPO_REAL) -> "Historico":
+        historico = cls(profundidade, tipo)
+        for valor in valores:
+            historico.append(valor)
+        return historico
+
+    @property
+    def retidos(self) -> int:
+        """Quantos resultados ainda podem ser consultados."""
+        if self.profundidade is None:
+            return self.total
+        return min(self.total, self.profundidade)
+
+    def append(self, valor: float) -> None:
+        if self.profundidade is None:
+            self.valores.append(valor)
+        else:
+            self.valores[self.total % self.profundidade] = valor
+        self.total += 1
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, i: int) -> float:
+        """Índices negativos contam a partir do último resultado; só a janela guardada é acessível."""
+        retidos = self.retidos
+        if i < 0:
+            i += self.total
+        if not self.total - retidos <= i < self.total:
+            raise IndexError(f"índice fora do histórico guardado (últimos {retidos} de {self.total})")
+        return self._le(i)
+
+    def _le(self, posicao: int) -> float:
+        """Valor da posição absoluta 'posicao', que já está na janela guardada."""
+        if self.profundidade is None:
+            return self.valores[posicao]
+        return self.valores[posicao % self.profundidade]
+
+    def __iter__(self):
+        return (self[i] for i in range(self.total - self.retidos, self.total))
+
+    def __repr__(self):
+        return f"Historico({list(self)}, profundidade={self.profundidade})"
+
+    def consulta(self, idx: int, avisa=print, zero=0.0) -> float:
+        """N RES: o idx-ésimo resultado a partir do último, ou 'zero' com a mensagem de erro passada a 'avisa'."""
+        total = self.total
+        if 0 < idx <= total:
+            if self.profundidade is None or idx <= self.profundidade:
+                return self._le(total - idx)
+            avisa(f"ERRO -> Índice {idx} fora da janela do histórico (guardados os últimos {self.profundidade} de {total} resultados)")
+            return zero
+        avisa(f"ERRO -> Índice {idx} fora do intervalo do histórico (tamanho: {total})")
+        return zero
+
+
+class Historico_Parcial(Historico):
+    """
+    Só algumas posições do histórico (as que um trecho do arquivo consulta),
+    em um dict por posição absoluta; len() e as mensagens de erro continuam
+    usando o total de resultados. Usado pelos processos de paralelo_rpn.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, total: int, valores: dict[int, float], profundidade: int | None = None):
+        super().__init__()
+        self.profundidade = profundidade
+        self.total = total
+        self.valores = valores
+
+    def append(self, valor: float) -> None:
+        self.valores[self.total] = valor
+        self.total += 1
+
+    def _le(self, posicao: int) -> float:
+        return self.valores[posicao]
+
+
+# Uma tabela para o processo inteiro: o bytecode e as funções do modo --jit
+# guardam slots, então valem para qualquer Memoria_Slots
+SIMBOLOS = Tabela_Simbolos()
+SLOT_FOR_COUNTER = SIMBOLOS.slot('_FOR_COUNTER')
+
+
+class Memoria_Slots(MutableMapping):
+    """
+    Valores das variáveis em um array('d') indexado pelo slot, mais um
+    bytearray que marca quais já foram definidas (variável nunca atribuída
+    vale 0.0, como memoria.get(nome, 0.0)). Com inteiro=True as variáveis e
+    o histórico são array('H'), os inteiros de 16 bits do modo inteiro.
+
+    Também é um dict de variáveis para o código que usa a memória por nome
+    (executarExpressao, exibirResultados). A chave 'historico_resultados'
+    dá acesso a self.historico e não é uma variável: uma variável com esse
+    nome tem seu próprio slot e não sobrescreve o histórico.
+    """
+
+    __slots__ = ("simbolos", "valores", "definidos", "historico")
+
+    def __init__(self, capacidade: int = 64, simbolos: Tabela_Simbolos = SIMBOLOS,
+                 profundidade_historico: int | None = None, inteiro: bool = False):
+        self.simbolos = simbolos
+        capacidade = max(capacidade, len(simbolos))
+        tipo = TIPO_INTEIRO if inteiro else TIPO_REAL
+        self.valores = array(tipo, [0]) * capacidade
+        self.definidos = bytearray(capacidade)
+        self.historico = Historico(profundidade_historico, tipo)
+
+    def garante_capacidade(self) -> None:
+        """Acompanha slots criados depois da alocação (o array cresce no mesmo objeto)."""
+        faltam = len(self.simbolos) - len(self.definidos)
+        if faltam > 0:
+            faltam = max(faltam, len(self.definidos))
+            self.valores.frombytes(bytes(self.valores.itemsize * faltam))
+            self.definidos.extend(bytes(faltam))
+
+    # --- acesso por nome ---
+
+    def __getitem__(self, nome: str):
+        if nome == CHAVE_HISTORICO:
+            return self.historico
+        slot = self.simbolos.slots.get(nome)
+        if slot is None or slot >= len(self.definidos) or not self.definidos[slot]:
+            raise KeyError(nome)
+        return self.valores[slot]
+
+    def __setitem__(self, nome: str, valor) -> None:
+        if nome == CHAVE_HISTORICO:
+            # Uma lista vira Historico (mantendo a profundidade atual)
+            if not isinstance(valor, Historico):
+                valor = Historico.de_valores(valor, self.historico.profundidade, self.valores.typecode)
+            self.historico = valor
+            return
+        slot = self.simbolos.slot(nome)
+        self.garante_capacidade()
+        self.valores[slot] = valor
+        self.definidos[slot] = 1
+
+    def __delitem__(self, nome: str) -> None:
+        if nome == CHAVE_HISTORICO:
+            raise KeyError(nome)
+        self[nome]
+        slot = self.simbolos.slots[nome]
+        self.valores[slot] = 0
+        self.definidos[slot] = 0
+
+    def __contains__(self, nome) -> bool:
+        if nome == CHAVE_HISTORICO:
+            return True
+        slot = self.simbolos.slots.get(nome)
+        return slot is not None and slot < len(self.definidos) and self.definidos[slot] == 1
+
+    def __iter__(self):
+        # Só as variáveis definidas; o histórico não faz parte do espaço de nomes
+        nomes = self.simbolos.nomes
+        return (nomes[slot] for slot, definido in enumerate(self.definidos) if definido)
+
+    def __len__(self):
+        return self.definidos.count(1)
+
+    def __repr__(self):
+        return f"Memoria_Slots({dict(self.items())})"
+
+    # --- conversão de/para dict (chamadores que passam um dict comum) ---
+
+    @classmethod
+    def de_dicionario(cls, memoria: dict) -> "Memoria_Slots":
+        slots = cls()
+        for nome, valor in memoria.items():
+            slots[nome] = valor
+        return slots
+
+    def copia_para(self, memoria: dict) -> None:
+        """Grava de volta no dict as variáveis (e remove as apagadas); o histórico só é lido."""
+        for nome in [nome for nome in memoria if nome != CHAVE_HISTORICO and nome not in self]:
+            del memoria[nome]
+        for nome in self:
+            if nome != CHAVE_HISTORICO:
+                memoria[nome] = self.valores[self.simbolos.slots[nome]]
@@ -0,0 +1,151 @@
+# orcamento_rpn.py - Limites de execução por linha e pela execução inteira
+#
+# Um Orcamento limita os passos da máquina virtual (instruções executadas),
+# as iterações de laço (somando todos os WHILE/FOR da linha) e o tempo de
+# relógio de cada linha e do arquivo inteiro. A linha que passa de um limite
+# é interrompida com Orcamento_Excedido, que diz o recurso, o limite e o uso
+# até ali, em vez de ter um laço cortado em silêncio; o uso de cada linha
+# avaliada fica em Orcamento.usos.
+
+import math
+import time
+
+# Iterações entre duas verificações de passos e tempo (o limite de iterações é exato)
+ITERACOES_POR_VERIFICACAO = 1024
+
+NOMES_RECURSOS = {"passos": "passos", "iteracoes": "iterações", "tempo": "tempo"}
+NOMES_ESCOPOS = {"linha": "da linha", "execucao": "da execução"}
+
+
+class Uso_Orcamento:
+    """Passos, iterações e segundos usados por uma linha (ou somados sobre várias)."""
+
+    __slots__ = ("passos", "iteracoes", "tempo")
+
+    def __init__(self, passos: int = 0, iteracoes: int = 0, tempo: float = 0.0):
+        self.passos = passos
+        self.iteracoes = iteracoes
+        self.tempo = tempo
+
+    def __repr__(self):
+        return f"Uso_Orcamento(passos={self.passos}, iteracoes={self.iteracoes}, tempo={self.tempo:.6f})"
+
+
+class Orcamento_Excedido(Exception):
+    """
+    Uma linha passou de um limite. 'recurso' é "passos", "iteracoes" ou
+    "tempo", 'escopo' é "linha" ou "execucao" e 'uso' é o Uso_Orcamento da
+    linha até a interrupção.
+    """
+
+    def __init__(self, recurso: str, escopo: str, limite, usado, uso: Uso_Orcamento):
+        if recurso == "tempo":
+            texto = f"{usado:.3f} s > {limite} s"
+        else:
+            texto = f"{usado} > {limite}"
+        super().__init__(f"limite de {NOMES_RECURSOS[recurso]} {NOMES_ESCOPOS[escopo]} excedido ({texto})")
+        self.recurso = recurso
+        self.escopo = escopo
+        self.limite = limite
+        self.usado = usado
+        self.uso = uso
+
+
+class Orcamento:
+    """
+    Limites de cada linha (passos, iteracoes, tempo em segundos) e da execução
+    inteira (passos_total, iteracoes_total, tempo_total); None = sem limite.
+    'max_iteracoes' é o teto de cada laço, que para o laço em silêncio como o
+    MAX_ITERACOES original; None = sem teto, o laço vai até um dos limites.
+    """
+
+    __slots__ = ("passos", "iteracoes", "tempo", "passos_total", "iteracoes_total", "tempo_total",
+                 "max_iteracoes", "usos", "total")
+
+    def __init__(self, passos: int | None = None, iteracoes: int | None = None, tempo: float | None = None,
+                 passos_total: int | None = None, iteracoes_total: int | None = None,
+                 tempo_total: float | None = None, max_iteracoes: int | None = None):
+        for nome, valor in (("passos", passos), ("iteracoes", iteracoes), ("tempo", tempo),
+                            ("passos_total", passos_total), ("iteracoes_total", iteracoes_total),
+                            ("tempo_total", tempo_total), ("max_iteracoes", max_iteracoes)):
+            if valor is not None and valor <= 0:
+                raise ValueError(f"{nome} deve ser > 0 (recebido {valor})")
+        self.passos = passos
+        self.iteracoes = iteracoes
+        self.tempo = tempo
+        self.passos_total = passos_total
+        self.iteracoes_total = iteracoes_total
+        self.tempo_total = tempo_total
+        self.max_iteracoes = max_iteracoes
+        self.usos = []                  # Uso_Orcamento de cada linha avaliada, na ordem
+        self.total = Uso_Orcamento()
+
+    # --- usados pela máquina virtual ---
+
+    def teto_iteracoes(self) -> float:
+        """Iterações que a próxima linha pode fazer (math.inf sem limite)."""
+        teto = math.inf if self.iteracoes is None else self.iteracoes
+        if self.iteracoes_total is not None:
+            teto = min(teto, self.iteracoes_total - self.total.iteracoes)
+        return teto
+
+    def verifica(self, passos: int, iteracoes: int, inicio: float) -> float:
+        """
+        Confere os limites no meio da linha; devolve em que contagem de
+        iterações conferir de novo. Excedido, registra o uso da linha e levanta
+        Orcamento_Excedido.
+        """
+        uso = Uso_Orcamento(passos, iteracoes, time.perf_counter() - inicio)
+        self._confere(uso)
+        return min(iteracoes + ITERACOES_POR_VERIFICACAO, self.teto_iteracoes() + 1)
+
+    def encerra(self, passos: int, iteracoes: int, inicio: float) -> Uso_Orcamento:
+        """Registra o uso de uma linha que terminou; levanta Orcamento_Excedido se ele passou de algum limite."""
+        uso = Uso_Orcamento(passos, iteracoes, time.perf_counter() - inicio)
+        self._confere(uso)
+        self._registra(uso)
+        return uso
+
+    def _registra(self, uso: Uso_Orcamento) -> None:
+        self.usos.append(uso)
+        self.total.passos += uso.passos
+        self.total.iteracoes += uso.iteracoes
+        self.total.tempo += uso.tempo
+
+    def _confere(self, uso: Uso_Orcamento) -> None:
+        total = self.total
+        for recurso, limite, usado, escopo in (
+            ("iteracoes", self.iteracoes, uso.iteracoes, "linha"),
+            ("iteracoes", self.iteracoes_total, total.iteracoes + uso.iteracoes, "execucao"),
+            ("passos", self.passos, uso.passos, "linha"),
+            ("passos", self.passos_total, total.passos + uso.passos, "execucao"),
+            ("tempo", self.tempo, uso.tempo, "linha"),
+            ("tempo", self.tempo_total, total.tempo + uso.tempo, "execucao"),
+        ):
+            if limite is not None and usado > limite:
+                self._registra(uso)
+                raise Orcamento_Excedido(recurso, escopo, limite, usado, uso)
+
+    def resumo(self) -> str:
+        total = self.total
+        return (f"{len(self.usos)} linhas, {total.passos} passos, {total.iteracoes} iterações, "
+                f"{total.tempo:.3f} s")
+
+
+_CHAVES_ORCAMENTO = {
+    "passos": int, "iteracoes": int, "tempo": float,
+    "passos_total": int, "iteracoes_total": int, "tempo_total": float,
+    "max_iteracoes": int,
+}
+
+
+def lerOrcamento(texto: str) -> Orcamento:
+    """Orcamento a partir de 'chave=valor,...' (ex.: "iteracoes=100000,tempo=0.5,tempo_total=30")."""
+    limites = {}
+    for item in texto.split(","):
+        chave, igual, valor = item.strip().partition("=")
+        if not igual or chave not in _CHAVES_ORCAMENTO:
+            raise ValueError(f"item de orçamento inválido: '{item.strip()}' "
+                             f"(chaves: {', '.join(_CHAVES_ORCAMENTO)})")
+        limites[chave] = _CHAVES_ORCAMENTO[chave](valor)
+    return Orcamento(**limites)
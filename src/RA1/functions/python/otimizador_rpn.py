@@ -0,0 +1,104 @@
+# otimizador_rpn.py - Dobra de constantes sobre os tokens de uma linha
+#
+# Grupos entre parênteses feitos só de números e operadores viram um único
+# NUMERO_REAL com o valor que o avaliador calcularia, usando as mesmas
+# funções de rpn_calc (e portanto o mesmo arredondar_16bit em cada operação).
+
+from .tokens import Token, Tipo_de_Token
+from .fluxo_tokens import Linha_Fluxo
+from .rpn_calc import (
+    ACOES_ITEM, OPERACOES_ARITMETICAS, OPERACOES_COMPARACAO, OPERACOES_LOGICAS,
+    TIPOS_CONTROLE, TIPOS_DELIMITADORES,
+)
+
+NUMERO = Tipo_de_Token.NUMERO_REAL
+ABRE = Tipo_de_Token.ABRE_PARENTESES
+FECHA = Tipo_de_Token.FECHA_PARENTESES
+NOT = Tipo_de_Token.NOT
+RES = Tipo_de_Token.RES
+
+TIPOS_BINARIOS = frozenset(OPERACOES_ARITMETICAS) | frozenset(OPERACOES_COMPARACAO) | frozenset(OPERACOES_LOGICAS)
+
+
+def _valor_constante(grupo: list[Token]) -> float | None:
+    """
+    Valor do grupo se ele puder ser dobrado: só números e operadores, sem
+    faltar operando (nada seria impresso) e deixando exatamente um valor.
+    """
+    profundidade = 0
+    operadores = 0
+    for token in grupo:
+        tipo = token.tipo
+        if tipo == NUMERO:
+            profundidade += 1
+        elif tipo in TIPOS_BINARIOS:
+            if profundidade < 2:
+                return None
+            profundidade -= 1
+            operadores += 1
+        elif tipo == NOT:
+            if not profundidade:
+                return None
+            operadores += 1
+        elif tipo != ABRE and tipo != FECHA:
+            return None
+    if profundidade != 1 or not operadores:
+        return None
+
+    pilha = []
+    for token in grupo:
+        acao = ACOES_ITEM[token.tipo]
+        if acao is not None:
+            acao(token.valor, pilha, None)
+    return pilha[-1]
+
+
+def dobrarConstantes(tokens) -> list[Token]:
+    """
+    Troca cada grupo constante da linha pelo seu valor, de dentro para fora.
+
+    Só vale para declarações sem estrutura de controle: executarExpressao
+    avalia essas linhas com os parênteses removidos, e um grupo bem formado
+    dá o mesmo valor isolado ou no meio da pilha. Blocos de IFELSE/WHILE/FOR
+    são avaliados com outras regras (casos especiais por grupo) e ficam como
+    estão. A linha também fica como está se a dobra a reduzir a 'NUMERO RES',
+    que executarExpressao trata como caso especial.
+    """
+    if isinstance(tokens, Linha_Fluxo):
+        tokens = tokens.para_tokens()
+    for token in tokens:
+        if token.tipo in TIPOS_CONTROLE:
+            return tokens
+
+    abertos = []    # saída do grupo de fora de cada grupo aberto
+    saida = []
+    dobrou = False
+    for token in tokens:
+        tipo = token.tipo
+        if tipo == ABRE:
+            abertos.append(saida)
+            saida = [token]
+        elif tipo == FECHA and abertos:
+            saida.append(token)
+            valor = _valor_constante(saida)
+            externo = abertos.pop()
+            if valor is None:
+                externo += saida
+            else:
+                externo.append(Token(NUMERO, valor))
+                dobrou = True
+            saida = externo
+        else:
+            saida.append(token)
+    # Grupos sem ')' ficam como estão
+    while abertos:
+        externo = abertos.pop()
+        externo += saida
+        saida = externo
+
+    if not dobrou:
+        return tokens
+    limpos = [token for token in saida if token.tipo not in TIPOS_DELIMITADORES]
+    if len(limpos) == 2 and limpos[0].tipo == NUMERO and limpos[1].tipo == RES:
+        return tokens
+    return saida
@@ -0,0 +1,192 @@
+# paralelo_rpn.py - Avaliação das linhas de um arquivo em vários processos
+#
+# O arquivo é dividido em trechos de linhas consecutivas. Um trecho depende
+# dos trechos anteriores onde estão as dependências das suas linhas
+# (dependencias_rpn); trechos independentes são avaliados ao mesmo tempo em
+# um ProcessPoolExecutor. Cada processo recebe só as variáveis e as posições
+# do histórico que o trecho usa e devolve o que foi impresso, os resultados e
+# as variáveis escritas; aqui tudo é juntado e devolvido na ordem original.
+
+import io
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import redirect_stdout
+
+from .rpn_calc import parseExpressao, executarExpressao
+from .maquina_rpn import executarLinha
+from .jit_rpn import executarLinhaJIT
+from .memoria_rpn import CHAVE_HISTORICO, Historico_Parcial, Memoria_Slots
+from .dependencias_rpn import analisarAcessos, grafoDependencias
+from .fluxo_tokens import linhaArquivo
+
+AVALIADORES = {
+    "vm": executarLinha,
+    "jit": executarLinhaJIT,
+    "referencia": executarExpressao,
+}
+
+# Trechos por processo: mais trechos equilibram melhor a carga, menos
+# trechos gastam menos com a comunicação entre processos
+TRECHOS_POR_PROCESSO = 4
+TAMANHO_MINIMO_TRECHO = 16
+TAMANHO_MAXIMO_TRECHO = 1024
+
+
+def _avaliar_trecho(avaliador: str, profundidade_historico: int | None, linhas: list[str | None],
+                    inicio: int, variaveis: dict, historico: dict, escritas: list[str]):
+    """
+    Avalia as linhas de um trecho em sequência, como exibirResultados
+    (None = linha com erro léxico, que vale 0.0 no histórico).
+    Devolve [(saída impressa, resultado)], {variável: valor ou None} e a
+    exceção que interrompeu o trecho (com a saída parcial da linha) ou None.
+    """
+    executar = AVALIADORES[avaliador]
+    if avaliador == "referencia":
+        memoria = dict(variaveis)
+        profundidade_historico = None
+    else:
+        memoria = Memoria_Slots(profundidade_historico=profundidade_historico)
+        for nome, valor in variaveis.items():
+            memoria[nome] = valor
+    memoria[CHAVE_HISTORICO] = Historico_Parcial(inicio, historico, profundidade_historico)
+
+    avaliadas = []
+    falha = None
+    for texto in linhas:
+        if texto is None:
+            memoria[CHAVE_HISTORICO].append(0.0)
+            continue
+        saida = io.StringIO()
+        try:
+            with redirect_stdout(saida):
+                resultado = executar(parseExpressao(texto), memoria)
+        except Exception as e:
+            falha = (saida.getvalue(), e)
+            break
+        memoria[CHAVE_HISTORICO].append(resultado)
+        avaliadas.append((saida.getvalue(), resultado))
+
+    finais = {nome: memoria[nome] if nome in memoria else None for nome in escritas}
+    return avaliadas, finais, falha
+
+
+class _Trecho:
+    """Linhas [inicio, fim) do arquivo e o que o processo precisa para avaliá-las."""
+
+    __slots__ = ("inicio", "fim", "nomes", "escritas", "historico", "dependencias", "dependentes")
+
+    def __init__(self, inicio: int, fim: int):
+        self.inicio = inicio
+        self.fim = fim
+        self.nomes = set()          # variáveis lidas ou escritas
+        self.escritas = set()
+        self.historico = set()      # posições (anteriores ao trecho) consultadas
+        self.dependencias = 0       # trechos ainda não concluídos dos quais depende
+        self.dependentes = []
+
+
+def _montar_trechos(acessos: list, tamanho: int, profundidade_historico: int | None) -> list[_Trecho]:
+    dependencias = grafoDependencias(acessos)
+    trechos = [_Trecho(inicio, min(inicio + tamanho, len(acessos))) for inicio in range(0, len(acessos), tamanho)]
+    for t, trecho in enumerate(trechos):
+        anteriores = set()
+        for i in range(trecho.inicio, trecho.fim):
+            linha = acessos[i]
+            if linha is None:
+                continue
+            trecho.nomes |= linha.leituras | linha.escritas
+            trecho.escritas |= linha.escritas
+            deps = dependencias[i]
+            if isinstance(deps, range):
+                anteriores.update(range(t))
+                janela = trecho.inicio if profundidade_historico is None else profundidade_historico
+                trecho.historico.update(range(max(0, trecho.inicio - janela), trecho.inicio))
+                continue
+            anteriores.update(j // tamanho for j in deps if j < trecho.inicio)
+            trecho.historico.update(i - k for k in linha.historico if 0 <= i - k < trecho.inicio)
+        anteriores.discard(t)
+        trecho.dependencias = len(anteriores)
+        for a in anteriores:
+            trechos[a].dependentes.append(t)
+    return trechos
+
+
+def avaliarParalelo(arquivo, avaliador: str = "vm", profundidade_historico: int | None = None,
+                    processos: int | None = None):
+    """
+    Gera (saída impressa, resultado) de cada linha sem erro léxico do arquivo
+    (Tokens_Arquivo ou Fluxo_Tokens), na ordem do arquivo, com os mesmos
+    valores e mensagens da avaliação em sequência de exibirResultados.
+    'avaliador' é "vm", "jit" ou "referencia". Se uma linha levantar uma
+    exceção, o que ela imprimiu sai em stdout e a exceção é levantada aqui,
+    depois das linhas anteriores, como na execução em sequência.
+    """
+    processos = processos or os.cpu_count() or 1
+    n = len(arquivo)
+    textos = [None if k in arquivo.erros else arquivo.texto_linha(k) for k in range(n)]
+    acessos = [None if texto is None else analisarAcessos(linhaArquivo(arquivo, k)) for k, texto in enumerate(textos)]
+    tamanho = max(TAMANHO_MINIMO_TRECHO, min(TAMANHO_MAXIMO_TRECHO, math.ceil(n / (processos * TRECHOS_POR_PROCESSO))))
+    trechos = _montar_trechos(acessos, tamanho, profundidade_historico)
+
+    variaveis = {}                  # estado juntado das variáveis
+    resultados = [None] * n         # histórico (0.0 nas linhas com erro léxico)
+    saidas = [None] * n
+    falhas = {}                     # linha -> (saída parcial, exceção)
+    for k, texto in enumerate(textos):
+        if texto is None:
+            resultados[k] = 0.0
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        pendentes = {}
+
+        def submete(t: int) -> None:
+            trecho = trechos[t]
+            pendentes[executor.submit(
+                _avaliar_trecho, avaliador, profundidade_historico, textos[trecho.inicio:trecho.fim], trecho.inicio,
+                {nome: variaveis[nome] for nome in trecho.nomes if nome in variaveis},
+                {posicao: resultados[posicao] for posicao in trecho.historico},
+                sorted(trecho.escritas),
+            )] = t
+
+        for t, trecho in enumerate(trechos):
+            if not trecho.dependencias:
+                submete(t)
+
+        proxima = 0
+        try:
+            while proxima < n:
+                if resultados[proxima] is not None:
+                    if textos[proxima] is not None:
+                        yield saidas[proxima], resultados[proxima]
+                    proxima += 1
+                    continue
+                if proxima in falhas:
+                    saida, excecao = falhas[proxima]
+                    print(saida, end="")
+                    raise excecao
+
+                concluidos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    trecho = trechos[pendentes.pop(futuro)]
+                    avaliadas, finais, falha = futuro.result()
+                    linhas = [k for k in range(trecho.inicio, trecho.fim) if textos[k] is not None]
+                    for k, (saida, resultado) in zip(linhas, avaliadas):
+                        saidas[k] = saida
+                        resultados[k] = resultado
+                    if falha is not None:
+                        # Os trechos seguintes não serão usados: a execução para nesta linha
+                        falhas[linhas[len(avaliadas)]] = falha
+                        continue
+                    for nome, valor in finais.items():
+                        if valor is None:
+                            variaveis.pop(nome, None)
+                        else:
+                            variaveis[nome] = valor
+                    for d in trecho.dependentes:
+                        trechos[d].dependencias -= 1
+                        if not trechos[d].dependencias:
+                            submete(d)
+        finally:
+            for futuro in pendentes:
+                futuro.cancel()
@@ -1,14 +1,30 @@
 # rpn_calc_fixed.py - Versão corrigida do processador RPN
 
 import math
-from .tokens import Token, Tipo_de_Token
-from .analisador_lexico import Analisador_Lexico
+import operator
+from .tokens import Token, Tipo_de_Token, NUM_TIPOS, LEXEMA_TIPO
+from .analisador_tabela import Analisador_Lexico_Tabela
+from .fluxo_tokens import Linha_Fluxo
 
 def parseExpressao(linha_operacao: str):
-    analisador_lexico = Analisador_Lexico(linha_operacao)
+    analisador_lexico = Analisador_Lexico_Tabela(linha_operacao)
     tokens = analisador_lexico.analise()
     return tokens
 
+def parseArquivo(texto: str, inteiro: bool = False):
+    """
+    Analisa todas as linhas de um arquivo em uma única passada (ver Tokens_Arquivo).
+    inteiro=True mantém os literais inteiros como int (modo inteiro, inteiro_rpn).
+    """
+    return Analisador_Lexico_Tabela(texto, inteiro).analise_buffer()
+
+def parseArquivoFluxo(texto: str):
+    """Como parseArquivo, mas devolve o Fluxo_Tokens compacto (colunar)."""
+    return Analisador_Lexico_Tabela(texto).analise_fluxo()
+
+TIPOS_CONTROLE = frozenset((Tipo_de_Token.IFELSE, Tipo_de_Token.WHILE, Tipo_de_Token.FOR))
+TIPOS_DELIMITADORES = frozenset((Tipo_de_Token.ABRE_PARENTESES, Tipo_de_Token.FECHA_PARENTESES, Tipo_de_Token.FIM))
+
 def arredondar_16bit(valor):
     """Simula a precisão de ponto flutuante de 16 bits (duas casas decimais)."""
     try:
@@ -61,202 +77,48 @@ def processarEstruturaControle(tokens: list[Token], memoria: dict) -> float:
     """
     Processa estruturas de controle (IFELSE, WHILE, FOR)
     """
-    # Encontra a estrutura de controle
-    for i, token in enumerate(tokens):
-        if token.tipo == Tipo_de_Token.IFELSE:
-            return processarIFELSE(tokens, i, memoria)
-        elif token.tipo == Tipo_de_Token.WHILE:
-            return processarWHILE(tokens, i, memoria)
-        elif token.tipo == Tipo_de_Token.FOR:
-            return processarFOR(tokens, i, memoria)
-    
-    return 0.0
+    return Estrutura_Preparada(tokens).executar(memoria)
 
 def processarIFELSE(tokens: list[Token], inicio: int, memoria: dict) -> float:
     """
     Processa estrutura IFELSE: (IFELSE (condição)(verdadeiro)(falso))
     """
-    try:
-        # Encontra os 3 blocos necessários
-        blocos, _ = encontrar_blocos_controle(tokens, inicio + 1, 3)
-        
-        if len(blocos) != 3:
-            print("ERRO -> IFELSE requer 3 blocos: (condição)(verdadeiro)(falso)")
-            return 0.0
-            
-        # Processa os blocos diretamente com processarTokens
-        condicao = processarTokens(blocos[0], memoria)
-
-        
-        # Executa o bloco apropriado (verdadeiro se != 0)
-        if float(condicao) != 0.0:
-            resultado = processarTokens(blocos[1], memoria)
-
-            return resultado
-        else:
-            resultado = processarTokens(blocos[2], memoria)
-
-            return resultado
-            
-    except Exception as e:
-        print(f"ERRO no IFELSE: {e}")
-        return 0.0
+    return Estrutura_Preparada(tokens[inicio:]).executar(memoria)
 
 def processarWHILE(tokens: list[Token], inicio: int, memoria: dict) -> float:
     """
     Processa estrutura WHILE: (WHILE (condição)(corpo))
     Exemplo: (WHILE (X 5 <)((X X 1 +)(Y X 2 *)))
     """
-    try:
-        # Encontra os 2 blocos necessários
-        blocos, _ = encontrar_blocos_controle(tokens, inicio + 1, 2)
-        
-        if len(blocos) != 2:
-            print("ERRO -> WHILE requer 2 blocos: (condição)(corpo)")
-            return 0.0
-            
-        resultado = 0.0
-        iteracoes = 0
-        max_iteracoes = 1000  # Limite de segurança
-        
-        while iteracoes < max_iteracoes:
-            # Avalia a condição
-            condicao = processarTokens(blocos[0], memoria)
-            
-            # Se a condição é falsa, sai do loop
-            if float(condicao) == 0.0:
-                break
-                
-            # Executa o corpo do loop
-            # O corpo pode conter múltiplas expressões separadas por parênteses
-            resultado = executarCorpoLoop(blocos[1], memoria)
-            iteracoes += 1
-            
-        return resultado
-        
-    except Exception as e:
-        print(f"ERRO no WHILE: {e}")
-        return 0.0
+    return Estrutura_Preparada(tokens[inicio:]).executar(memoria)
 
 def processarFOR(tokens: list[Token], inicio: int, memoria: dict) -> float:
     """
     Processa estrutura FOR: (FOR (inicial)(final)(incremento)(corpo))
     Exemplo: (FOR (1)(10)(2)((P P 1 +)(Q P 2 *)))
     """
-    try:
-        # Encontra os 4 blocos necessários
-        blocos, _ = encontrar_blocos_controle(tokens, inicio + 1, 4)
-        
-        if len(blocos) != 4:
-            print("ERRO -> FOR requer 4 blocos: (inicial)(final)(incremento)(corpo)")
-            return 0.0
-            
-        # Avalia os parâmetros do FOR
-        inicial = int(processarTokens(blocos[0], memoria))
-        final = int(processarTokens(blocos[1], memoria))
-        incremento = int(processarTokens(blocos[2], memoria)) or 1
-        
-        resultado = 0.0
-        contador = inicial
-        iteracoes = 0
-        max_iteracoes = 1000  # Limite de segurança
-        
-        # Cria uma variável de controle implícita para o loop
-        memoria['_FOR_COUNTER'] = float(contador)
-        
-        while contador < final and iteracoes < max_iteracoes:
-            # Atualiza a variável de controle
-            memoria['_FOR_COUNTER'] = float(contador)
-            
-            # Executa o corpo do loop
-            resultado = executarCorpoLoop(blocos[3], memoria)
-            
-            contador += incremento
-            iteracoes += 1
-            
-            # Debug para acompanhar execução
-            # print(f"FOR iteração {iteracoes}: contador={contador-incremento}, resultado={resultado}")
-            
-        # Remove a variável de controle temporária
-        if '_FOR_COUNTER' in memoria:
-            del memoria['_FOR_COUNTER']
-            
-        return resultado
-        
-    except Exception as e:
-        print(f"ERRO no FOR: {e}")
-        return 0.0
+    return Estrutura_Preparada(tokens[inicio:]).executar(memoria)
 
 def executarCorpoLoop(tokens_corpo: list[Token], memoria: dict) -> float:
     """
     Executa o corpo de um loop, que pode conter múltiplas expressões.
     Exemplo: ((X X 1 +)(Y X 2 *)) -> executa duas expressões sequenciais
     """
-    if not tokens_corpo:
-        return 0.0
-    
-    # Separa as expressões individuais
-    expressoes = []
-    i = 0
-    
-    while i < len(tokens_corpo):
-        if tokens_corpo[i].tipo == Tipo_de_Token.ABRE_PARENTESES:
-            # Encontra uma expressão delimitada por parênteses
-            contagem = 1
-            j = i + 1
-            expressao = []
-            
-            while j < len(tokens_corpo) and contagem > 0:
-                token_atual = tokens_corpo[j]
-                
-                if token_atual.tipo == Tipo_de_Token.ABRE_PARENTESES:
-                    contagem += 1
-                elif token_atual.tipo == Tipo_de_Token.FECHA_PARENTESES:
-                    contagem -= 1
-                    
-                if contagem > 0:
-                    expressao.append(token_atual)
-                    
-                j += 1
-            
-            if expressao:
-                expressoes.append(expressao)
-            
-            i = j
-        else:
-            i += 1
-    
-    # Executa todas as expressões sequencialmente
-    resultado = 0.0
-    
-    for expressao in expressoes:
-        # Verifica se é uma atribuição de variável e inicializa se necessário (nova sintaxe: VALOR VARIAVEL)
-        if len(expressao) >= 1 and expressao[-1].tipo == Tipo_de_Token.VARIAVEL:
-            var_nome = expressao[-1].valor
-            if var_nome not in memoria:
-                memoria[var_nome] = 0.0
-        
-        # Adiciona parênteses de volta para processamento correto
-        expressao_completa = [Token(Tipo_de_Token.ABRE_PARENTESES, '(')] + expressao + [Token(Tipo_de_Token.FECHA_PARENTESES, ')')]
-        resultado = executarExpressao(expressao_completa, memoria)
-    
-    # Se não encontrou expressões delimitadas, processa todos os tokens como uma única expressão
-    if not expressoes:
-        resultado = processarTokens(tokens_corpo, memoria)
-    
-    return resultado
+    return Corpo_Preparado(tokens_corpo).executar(memoria)
 
 def executarExpressao(tokens: list[Token], memoria: dict) -> float:
     """
     Executa uma expressão RPN de forma recursiva, lidando corretamente com expressões aninhadas.
     """
+    if isinstance(tokens, Linha_Fluxo):
+        return _executarFluxo(tokens, memoria)
     if not tokens:
         return 0.0
     
     # Remove tokens de parênteses e FIM para simplificar o processamento
     tokens_limpos = []
     for token in tokens:
-        if token.tipo not in [Tipo_de_Token.ABRE_PARENTESES, Tipo_de_Token.FECHA_PARENTESES, Tipo_de_Token.FIM]:
+        if token.tipo not in TIPOS_DELIMITADORES:
             tokens_limpos.append(token)
     
     if not tokens_limpos:
@@ -275,7 +137,7 @@ def executarExpressao(tokens: list[Token], memoria: dict) -> float:
     
     # Verifica se contém estruturas de controle primeiro
     for token in tokens_limpos:
-        if token.tipo in [Tipo_de_Token.IFELSE, Tipo_de_Token.WHILE, Tipo_de_Token.FOR]:
+        if token.tipo in TIPOS_CONTROLE:
             return processarEstruturaControle(tokens, memoria)
     
     # Verifica se é uma atribuição com expressão aninhada (EXPRESSAO VARIAVEL)
@@ -299,6 +161,8 @@ def processarTokens(tokens: list[Token], memoria: dict) -> float:
     """
     Processa uma lista de tokens em notação RPN.
     """
+    if isinstance(tokens, Linha_Fluxo):
+        return _processarFluxo(tokens.fluxo, list(range(tokens.inicio, tokens.fim)), memoria)
     if not tokens:
         return 0.0
     
@@ -366,113 +230,547 @@ def processarTokens(tokens: list[Token], memoria: dict) -> float:
     # Agora processa com uma pilha RPN tradicional
     pilha = []
     
+    acoes = ACOES_ITEM
     for token in tokens_expandidos:
-        if token.tipo == Tipo_de_Token.NUMERO_REAL:
-            pilha.append(float(token.valor))
-            
-        elif token.tipo == Tipo_de_Token.VARIAVEL:
-            valor = memoria.get(token.valor, 0.0)
-            pilha.append(valor)
-            
-        elif token.tipo == Tipo_de_Token.RES:
-            # Verifica se há um índice na pilha
-            if pilha and isinstance(pilha[-1], (int, float)):
-                idx = int(pilha.pop())
-                hist = memoria.get('historico_resultados', [])
-                if hist and 0 < idx <= len(hist):
-                    pilha.append(hist[-idx])
-                else:
-                    print(f"ERRO -> Índice {idx} fora do intervalo do histórico (tamanho: {len(hist)})")
-                    pilha.append(0.0)
-            else:
-                # Sem índice, retorna o último resultado
-                hist = memoria.get('historico_resultados', [])
-                if hist:
-                    pilha.append(hist[-1])
-                else:
-                    print("ERRO -> Histórico vazio")
-                    pilha.append(0.0)
-                
-        elif str(token.valor) in ['+', '-', '*', '/', '%', '^']:
-            if len(pilha) >= 2:
-                b = pilha.pop()
-                a = pilha.pop()
-                
-                try:
-                    if token.valor == '+': resultado = a + b
-                    elif token.valor == '-': resultado = a - b
-                    elif token.valor == '*': resultado = a * b
-                    elif token.valor == '/': resultado = a / b if b != 0 else 0.0
-                    elif token.valor == '%': resultado = a % b if b != 0 else 0.0
-                    elif token.valor == '^': resultado = math.pow(a, b)
-                    
-                    pilha.append(arredondar_16bit(resultado))
-                except (ZeroDivisionError, ValueError, OverflowError):
-                    pilha.append(0.0)
-            else:
-                print(f"ERRO -> Tokens insuficientes para o operador '{token.valor}'")
+        acao = acoes[token.tipo]
+        if acao is not None:
+            acao(token.valor, pilha, memoria)
+
+    return arredondar_16bit(pilha[-1] if pilha else 0.0)
+
+# ---------------------------------------------------------------
+# Tabela de despacho dos itens RPN, indexada por Tipo_de_Token
+# ---------------------------------------------------------------
+
+def _dividir(a, b):
+    return a / b if b != 0 else 0.0
+
+def _resto(a, b):
+    return a % b if b != 0 else 0.0
+
+OPERACOES_ARITMETICAS = {
+    Tipo_de_Token.SOMA: operator.add,
+    Tipo_de_Token.SUBTRACAO: operator.sub,
+    Tipo_de_Token.MULTIPLICACAO: operator.mul,
+    Tipo_de_Token.DIVISAO: _dividir,
+    Tipo_de_Token.RESTO: _resto,
+    Tipo_de_Token.POTENCIA: math.pow,
+}
+
+OPERACOES_COMPARACAO = {
+    Tipo_de_Token.MENOR: operator.lt,
+    Tipo_de_Token.MAIOR: operator.gt,
+    Tipo_de_Token.IGUAL: lambda a, b: abs(a - b) < 1e-10,
+    Tipo_de_Token.MENOR_IGUAL: operator.le,
+    Tipo_de_Token.MAIOR_IGUAL: operator.ge,
+    Tipo_de_Token.DIFERENTE: lambda a, b: abs(a - b) >= 1e-10,
+}
+
+OPERACOES_LOGICAS = {
+    Tipo_de_Token.AND: lambda a, b: a and b,
+    Tipo_de_Token.OR: lambda a, b: a or b,
+}
+
+def _empilharNumero(valor_token, pilha: list, memoria: dict) -> None:
+    pilha.append(float(valor_token))
+
+def _empilharVariavel(valor_token, pilha: list, memoria: dict) -> None:
+    pilha.append(memoria.get(valor_token, 0.0))
+
+def _aplicarRES(valor_token, pilha: list, memoria: dict) -> None:
+    # Verifica se há um índice na pilha
+    if pilha and isinstance(pilha[-1], (int, float)):
+        idx = int(pilha.pop())
+        hist = memoria.get('historico_resultados', [])
+        if hist and 0 < idx <= len(hist):
+            pilha.append(hist[-idx])
+        else:
+            print(f"ERRO -> Índice {idx} fora do intervalo do histórico (tamanho: {len(hist)})")
+            pilha.append(0.0)
+    else:
+        # Sem índice, retorna o último resultado
+        hist = memoria.get('historico_resultados', [])
+        if hist:
+            pilha.append(hist[-1])
+        else:
+            print("ERRO -> Histórico vazio")
+            pilha.append(0.0)
+
+def _aritmetico(operacao):
+    def aplicar(valor_token, pilha: list, memoria: dict) -> None:
+        if len(pilha) >= 2:
+            b = pilha.pop()
+            a = pilha.pop()
+            try:
+                pilha.append(arredondar_16bit(operacao(a, b)))
+            except (ZeroDivisionError, ValueError, OverflowError):
                 pilha.append(0.0)
-                
-        elif str(token.valor) in ['<', '>', '==', '<=', '>=', '!=']:
-            if len(pilha) >= 2:
-                b = pilha.pop()
-                a = pilha.pop()
-                
-                try:
-                    # Garante que os valores sejam numéricos
-                    a_num = float(a)
-                    b_num = float(b)
-                    
-                    if token.valor == '<': resultado = 1.0 if a_num < b_num else 0.0
-                    elif token.valor == '>': resultado = 1.0 if a_num > b_num else 0.0
-                    elif token.valor == '==': resultado = 1.0 if abs(a_num - b_num) < 1e-10 else 0.0
-                    elif token.valor == '<=': resultado = 1.0 if a_num <= b_num else 0.0
-                    elif token.valor == '>=': resultado = 1.0 if a_num >= b_num else 0.0
-                    elif token.valor == '!=': resultado = 1.0 if abs(a_num - b_num) >= 1e-10 else 0.0
-                    else: resultado = 0.0
-                    
-                    pilha.append(resultado)
-                except (ValueError, TypeError) as e:
-                    print(f"ERRO na comparação {token.valor}: {e}")
-                    pilha.append(0.0)
-            else:
-                print(f"ERRO -> Tokens insuficientes para o operador '{token.valor}'")
+        else:
+            print(f"ERRO -> Tokens insuficientes para o operador '{valor_token}'")
+            pilha.append(0.0)
+    return aplicar
+
+def _comparacao(operacao):
+    def aplicar(valor_token, pilha: list, memoria: dict) -> None:
+        if len(pilha) >= 2:
+            b = pilha.pop()
+            a = pilha.pop()
+            try:
+                # Garante que os valores sejam numéricos
+                pilha.append(1.0 if operacao(float(a), float(b)) else 0.0)
+            except (ValueError, TypeError) as e:
+                print(f"ERRO na comparação {valor_token}: {e}")
                 pilha.append(0.0)
-                
-        elif str(token.valor) in ['&&', '||']:
-            if len(pilha) >= 2:
-                b = pilha.pop()
-                a = pilha.pop()
-                
-                try:
-                    # Converte para booleano: 0 = falso, qualquer outro valor = verdadeiro
-                    a_bool = float(a) != 0.0
-                    b_bool = float(b) != 0.0
-                    
-                    if token.valor == '&&': resultado = 1.0 if a_bool and b_bool else 0.0
-                    elif token.valor == '||': resultado = 1.0 if a_bool or b_bool else 0.0
-                    else: resultado = 0.0
-                    
-                    pilha.append(resultado)
-                except (ValueError, TypeError) as e:
-                    print(f"ERRO na operação lógica {token.valor}: {e}")
-                    pilha.append(0.0)
-            else:
-                print(f"ERRO -> Tokens insuficientes para o operador '{token.valor}'")
+        else:
+            print(f"ERRO -> Tokens insuficientes para o operador '{valor_token}'")
+            pilha.append(0.0)
+    return aplicar
+
+def _logico(operacao):
+    def aplicar(valor_token, pilha: list, memoria: dict) -> None:
+        if len(pilha) >= 2:
+            b = pilha.pop()
+            a = pilha.pop()
+            try:
+                # Converte para booleano: 0 = falso, qualquer outro valor = verdadeiro
+                pilha.append(1.0 if operacao(float(a) != 0.0, float(b) != 0.0) else 0.0)
+            except (ValueError, TypeError) as e:
+                print(f"ERRO na operação lógica {valor_token}: {e}")
                 pilha.append(0.0)
-                
-        elif str(token.valor) == '!':
-            if len(pilha) >= 1:
-                a = pilha.pop()
-                try:
-                    # NOT lógico: 0 vira 1, qualquer outro valor vira 0
-                    resultado = 1.0 if float(a) == 0.0 else 0.0
-                    pilha.append(resultado)
-                except (ValueError, TypeError) as e:
-                    print(f"ERRO na operação NOT: {e}")
-                    pilha.append(0.0)
+        else:
+            print(f"ERRO -> Tokens insuficientes para o operador '{valor_token}'")
+            pilha.append(0.0)
+    return aplicar
+
+def _aplicarNOT(valor_token, pilha: list, memoria: dict) -> None:
+    if len(pilha) >= 1:
+        a = pilha.pop()
+        try:
+            # NOT lógico: 0 vira 1, qualquer outro valor vira 0
+            pilha.append(1.0 if float(a) == 0.0 else 0.0)
+        except (ValueError, TypeError) as e:
+            print(f"ERRO na operação NOT: {e}")
+            pilha.append(0.0)
+    else:
+        print("ERRO -> Token insuficiente para o operador '!'")
+        pilha.append(0.0)
+
+# ACOES_ITEM[tipo](valor_token, pilha, memoria); None = token ignorado pela pilha
+ACOES_ITEM = [None] * NUM_TIPOS
+ACOES_ITEM[Tipo_de_Token.NUMERO_REAL] = _empilharNumero
+ACOES_ITEM[Tipo_de_Token.VARIAVEL] = _empilharVariavel
+ACOES_ITEM[Tipo_de_Token.RES] = _aplicarRES
+ACOES_ITEM[Tipo_de_Token.NOT] = _aplicarNOT
+for _tipo, _operacao in OPERACOES_ARITMETICAS.items():
+    ACOES_ITEM[_tipo] = _aritmetico(_operacao)
+for _tipo, _operacao in OPERACOES_COMPARACAO.items():
+    ACOES_ITEM[_tipo] = _comparacao(_operacao)
+for _tipo, _operacao in OPERACOES_LOGICAS.items():
+    ACOES_ITEM[_tipo] = _logico(_operacao)
+
+# ---------------------------------------------------------------
+# Estruturas de controle pré-compiladas
+# ---------------------------------------------------------------
+# Os blocos de IFELSE/WHILE/FOR, as expressões do corpo e os parênteses de
+# cada grupo são resolvidos uma única vez; as iterações só avaliam.
+
+GRUPO_CONST, GRUPO_VARIAVEL, GRUPO_RES, GRUPO_RES_INDICE, GRUPO_PILHA = range(5)
+
+class Grupo_Preparado:
+    """processarTokens(tokens) com os casos especiais e os subgrupos já resolvidos."""
+
+    __slots__ = ("modo", "valor", "itens", "subgrupos")
+
+    def __init__(self, tokens: list[Token]):
+        self.valor = None
+        self.itens = None
+        self.subgrupos = None
+        if not self._caso_especial(tokens, 0, len(tokens)):
+            self._preparar_pilha(tokens)
+
+    def _caso_especial(self, tokens: list[Token], inicio: int, fim: int) -> bool:
+        """Casos de processarTokens que não usam a pilha; False se o grupo for GRUPO_PILHA."""
+        n = fim - inicio
+        if not n:
+            self.modo, self.valor = GRUPO_CONST, 0.0
+        elif n == 1:
+            token = tokens[inicio]
+            if token.tipo == Tipo_de_Token.NUMERO_REAL:
+                self.modo, self.valor = GRUPO_CONST, float(token.valor)
+            elif token.tipo == Tipo_de_Token.VARIAVEL:
+                self.modo, self.valor = GRUPO_VARIAVEL, token.valor
+            elif token.tipo == Tipo_de_Token.RES:
+                self.modo = GRUPO_RES
             else:
-                print("ERRO -> Token insuficiente para o operador '!'")
-                pilha.append(0.0)
-    
-    return arredondar_16bit(pilha[-1] if pilha else 0.0)
\ No newline at end of file
+                self.modo, self.valor = GRUPO_CONST, 0.0
+        elif (n == 2 and tokens[inicio].tipo == Tipo_de_Token.NUMERO_REAL
+                and tokens[inicio + 1].tipo == Tipo_de_Token.RES):
+            self.modo, self.valor = GRUPO_RES_INDICE, int(float(tokens[inicio].valor))
+        else:
+            self.modo = GRUPO_PILHA
+            return False
+        return True
+
+    def _preparar_pilha(self, tokens: list[Token]) -> None:
+        """
+        Resolve os itens deste grupo e de todos os subgrupos em uma passada,
+        com uma pilha de grupos abertos em vez de recursão.
+        """
+        # itens: (ação, valor do token); ação None = resultado do próximo subgrupo
+        grupo = self
+        grupo.itens, grupo.subgrupos = [], []
+        abertos = []    # (grupo de fora, posição do '(')
+        for i, token in enumerate(tokens):
+            tipo = token.tipo
+            if tipo == Tipo_de_Token.ABRE_PARENTESES:
+                abertos.append((grupo, i))
+                grupo = Grupo_Preparado.__new__(Grupo_Preparado)
+                grupo.valor = None
+                grupo.itens, grupo.subgrupos = [], []
+            elif tipo == Tipo_de_Token.FECHA_PARENTESES and abertos:
+                grupo = grupo._fechar(tokens, abertos, i)
+            else:
+                acao = ACOES_ITEM[tipo]
+                if acao is not None:
+                    grupo.itens.append((acao, token.valor))
+        # Grupos sem ')' vão até o fim
+        while abertos:
+            grupo = grupo._fechar(tokens, abertos, len(tokens))
+
+    def _fechar(self, tokens: list[Token], abertos: list, fim: int) -> "Grupo_Preparado":
+        """Encerra este subgrupo (aberto em abertos[-1]) e devolve o grupo de fora."""
+        externo, abre = abertos.pop()
+        if fim > abre + 1:
+            if self._caso_especial(tokens, abre + 1, fim):
+                self.itens = self.subgrupos = None
+            externo.subgrupos.append(self)
+            externo.itens.append((None, None))
+        return externo
+
+    def avaliar(self, memoria: dict) -> float:
+        modo = self.modo
+        if modo == GRUPO_PILHA:
+            # Como em processarTokens: todos os subgrupos antes da pilha
+            resultados = [subgrupo.avaliar(memoria) for subgrupo in self.subgrupos]
+            k = 0
+            pilha = []
+            for acao, valor in self.itens:
+                if acao is None:
+                    pilha.append(float(resultados[k]))
+                    k += 1
+                else:
+                    acao(valor, pilha, memoria)
+            return arredondar_16bit(pilha[-1] if pilha else 0.0)
+        if modo == GRUPO_CONST:
+            return self.valor
+        if modo == GRUPO_VARIAVEL:
+            return memoria.get(self.valor, 0.0)
+        hist = memoria.get('historico_resultados', [])
+        if modo == GRUPO_RES:
+            return hist[-1] if hist else 0.0
+        idx = self.valor
+        if hist and 0 < idx <= len(hist):
+            return hist[-idx]
+        print(f"ERRO -> Índice {idx} fora do intervalo do histórico (tamanho: {len(hist)})")
+        return 0.0
+
+
+EXPR_VAZIA, EXPR_ATRIBUICAO_SIMPLES, EXPR_ESTRUTURA, EXPR_ATRIBUICAO, EXPR_VALOR = range(5)
+
+class Expressao_Preparada:
+    """executarExpressao(tokens) com a forma da expressão decidida uma vez."""
+
+    __slots__ = ("modo", "nome", "valor", "grupo", "estrutura")
+
+    def __init__(self, tokens: list[Token]):
+        self.nome = None
+        self.valor = None
+        self.grupo = None
+        self.estrutura = None
+
+        tokens_limpos = [token for token in tokens if token.tipo not in TIPOS_DELIMITADORES]
+        if not tokens_limpos:
+            self.modo = EXPR_VAZIA
+        elif (len(tokens_limpos) == 2 and tokens_limpos[0].tipo == Tipo_de_Token.NUMERO_REAL
+                and tokens_limpos[1].tipo == Tipo_de_Token.VARIAVEL):
+            self.modo = EXPR_ATRIBUICAO_SIMPLES
+            self.valor = float(tokens_limpos[0].valor)
+            self.nome = tokens_limpos[1].valor
+        elif any(token.tipo in TIPOS_CONTROLE for token in tokens_limpos):
+            self.modo = EXPR_ESTRUTURA
+            self.estrutura = Estrutura_Preparada(tokens)
+        elif len(tokens_limpos) >= 2 and tokens_limpos[-1].tipo == Tipo_de_Token.VARIAVEL:
+            self.modo = EXPR_ATRIBUICAO
+            self.nome = tokens_limpos[-1].valor
+            self.grupo = Grupo_Preparado(tokens_limpos[:-1])
+        else:
+            self.modo = EXPR_VALOR
+            self.grupo = Grupo_Preparado(tokens_limpos)
+
+    def executar(self, memoria: dict) -> float:
+        modo = self.modo
+        if modo == EXPR_ATRIBUICAO:
+            resultado = self.grupo.avaliar(memoria)
+            memoria[self.nome] = resultado
+            return resultado
+        if modo == EXPR_VALOR:
+            return self.grupo.avaliar(memoria)
+        if modo == EXPR_ESTRUTURA:
+            return self.estrutura.executar(memoria)
+        if modo == EXPR_ATRIBUICAO_SIMPLES:
+            memoria[self.nome] = self.valor
+            return self.valor
+        return 0.0
+
+
+class Corpo_Preparado:
+    """Corpo de laço (executarCorpoLoop) já dividido em expressões."""
+
+    __slots__ = ("expressoes", "grupo")
+
+    def __init__(self, tokens_corpo: list[Token]):
+        # expressoes: (variável a inicializar com 0.0 ou None, Expressao_Preparada)
+        self.expressoes = []
+        self.grupo = None
+        if not tokens_corpo:
+            return
+
+        i = 0
+        while i < len(tokens_corpo):
+            if tokens_corpo[i].tipo == Tipo_de_Token.ABRE_PARENTESES:
+                contagem = 1
+                j = i + 1
+                while j < len(tokens_corpo):
+                    if tokens_corpo[j].tipo == Tipo_de_Token.ABRE_PARENTESES:
+                        contagem += 1
+                    elif tokens_corpo[j].tipo == Tipo_de_Token.FECHA_PARENTESES:
+                        contagem -= 1
+                        if contagem == 0:
+                            break
+                    j += 1
+                expressao = tokens_corpo[i + 1:j]
+                if expressao:
+                    inicializa = expressao[-1].valor if expressao[-1].tipo == Tipo_de_Token.VARIAVEL else None
+                    self.expressoes.append((inicializa, Expressao_Preparada(expressao)))
+                i = j + 1
+            else:
+                i += 1
+
+        # Sem expressões delimitadas, o corpo inteiro é uma única expressão
+        if not self.expressoes:
+            self.grupo = Grupo_Preparado(tokens_corpo)
+
+    def executar(self, memoria: dict) -> float:
+        if self.grupo is not None:
+            return self.grupo.avaliar(memoria)
+        resultado = 0.0
+        for inicializa, expressao in self.expressoes:
+            if inicializa is not None and inicializa not in memoria:
+                memoria[inicializa] = 0.0
+            resultado = expressao.executar(memoria)
+        return resultado
+
+
+class Estrutura_Preparada:
+    """IFELSE/WHILE/FOR com os blocos localizados e preparados uma única vez."""
+
+    __slots__ = ("tipo", "erro", "blocos", "corpo")
+
+    def __init__(self, tokens: list[Token]):
+        self.tipo = None
+        self.erro = None
+        self.blocos = ()
+        self.corpo = None
+        for i, token in enumerate(tokens):
+            if token.tipo in TIPOS_CONTROLE:
+                self.tipo = token.tipo
+                num_blocos, mensagem = BLOCOS_ESTRUTURA[token.tipo]
+                blocos, _ = encontrar_blocos_controle(tokens, i + 1, num_blocos)
+                if len(blocos) != num_blocos:
+                    self.erro = mensagem
+                elif token.tipo == Tipo_de_Token.IFELSE:
+                    self.blocos = tuple(Grupo_Preparado(bloco) for bloco in blocos)
+                else:
+                    self.blocos = tuple(Grupo_Preparado(bloco) for bloco in blocos[:-1])
+                    self.corpo = Corpo_Preparado(blocos[-1])
+                break
+
+    def executar(self, memoria: dict) -> float:
+        if self.tipo is None:
+            return 0.0
+        try:
+            if self.erro is not None:
+                print(self.erro)
+                return 0.0
+            if self.tipo == Tipo_de_Token.IFELSE:
+                return self._executarIFELSE(memoria)
+            if self.tipo == Tipo_de_Token.WHILE:
+                return self._executarWHILE(memoria)
+            return self._executarFOR(memoria)
+        except Exception as e:
+            print(f"ERRO no {NOME_ESTRUTURA[self.tipo]}: {e}")
+            return 0.0
+
+    def _executarIFELSE(self, memoria: dict) -> float:
+        condicao, verdadeiro, falso = self.blocos
+        # Executa o bloco apropriado (verdadeiro se != 0)
+        if float(condicao.avaliar(memoria)) != 0.0:
+            return verdadeiro.avaliar(memoria)
+        return falso.avaliar(memoria)
+
+    def _executarWHILE(self, memoria: dict) -> float:
+        condicao = self.blocos[0]
+        corpo = self.corpo
+        resultado = 0.0
+        iteracoes = 0
+        while iteracoes < MAX_ITERACOES:
+            if float(condicao.avaliar(memoria)) == 0.0:
+                break
+            resultado = corpo.executar(memoria)
+            iteracoes += 1
+        return resultado
+
+    def _executarFOR(self, memoria: dict) -> float:
+        blocos = self.blocos
+        inicial = int(blocos[0].avaliar(memoria))
+        final = int(blocos[1].avaliar(memoria))
+        incremento = int(blocos[2].avaliar(memoria)) or 1
+        corpo = self.corpo
+
+        resultado = 0.0
+        contador = inicial
+        iteracoes = 0
+
+        # Cria uma variável de controle implícita para o loop
+        memoria['_FOR_COUNTER'] = float(contador)
+        while contador < final and iteracoes < MAX_ITERACOES:
+            memoria['_FOR_COUNTER'] = float(contador)
+            resultado = corpo.executar(memoria)
+            contador += incremento
+            iteracoes += 1
+
+        # Remove a variável de controle temporária
+        if '_FOR_COUNTER' in memoria:
+            del memoria['_FOR_COUNTER']
+        return resultado
+
+
+MAX_ITERACOES = 1000  # Limite de segurança dos laços
+
+# Tipo -> (número de blocos, mensagem quando faltam blocos)
+BLOCOS_ESTRUTURA = {
+    Tipo_de_Token.IFELSE: (3, "ERRO -> IFELSE requer 3 blocos: (condição)(verdadeiro)(falso)"),
+    Tipo_de_Token.WHILE: (2, "ERRO -> WHILE requer 2 blocos: (condição)(corpo)"),
+    Tipo_de_Token.FOR: (4, "ERRO -> FOR requer 4 blocos: (inicial)(final)(incremento)(corpo)"),
+}
+NOME_ESTRUTURA = {
+    Tipo_de_Token.IFELSE: "IFELSE",
+    Tipo_de_Token.WHILE: "WHILE",
+    Tipo_de_Token.FOR: "FOR",
+}
+
+# ---------------------------------------------------------------
+# Avaliação direta sobre um Fluxo_Tokens (sem criar objetos Token)
+# ---------------------------------------------------------------
+
+COD_ABRE = Tipo_de_Token.ABRE_PARENTESES
+COD_FECHA = Tipo_de_Token.FECHA_PARENTESES
+COD_NUMERO = Tipo_de_Token.NUMERO_REAL
+COD_VARIAVEL = Tipo_de_Token.VARIAVEL
+COD_RES = Tipo_de_Token.RES
+
+def _executarFluxo(linha: Linha_Fluxo, memoria: dict) -> float:
+    """Mesma lógica de executarExpressao, lendo as colunas do fluxo."""
+    fluxo = linha.fluxo
+    tipos = fluxo.tipos
+    limpos = [j for j in range(linha.inicio, linha.fim) if tipos[j] != COD_ABRE and tipos[j] != COD_FECHA]
+
+    if not limpos:
+        return 0.0
+
+    # Atribuição simples (NUMERO VARIAVEL)
+    if len(limpos) == 2 and tipos[limpos[0]] == COD_NUMERO and tipos[limpos[1]] == COD_VARIAVEL:
+        valor = fluxo.valores[limpos[0]]
+        memoria[fluxo.nomes[int(fluxo.valores[limpos[1]])]] = valor
+        return valor
+
+    # Estruturas de controle usam os blocos entre parênteses: materializa a linha
+    for j in limpos:
+        if tipos[j] in TIPOS_CONTROLE:
+            return processarEstruturaControle(linha.para_tokens(), memoria)
+
+    # Atribuição com expressão (EXPRESSAO VARIAVEL)
+    if len(limpos) >= 2 and tipos[limpos[-1]] == COD_VARIAVEL:
+        resultado = _processarFluxo(fluxo, limpos[:-1], memoria)
+        memoria[fluxo.nomes[int(fluxo.valores[limpos[-1]])]] = resultado
+        return resultado
+
+    return _processarFluxo(fluxo, limpos, memoria)
+
+def _processarFluxo(fluxo, posicoes: list[int], memoria: dict) -> float:
+    """Mesma lógica de processarTokens sobre as posições 'posicoes' do fluxo."""
+    tipos = fluxo.tipos
+    valores = fluxo.valores
+    nomes = fluxo.nomes
+
+    if not posicoes:
+        return 0.0
+
+    if len(posicoes) == 1:
+        j = posicoes[0]
+        if tipos[j] == COD_NUMERO:
+            return valores[j]
+        elif tipos[j] == COD_VARIAVEL:
+            return memoria.get(nomes[int(valores[j])], 0.0)
+        elif tipos[j] == COD_RES:
+            hist = memoria.get('historico_resultados', [])
+            return hist[-1] if hist else 0.0
+        return 0.0
+
+    # Caso especial: índice + RES (ex: 3 RES)
+    if len(posicoes) == 2 and tipos[posicoes[0]] == COD_NUMERO and tipos[posicoes[1]] == COD_RES:
+        idx = int(valores[posicoes[0]])
+        hist = memoria.get('historico_resultados', [])
+        if hist and 0 < idx <= len(hist):
+            return hist[-idx]
+        print(f"ERRO -> Índice {idx} fora do intervalo do histórico (tamanho: {len(hist)})")
+        return 0.0
+
+    # Expande as subexpressões entre parênteses antes de usar a pilha
+    itens = []
+    i = 0
+    while i < len(posicoes):
+        codigo = tipos[posicoes[i]]
+        if codigo == COD_ABRE:
+            contagem = 1
+            k = i + 1
+            sub_posicoes = []
+            while k < len(posicoes) and contagem > 0:
+                if tipos[posicoes[k]] == COD_ABRE:
+                    contagem += 1
+                elif tipos[posicoes[k]] == COD_FECHA:
+                    contagem -= 1
+                if contagem > 0:
+                    sub_posicoes.append(posicoes[k])
+                k += 1
+            if sub_posicoes:
+                itens.append((Tipo_de_Token.NUMERO_REAL, _processarFluxo(fluxo, sub_posicoes, memoria)))
+            i = k
+        else:
+            j = posicoes[i]
+            if codigo == COD_NUMERO:
+                itens.append((Tipo_de_Token.NUMERO_REAL, valores[j]))
+            elif codigo == COD_VARIAVEL:
+                itens.append((Tipo_de_Token.VARIAVEL, nomes[int(valores[j])]))
+            else:
+                itens.append((codigo, LEXEMA_TIPO[codigo]))
+            i += 1
+
+    pilha = []
+    acoes = ACOES_ITEM
+    for tipo, valor in itens:
+        acao = acoes[tipo]
+        if acao is not None:
+            acao(valor, pilha, memoria)
+
+    return arredondar_16bit(pilha[-1] if pilha else 0.0)
@@ -1,52 +1,138 @@
 # tokens.py
+import sys
+
 class Tipo_de_Token:
+    # Códigos inteiros pequenos: servem de índice para tabelas de despacho
+    # e cabem em um byte no Fluxo_Tokens.
+
     # Números
-    NUMERO_REAL = "NUMERO_REAL"
+    NUMERO_REAL = 0
 
     # Operadores Aritméticos
-    SOMA = "SOMA"              # +
-    SUBTRACAO = "SUBTRACAO"    # -
-    MULTIPLICACAO = "MULT"     # *
-    DIVISAO = "DIV"            # /
-    RESTO = "RESTO"            # %
-    POTENCIA = "POT"           # ^
+    SOMA = 1                   # +
+    SUBTRACAO = 2              # -
+    MULTIPLICACAO = 3          # *
+    DIVISAO = 4                # /
+    RESTO = 5                  # %
+    POTENCIA = 6               # ^
 
     # Operadores de Comparação
-    MENOR = "MENOR"            # <
-    MAIOR = "MAIOR"           # >
-    IGUAL = "IGUAL"           # ==
-    MENOR_IGUAL = "MENOR_IGUAL" # <=
-    MAIOR_IGUAL = "MAIOR_IGUAL" # >=
-    DIFERENTE = "DIFERENTE"    # !=
+    MENOR = 7                  # <
+    MAIOR = 8                  # >
+    IGUAL = 9                  # ==
+    MENOR_IGUAL = 10           # <=
+    MAIOR_IGUAL = 11           # >=
+    DIFERENTE = 12             # !=
 
     # Operadores Lógicos
-    NOT = "NOT"               # !
-    OR = "OR"                 # ||
-    AND = "AND"              # &&
+    NOT = 13                   # !
+    OR = 14                    # ||
+    AND = 15                   # &&
 
     # Estruturas de Controle
-    WHILE = "WHILE"           # Estrutura de repetição WHILE
-    FOR = "FOR"               # Estrutura de repetição FOR
-    IFELSE = "IFELSE"         # Estrutura condicional IF-ELSE
+    WHILE = 16                 # Estrutura de repetição WHILE
+    FOR = 17                   # Estrutura de repetição FOR
+    IFELSE = 18                # Estrutura condicional IF-ELSE
 
     # Símbolos de Agrupamento
-    ABRE_PARENTESES = "ABRE_PARENTESES"    # (
-    FECHA_PARENTESES = "FECHA_PARENTESES"   # )
+    ABRE_PARENTESES = 19       # (
+    FECHA_PARENTESES = 20      # )
 
     # Comandos Especiais
-    RES = "RES"               # Comando especial RES
+    RES = 21                   # Comando especial RES
 
     # Variáveis
-    VARIAVEL = "VARIAVEL"       # Identificador de variável
+    VARIAVEL = 22              # Identificador de variável
 
     # Marcador de fim de arquivo
-    FIM = "FIM"
+    FIM = 23
+
+
+NUM_TIPOS = 24
+
+# Nome de cada tipo (índice = código), usado em mensagens e no repr
+NOME_TIPO = (
+    "NUMERO_REAL",
+    "SOMA", "SUBTRACAO", "MULT", "DIV", "RESTO", "POT",
+    "MENOR", "MAIOR", "IGUAL", "MENOR_IGUAL", "MAIOR_IGUAL", "DIFERENTE",
+    "NOT", "OR", "AND",
+    "WHILE", "FOR", "IFELSE",
+    "ABRE_PARENTESES", "FECHA_PARENTESES",
+    "RES", "VARIAVEL", "FIM",
+)
+
+# Lexema dos tipos cujo texto é fixo (índice = código; None para número, variável e FIM)
+LEXEMA_TIPO = (
+    None,
+    '+', '-', '*', '/', '%', '^',
+    '<', '>', '==', '<=', '>=', '!=',
+    '!', '||', '&&',
+    'WHILE', 'FOR', 'IFELSE',
+    '(', ')',
+    'RES', None, None,
+)
+
+TIPO_POR_LEXEMA = {lexema: tipo for tipo, lexema in enumerate(LEXEMA_TIPO) if lexema is not None}
+
+
+# Marca um token cujo valor ainda não foi extraído da fonte
+VALOR_PENDENTE = object()
 
 
 class Token:
-    def __init__(self, tipo: str, valor):
+    """
+    Token com o intervalo [inicio, fim) do lexema no texto fonte (str, ou
+    bytes ASCII). Quando criado só com o intervalo, o valor (float ou
+    identificador) é extraído da fonte apenas no primeiro acesso a 'valor'.
+    """
+
+    __slots__ = ("tipo", "_valor", "fonte", "inicio", "fim")
+
+    def __init__(self, tipo: int, valor=VALOR_PENDENTE, fonte: str | bytes | None = None, inicio: int = 0, fim: int = 0):
         self.tipo = tipo
-        self.valor = valor
+        self._valor = valor
+        self.fonte = fonte
+        self.inicio = inicio
+        self.fim = fim
+
+    @property
+    def valor(self):
+        if self._valor is VALOR_PENDENTE:
+            lexema = self.fonte[self.inicio:self.fim]
+            if self.tipo == Tipo_de_Token.NUMERO_REAL:
+                self._valor = float(lexema)
+            else:
+                self._valor = sys.intern(lexema if isinstance(lexema, str) else lexema.decode("ascii"))
+        return self._valor
+
+    @valor.setter
+    def valor(self, valor):
+        self._valor = valor
 
     def __repr__(self):
-        return f"Token({self.tipo}, {self.valor})"
+        return f"Token({NOME_TIPO[self.tipo]}, {self.valor})"
+
+
+def parear_parenteses(tokens: list[Token]) -> list[int]:
+    """
+    Tabela de pares de parênteses, montada em uma passada com uma pilha.
+    Para cada '(' guarda o índice do ')' correspondente (len(tokens) se o
+    grupo não fechar), para cada ')' o índice do '(' (-1 se sobrar) e -1
+    nos demais tokens.
+    """
+    n = len(tokens)
+    pares = [-1] * n
+    abertos = []
+    abre = Tipo_de_Token.ABRE_PARENTESES
+    fecha = Tipo_de_Token.FECHA_PARENTESES
+    for i, token in enumerate(tokens):
+        tipo = token.tipo
+        if tipo == abre:
+            abertos.append(i)
+        elif tipo == fecha and abertos:
+            j = abertos.pop()
+            pares[j] = i
+            pares[i] = j
+    for j in abertos:
+        pares[j] = n
+    return pares
@@ -0,0 +1,38 @@
+# test_lote_rpn.py - executarLinhaLote pista a pista contra a máquina virtual
+#
+# Rodar da raiz do repositório: python -m pytest -q
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.RA1.functions.python.analisador_tabela import Analisador_Lexico_Tabela
+from src.RA1.functions.python.lote_rpn import executarLinhaLote
+from src.RA1.functions.python.maquina_rpn import executarLinha
+
+PISTAS_X = [1.0, 5.0, 9.5, 20.0]
+
+# Corpos de laço que só leem variáveis nunca atribuídas (P, S, Q)
+LINHAS_SEM_LIGACAO = [
+    "(FOR (2)(6)(-1)((P)))",
+    "(FOR (3)(37)(1)((S)(11.74 10 !=)))",
+    "(WHILE (X 10 <)((Q)(X X 1 +)))",
+    "(FOR (1)(4)(1)((Q)(P P 1 +)))",
+    "(IFELSE (X 5 >)((P))((Q)))",
+]
+
+
+@pytest.mark.parametrize("linha", LINHAS_SEM_LIGACAO)
+def test_lote_igual_a_maquina_em_cada_pista(linha):
+    tokens = Analisador_Lexico_Tabela(linha).analise()
+    memoria_lote = {"X": np.array(PISTAS_X)}
+    resultados = executarLinhaLote(tokens, memoria_lote)
+
+    for pista, x in enumerate(PISTAS_X):
+        memoria = {"X": x}
+        assert resultados[pista] == executarLinha(tokens, memoria)
+        for nome, valor in memoria.items():
+            assert memoria_lote[nome][pista] == valor
+        # A memória do lote tem um nome se alguma pista o definiu; nas outras vale 0.0
+        for nome in memoria_lote.keys() - memoria.keys():
+            assert memoria_lote[nome][pista] == 0.0